@@ -0,0 +1,219 @@
+# API HTTP JSON untuk prediksi stunting tanpa melalui Streamlit.
+# Memakai model (model_registry) dan tabel prediksi_stunting yang sama dengan aplikasi.
+#
+# Menjalankan server lokal:
+#   STUNTING_API_KEYS="kunci-rahasia=username" python api.py --port 8600
+# Atau dengan server WSGI lain, misalnya: waitress-serve --port=8600 api:app
+#
+# Contoh request:
+#   curl -X POST localhost:8600/predict -H "X-API-Key: kunci-rahasia" \
+#        -d '{"records": [{"nama": "Budi", "gender": "Laki-laki", "usia": 12, "berat_lahir": 3.0,
+#             "panjang_lahir": 49, "berat_sekarang": 10, "panjang_sekarang": 70, "asi": "Ya"}]}'
+#
+# Export riwayat prediksi milik user API key (CSV, dikirim per chunk):
+#   curl "localhost:8600/export?from=2025-01-01&to=2025-01-31" -H "X-API-Key: kunci-rahasia" -o riwayat.csv
+import argparse
+import json
+import os
+import threading
+import warnings
+from datetime import date
+from urllib.parse import parse_qs
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+from database import get_user_id, init_database, insert_predictions
+from export import iter_csv
+from model_registry import get_model_version, load_model
+from prediction_cache import get_cache_stats
+from predictor import predict_records, to_records
+from sessions import get_session_stats
+from write_queue import get_write_queue_stats
+
+# Suppress sklearn version warnings
+warnings.filterwarnings("ignore", category=UserWarning, module="sklearn")
+
+MAX_RECORDS = 10000
+MAX_BODY_BYTES = 10 * 1024 * 1024
+
+_user_ids = {}
+_user_ids_lock = threading.Lock()
+
+
+# Kunci API dibaca dari env STUNTING_API_KEYS, format "kunci=username,kunci2=username2".
+# Hasil prediksi disimpan atas nama username tersebut.
+def load_api_keys():
+    keys = {}
+    for item in os.environ.get('STUNTING_API_KEYS', '').split(','):
+        if '=' in item:
+            key, username = item.split('=', 1)
+            keys[key.strip()] = username.strip()
+    return keys
+
+
+API_KEYS = load_api_keys()
+
+
+def _authenticate(environ):
+    username = API_KEYS.get(environ.get('HTTP_X_API_KEY', ''))
+    if username is None:
+        return None
+    with _user_ids_lock:
+        if username not in _user_ids:
+            user_id = get_user_id(username)
+            if user_id is None:
+                return None
+            _user_ids[username] = user_id
+        return _user_ids[username]
+
+
+def _json_response(start_response, status, payload):
+    body = json.dumps(payload).encode('utf-8')
+    start_response(status, [
+        ('Content-Type', 'application/json'),
+        ('Content-Length', str(len(body)))
+    ])
+    return [body]
+
+
+def _read_json(environ):
+    try:
+        length = int(environ.get('CONTENT_LENGTH') or 0)
+    except ValueError:
+        length = 0
+    if length <= 0 or length > MAX_BODY_BYTES:
+        raise ValueError('Body request kosong atau terlalu besar')
+    return json.loads(environ['wsgi.input'].read(length))
+
+
+# Terima satu record (dict), list record, atau {"records": [...], "save": bool}
+def _parse_payload(payload):
+    save = True
+    if isinstance(payload, dict) and 'records' in payload:
+        save = bool(payload.get('save', True))
+        records = payload['records']
+    elif isinstance(payload, dict):
+        records = [payload]
+    else:
+        records = payload
+    if not isinstance(records, list) or not all(isinstance(record, dict) for record in records):
+        raise ValueError('Format record tidak valid')
+    if not records or len(records) > MAX_RECORDS:
+        raise ValueError(f'Jumlah record harus 1-{MAX_RECORDS}')
+    return records, save
+
+
+def handle_predict(environ, start_response):
+    user_id = _authenticate(environ)
+    if user_id is None:
+        return _json_response(start_response, '401 Unauthorized', {'error': 'API key tidak valid'})
+
+    try:
+        records, save = _parse_payload(_read_json(environ))
+        result, errors = predict_records(records)
+    except (ValueError, TypeError) as e:
+        return _json_response(start_response, '400 Bad Request', {'error': str(e)})
+
+    if save and len(result) > 0:
+        insert_predictions(user_id, to_records(result))
+
+    return _json_response(start_response, '200 OK', {
+        'model_version': get_model_version(),
+        'results': [
+            {
+                'index': index,
+                'nama': nama,
+                'prediction': prediction,
+                'hasil_prediksi': hasil,
+                'probabilitas_berisiko': probability,
+                'zscore_pb_u': None if zscore_pb_u != zscore_pb_u else zscore_pb_u,
+                'zscore_bb_u': None if zscore_bb_u != zscore_bb_u else zscore_bb_u
+            }
+            for index, nama, prediction, hasil, probability, zscore_pb_u, zscore_bb_u in zip(
+                result.index.tolist(), result['nama'].tolist(), result['prediction'].tolist(),
+                result['hasil_prediksi'].tolist(), result['probabilitas'].tolist(),
+                result['zscore_pb_u'].tolist(), result['zscore_bb_u'].tolist()
+            )
+        ],
+        'errors': errors.rename(columns={'baris': 'index'}).to_dict('records'),
+        'saved': save
+    })
+
+
+# Export CSV riwayat prediksi user API key, opsional dibatasi ?from=YYYY-MM-DD&to=YYYY-MM-DD.
+# Respons dikirim per chunk sehingga memori tetap kecil berapapun jumlah barisnya.
+def handle_export(environ, start_response):
+    user_id = _authenticate(environ)
+    if user_id is None:
+        return _json_response(start_response, '401 Unauthorized', {'error': 'API key tidak valid'})
+
+    query = parse_qs(environ.get('QUERY_STRING', ''))
+    try:
+        date_from, date_to = (
+            date.fromisoformat(query[name][0]) if name in query else None for name in ('from', 'to')
+        )
+    except ValueError:
+        return _json_response(start_response, '400 Bad Request', {'error': 'Tanggal harus berformat YYYY-MM-DD'})
+
+    start_response('200 OK', [
+        ('Content-Type', 'text/csv; charset=utf-8'),
+        ('Content-Disposition', 'attachment; filename="riwayat_prediksi.csv"')
+    ])
+    return iter_csv(user_id=user_id, date_from=date_from, date_to=date_to)
+
+
+def handle_health(environ, start_response):
+    try:
+        load_model()
+    except FileNotFoundError:
+        return _json_response(start_response, '503 Service Unavailable', {'status': 'model tidak ditemukan'})
+    return _json_response(start_response, '200 OK', {
+        'status': 'ok',
+        'model_version': get_model_version(),
+        'prediction_cache': get_cache_stats(),
+        'sessions': get_session_stats(),
+        'write_queue': get_write_queue_stats()
+    })
+
+
+ROUTES = {
+    ('GET', '/health'): handle_health,
+    ('POST', '/predict'): handle_predict,
+    ('GET', '/export'): handle_export
+}
+
+
+# Aplikasi WSGI
+def app(environ, start_response):
+    handler = ROUTES.get((environ['REQUEST_METHOD'], environ.get('PATH_INFO', '')))
+    if handler is None:
+        return _json_response(start_response, '404 Not Found', {'error': 'Endpoint tidak ditemukan'})
+    return handler(environ, start_response)
+
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description='API HTTP prediksi stunting')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8600)
+    parser.add_argument('--verbose', action='store_true', help='Tampilkan log setiap request')
+    args = parser.parse_args()
+
+    init_database()
+    load_model()
+    handler = WSGIRequestHandler if args.verbose else QuietRequestHandler
+    with make_server(args.host, args.port, app, server_class=ThreadingWSGIServer, handler_class=handler) as server:
+        print(f'API prediksi stunting berjalan di http://{args.host}:{args.port}')
+        server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+# Microbenchmark latensi inferensi per ukuran batch untuk backend sklearn,
+# flat dan fused. Jalankan dari root repo (artefak stunting_model/ harus ada):
+#   python -m benchmarks.bench_inference
+import argparse
+import json
+import time
+import warnings
+
+import numpy as np
+
+import model_artifact
+import model_registry
+import predictor
+
+BATCH_SIZES = [1, 10, 100, 1000, 10000, 100000]
+
+
+def load_backends():
+    warnings.filterwarnings("ignore", category=UserWarning, module="sklearn")
+    return {
+        'sklearn': (model_registry.load_artifact(model_registry.MODEL_PATH),
+                    model_registry.load_artifact(model_registry.SCALER_PATH)),
+        'flat': model_artifact.load_artifact(),
+        'fused': model_artifact.load_fused()
+    }
+
+
+def measure(classifier, scaler, X, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        classifier.predict(scaler.transform(X))
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        'p50_ms': float(np.percentile(timings, 50)),
+        'p99_ms': float(np.percentile(timings, 99)),
+        'rows_per_s': float(len(X) / (np.median(timings) / 1000))
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Microbenchmark inferensi per ukuran batch')
+    parser.add_argument('--sizes', type=int, nargs='+', default=BATCH_SIZES)
+    parser.add_argument('--budget', type=int, default=20000, help='Perkiraan jumlah baris per backend per ukuran')
+    parser.add_argument('--json', action='store_true', help='Keluarkan hasil dalam JSON')
+    args = parser.parse_args()
+
+    X_all = predictor.load_dataset()[predictor.DATASET_FEATURES].to_numpy(dtype=np.float64)
+    backends = load_backends()
+    results = []
+    for size in args.sizes:
+        X = np.resize(X_all, (size, X_all.shape[1]))
+        repeats = max(3, min(500, args.budget // size))
+        for name, (classifier, scaler) in backends.items():
+            classifier.predict(scaler.transform(X[:1]))  # pemanasan
+            results.append({'backend': name, 'batch_size': size, 'repeats': repeats,
+                            **measure(classifier, scaler, X, repeats)})
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'batch':>7s} {'backend':>8s} {'p50 (ms)':>10s} {'p99 (ms)':>10s} {'baris/s':>12s}")
+    for row in results:
+        print(f"{row['batch_size']:7d} {row['backend']:>8s} {row['p50_ms']:10.3f} "
+              f"{row['p99_ms']:10.3f} {row['rows_per_s']:12.0f}")
+
+
+if __name__ == '__main__':
+    main()
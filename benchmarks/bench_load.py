@@ -0,0 +1,278 @@
+# Benchmark beban campuran yang meniru banyak petugas kesehatan sekaligus,
+# tanpa browser: fungsi database/predictor dipanggil langsung dari N thread
+# atau proses. Database di-seed dengan user dan prediksi yang diambil dari
+# Stunting_Dataset.csv, lalu setiap worker menjalankan campuran operasi
+# (login, prediksi tunggal, refresh sidebar, riwayat, hapus) dan hasilnya
+# (throughput + persentil latensi per operasi) ditulis sebagai JSON.
+# Jalankan dari root repo:
+#   python -m benchmarks.bench_load --workers 8 --duration 30 -o hasil.json
+#   python -m benchmarks.bench_load --mode process --mix login=1,predict=5,sidebar=3,history=2
+#   python -m benchmarks.bench_load --db salinan_stunting_app.db --no-seed
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+import database
+import predictor
+from write_queue import submit_prediction, write_queue
+
+PASSWORD = 'password-benchmark'
+DEFAULT_MIX = 'login=2,predict=40,sidebar=35,history=20,delete=3'
+DELETE_BATCH = 50
+INSTANSI = 20
+
+
+def username(i):
+    return f'bench_user{i}'
+
+
+# Baris dataset dalam format tabel prediksi_stunting
+def dataset_records(path=predictor.DATASET_PATH):
+    dataset = predictor.load_dataset(path)
+    return [
+        (
+            'Perempuan' if gender == 1 else 'Laki-laki', int(age), float(birth_weight), float(birth_length),
+            float(body_weight), float(body_length), 'Ya' if breastfeeding == 1 else 'Tidak',
+            predictor.prediction_label(stunting)
+        )
+        for gender, age, birth_weight, birth_length, body_weight, body_length, breastfeeding, stunting
+        in dataset[predictor.DATASET_FEATURES + [predictor.DATASET_TARGET]].itertuples(index=False)
+    ]
+
+
+# Isi database: user (dengan hash password sungguhan) dan prediksi acak dari dataset
+def seed(users, predictions, seed_value):
+    rng = random.Random(seed_value)
+    records = dataset_records()
+    for i in range(users):
+        database.register_user(username(i), PASSWORD, f'Petugas {i}', 'Bidan', f'Puskesmas {i % INSTANSI}')
+    user_ids = [database.get_user_id(username(i)) for i in range(users)]
+
+    def generate():
+        for i in range(predictions):
+            yield (
+                rng.choice(user_ids), f'Anak {i}', *rng.choice(records),
+                f'2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} '
+                f'{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00'
+            )
+
+    with database.get_connection() as conn, conn:
+        conn.executemany('''
+        INSERT INTO prediksi_stunting
+        (user_id, nama, gender, usia, berat_lahir, panjang_lahir,
+         berat_sekarang, panjang_sekarang, asi, hasil_prediksi, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', generate())
+
+
+def parse_mix(text):
+    mix = {}
+    for item in text.split(','):
+        name, weight = item.split('=')
+        if name not in OPERATIONS:
+            raise ValueError(f'Operasi tidak dikenal: {name}')
+        mix[name] = float(weight)
+    return mix
+
+
+# Operasi beban; masing-masing menerima state worker dan rng
+def op_login(state, rng):
+    i = rng.randrange(state['users'])
+    assert database.login_user(username(i), PASSWORD) is not None
+
+
+def op_predict(state, rng):
+    gender, usia, berat_lahir, panjang_lahir, berat_sekarang, panjang_sekarang, asi, _ = rng.choice(state['records'])
+    prediction = predictor.predict_one(gender, usia, berat_lahir, panjang_lahir, berat_sekarang, panjang_sekarang, asi)
+    submit_prediction(rng.choice(state['user_ids']), 'Anak benchmark', gender, usia, berat_lahir, panjang_lahir,
+                      berat_sekarang, panjang_sekarang, asi, predictor.prediction_label(prediction))
+
+
+def op_sidebar(state, rng):
+    user_id = rng.choice(state['user_ids'])
+    database.get_user_statistics(user_id)
+    database.get_recent_predictions(user_id, 5)
+
+
+def op_history(state, rng):
+    _, cursor = database.get_prediction_history_page(rng.choice(state['user_ids']), page_size=50)
+    if cursor is not None and rng.random() < 0.5:
+        database.get_prediction_history_page(rng.choice(state['user_ids']), page_size=50, cursor=cursor)
+
+
+# Hapus semua riwayat milik user khusus worker ini (diisi ulang sebelum diukur)
+def op_delete(state, rng):
+    database.delete_all_predictions(state['scratch_user_id'])
+
+
+def prepare_delete(state, rng):
+    database.insert_predictions(state['scratch_user_id'], [
+        ('Anak hapus', *rng.choice(state['records'])) for _ in range(DELETE_BATCH)
+    ])
+
+
+OPERATIONS = {
+    'login': op_login,
+    'predict': op_predict,
+    'sidebar': op_sidebar,
+    'history': op_history,
+    'delete': op_delete
+}
+PREPARE = {'delete': prepare_delete}
+
+
+# Satu worker (thread atau proses): jalankan operasi acak sampai durasi/jumlah habis
+def run_worker(config, worker_index):
+    import warnings
+    warnings.filterwarnings("ignore", category=UserWarning, module="sklearn")
+
+    if config['mode'] == 'process':
+        database.configure_database(config['db'])
+    rng = random.Random(config['seed'] * 1000 + worker_index)
+    scratch = f'bench_scratch{worker_index}'
+    if database.get_user_id(scratch) is None:
+        database.register_user(scratch, PASSWORD, 'Petugas hapus', 'Bidan', 'Puskesmas 0')
+    state = {
+        'users': config['users'],
+        'user_ids': config['user_ids'],
+        'records': dataset_records(),
+        'scratch_user_id': database.get_user_id(scratch)
+    }
+    predictor.predict_one('Laki-laki', 12, 3.0, 49.0, 10.0, 70.0, 'Ya')  # pemanasan model
+
+    names = list(config['mix'])
+    weights = [config['mix'][name] for name in names]
+    timings = {name: [] for name in names}
+    errors = {name: 0 for name in names}
+    deadline = time.perf_counter() + config['duration']
+    done = 0
+    while (config['ops'] and done < config['ops']) or (not config['ops'] and time.perf_counter() < deadline):
+        name = rng.choices(names, weights)[0]
+        if name in PREPARE:
+            PREPARE[name](state, rng)
+        start = time.perf_counter()
+        try:
+            OPERATIONS[name](state, rng)
+        except Exception:
+            errors[name] += 1
+        timings[name].append((time.perf_counter() - start) * 1000)
+        done += 1
+
+    write_queue.flush()
+    return timings, errors
+
+
+def summarize(timings, errors, elapsed):
+    result = {}
+    for name, values in timings.items():
+        if not values:
+            continue
+        values = np.array(values)
+        result[name] = {
+            'count': len(values),
+            'errors': errors[name],
+            'ops_per_s': len(values) / elapsed,
+            'mean_ms': float(values.mean()),
+            'p50_ms': float(np.percentile(values, 50)),
+            'p95_ms': float(np.percentile(values, 95)),
+            'p99_ms': float(np.percentile(values, 99)),
+            'max_ms': float(values.max())
+        }
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark beban campuran petugas kesehatan (output JSON)')
+    parser.add_argument('--db', help='File database (default: file sementara yang dihapus setelah selesai)')
+    parser.add_argument('--no-seed', action='store_true', help='Pakai data bench_user* yang sudah ada di --db')
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--predictions', type=int, default=100000, help='Jumlah prediksi awal')
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--mode', choices=['thread', 'process'], default='thread')
+    parser.add_argument('--duration', type=float, default=10, help='Detik per worker')
+    parser.add_argument('--ops', type=int, default=0, help='Jumlah operasi per worker (menggantikan --duration)')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='Bobot operasi, misalnya ' + DEFAULT_MIX)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-o', '--output', help='Tulis JSON ke file (default: stdout)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.abspath(args.db or os.path.join(tmp, 'bench.db'))
+        database.configure_database(db_path)
+        database.init_database()
+
+        seed_seconds = 0.0
+        if not args.no_seed:
+            start = time.perf_counter()
+            seed(args.users, args.predictions, args.seed)
+            seed_seconds = time.perf_counter() - start
+        user_ids = [database.get_user_id(username(i)) for i in range(args.users)]
+        if None in user_ids:
+            parser.error(f'User bench_user0..{args.users - 1} tidak lengkap di database, jalankan tanpa --no-seed')
+
+        config = {
+            'db': db_path,
+            'mode': args.mode,
+            'users': args.users,
+            'user_ids': user_ids,
+            'mix': parse_mix(args.mix),
+            'duration': args.duration,
+            'ops': args.ops,
+            'seed': args.seed
+        }
+        # Proses memakai 'spawn': fork akan mewarisi thread pool KDF/penulis yang tidak ikut tersalin
+        if args.mode == 'process':
+            executor = ProcessPoolExecutor(max_workers=args.workers, mp_context=multiprocessing.get_context('spawn'))
+        else:
+            executor = ThreadPoolExecutor(max_workers=args.workers)
+        start = time.perf_counter()
+        with executor:
+            results = list(executor.map(run_worker, [config] * args.workers, range(args.workers)))
+        elapsed = time.perf_counter() - start
+
+        timings = {name: [] for name in config['mix']}
+        errors = {name: 0 for name in config['mix']}
+        for worker_timings, worker_errors in results:
+            for name in timings:
+                timings[name].extend(worker_timings[name])
+                errors[name] += worker_errors[name]
+        total = sum(len(values) for values in timings.values())
+        database.get_pool().close()
+
+    report = {
+        'config': {key: value for key, value in config.items() if key not in ('user_ids', 'db')} | {
+            'workers': args.workers,
+            'predictions': args.predictions,
+            'seeded': not args.no_seed
+        },
+        'environment': {
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count()
+        },
+        'seed_seconds': seed_seconds,
+        'elapsed_seconds': elapsed,
+        'total_ops': total,
+        'ops_per_s': total / elapsed,
+        'operations': summarize(timings, errors, elapsed)
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+# Benchmark throughput login (login/detik dan login/detik per core) untuk
+# biaya KDF saat ini, dengan jumlah worker pool yang berbeda-beda.
+# Jalankan dari root repo:
+#   python -m benchmarks.bench_login
+#   STUNTING_SCRYPT_N=32768 python -m benchmarks.bench_login --workers 1 2 4
+import argparse
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import database
+import passwords
+
+USERS = 16
+PASSWORD = 'password-benchmark'
+
+
+def seed_users(count):
+    for i in range(count):
+        database.register_user(f'bench{i}', PASSWORD, f'Petugas {i}', 'Bidan', 'Puskesmas Benchmark')
+
+
+# Jalankan login dari banyak sesi sekaligus melalui pool KDF dengan n worker
+def measure(workers, logins, sessions):
+    service = passwords.HashingService(workers=workers, max_pending=sessions)
+    previous, passwords.hashing_service = passwords.hashing_service, service
+    try:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=sessions) as clients:
+            results = list(clients.map(
+                lambda i: database.login_user(f'bench{i % USERS}', PASSWORD), range(logins)
+            ))
+        elapsed = time.perf_counter() - start
+    finally:
+        passwords.hashing_service = previous
+        service.shutdown()
+    assert all(results), 'login benchmark gagal'
+    return {
+        'workers': workers,
+        'logins': logins,
+        'seconds': elapsed,
+        'logins_per_s': logins / elapsed,
+        'logins_per_s_per_core': logins / elapsed / min(workers, os.cpu_count() or 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark throughput login dengan KDF')
+    parser.add_argument('--workers', type=int, nargs='+', default=sorted({1, os.cpu_count() or 1}))
+    parser.add_argument('--logins', type=int, default=64, help='Jumlah login per pengukuran')
+    parser.add_argument('--sessions', type=int, default=32, help='Jumlah sesi yang login bersamaan')
+    parser.add_argument('--json', action='store_true', help='Keluarkan hasil dalam JSON')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.configure_database(os.path.join(tmp, 'bench.db'))
+        database.init_database()
+        seed_users(USERS)
+        results = [measure(workers, args.logins, args.sessions) for workers in args.workers]
+
+    config = {
+        'algorithm': passwords.KDF_ALGORITHM,
+        'scrypt': [passwords.SCRYPT_N, passwords.SCRYPT_R, passwords.SCRYPT_P],
+        'pbkdf2_iterations': passwords.PBKDF2_ITERATIONS,
+        'cpu_count': os.cpu_count()
+    }
+    if args.json:
+        print(json.dumps({'config': config, 'results': results}, indent=2))
+        return
+    print(f"KDF {config['algorithm']} (scrypt n/r/p={config['scrypt']}, "
+          f"pbkdf2 iterasi={config['pbkdf2_iterations']}), {config['cpu_count']} core")
+    print(f"{'worker':>7s} {'login':>7s} {'detik':>8s} {'login/s':>9s} {'login/s/core':>13s}")
+    for row in results:
+        print(f"{row['workers']:7d} {row['logins']:7d} {row['seconds']:8.2f} "
+              f"{row['logins_per_s']:9.1f} {row['logins_per_s_per_core']:13.1f}")
+
+
+if __name__ == '__main__':
+    main()
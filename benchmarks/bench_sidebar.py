@@ -0,0 +1,102 @@
+# Benchmark latensi sidebar (statistik + riwayat terbaru) sebelum dan sesudah
+# migrasi indeks. Jalankan dari root repo:
+#   python -m benchmarks.bench_sidebar --rows 1000000
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+import database
+
+# Query lama (sebelum migrasi): dua COUNT(*) terpisah tanpa indeks
+LEGACY_COUNT = 'SELECT COUNT(*) FROM prediksi_stunting WHERE user_id = ?'
+LEGACY_COUNT_AT_RISK = "SELECT COUNT(*) FROM prediksi_stunting WHERE user_id = ? AND hasil_prediksi = 'Berisiko stunting'"
+
+
+def seed(conn, rows, users, seed_value=0):
+    rng = random.Random(seed_value)
+    conn.executemany(
+        'INSERT INTO users (username, password, nama_lengkap, jabatan, instansi) VALUES (?, ?, ?, ?, ?)',
+        ((f'petugas{i}', '-', f'Petugas {i}', 'Bidan', f'Puskesmas {i % 20}') for i in range(users))
+    )
+
+    def generate():
+        for i in range(rows):
+            yield (
+                rng.randint(1, users), f'Anak {i}', rng.choice(['Laki-laki', 'Perempuan']),
+                rng.randint(0, 60), 3.0, 49.0, 10.0, 70.0, rng.choice(['Ya', 'Tidak']),
+                rng.choice(['Berisiko stunting', 'Tidak berisiko stunting']),
+                f'2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} {rng.randint(0, 23):02d}:00:00'
+            )
+
+    with conn:
+        conn.executemany('''
+        INSERT INTO prediksi_stunting
+        (user_id, nama, gender, usia, berat_lahir, panjang_lahir,
+         berat_sekarang, panjang_sekarang, asi, hasil_prediksi, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', generate())
+
+
+def legacy_sidebar(user_id):
+    with database.get_connection() as conn:
+        total = conn.execute(LEGACY_COUNT, (user_id,)).fetchone()[0]
+        berisiko = conn.execute(LEGACY_COUNT_AT_RISK, (user_id,)).fetchone()[0]
+    return total, berisiko, database.get_recent_predictions(user_id, 5)
+
+
+def current_sidebar(user_id):
+    return database.get_user_statistics(user_id), database.get_recent_predictions(user_id, 5)
+
+
+def measure(func, user_ids):
+    timings = []
+    for user_id in user_ids:
+        start = time.perf_counter()
+        func(user_id)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        'p50_ms': statistics.median(timings),
+        'p95_ms': timings[int(len(timings) * 0.95) - 1],
+        'mean_ms': statistics.fmean(timings)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark latensi sidebar sebelum/sesudah indeks')
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--samples', type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.configure_database(os.path.join(tmp, 'bench.db'))
+        # Buat tabel dasar tanpa migrasi indeks
+        migrations = database.MIGRATIONS
+        database.MIGRATIONS = []
+        database.init_database()
+        database.MIGRATIONS = migrations
+
+        start = time.perf_counter()
+        with database.get_connection() as conn:
+            seed(conn, args.rows, args.users)
+        print(f'Seed {args.rows} baris: {time.perf_counter() - start:.1f} s')
+
+        user_ids = [random.randint(1, args.users) for _ in range(args.samples)]
+        before = measure(legacy_sidebar, user_ids)
+
+        start = time.perf_counter()
+        database.init_database()
+        print(f'Migrasi (indeks + ringkasan): {time.perf_counter() - start:.1f} s')
+        after = measure(current_sidebar, user_ids)
+
+        for label, result in (('Sebelum', before), ('Sesudah', after)):
+            print(f"{label:8s} p50={result['p50_ms']:.2f} ms  p95={result['p95_ms']:.2f} ms  mean={result['mean_ms']:.2f} ms")
+        database.get_pool().close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+# Ukur waktu start aplikasi: run pertama halaman login di proses baru (import,
+# inisialisasi database, CSS), rerun berikutnya, dan modul berat yang sudah
+# termuat setelah halaman login tampil. Setiap percobaan memakai proses Python
+# baru agar import benar-benar dingin. Jalankan dari root repo:
+#   python -m benchmarks.bench_startup
+#   git show HEAD~1:stunting_detection_app.py > app_lama.py && python -m benchmarks.bench_startup --app app_lama.py
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+APP_PATH = 'stunting_detection_app.py'
+HEAVY_MODULES = ['pandas', 'numpy', 'pyarrow', 'sklearn', 'model_artifact', 'predictor']
+
+# Dijalankan di proses baru; mencetak hasil pengukuran dalam JSON
+PROBE = '''
+import json, os, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+import database
+database.configure_database(sys.argv[2])
+harness_ms = (time.perf_counter() - start) * 1000
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+start = time.perf_counter()
+at.run()
+first_ms = (time.perf_counter() - start) * 1000
+start = time.perf_counter()
+at.run()
+rerun_ms = (time.perf_counter() - start) * 1000
+print(json.dumps({
+    'harness_ms': harness_ms,
+    'first_run_ms': first_ms,
+    'rerun_ms': rerun_ms,
+    'exceptions': len(at.exception),
+    'loaded': [name for name in sys.argv[3].split(',') if name in sys.modules]
+}))
+'''
+
+
+def probe(app_path, db_path):
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE, os.path.abspath(app_path), db_path, ','.join(HEAVY_MODULES)],
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Waktu start/first paint halaman login')
+    parser.add_argument('--app', default=APP_PATH, help='Script Streamlit yang diukur')
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--json', action='store_true', help='Keluarkan hasil dalam JSON')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        probe(args.app, db_path)  # buat database lebih dulu agar semua percobaan setara
+        runs = [probe(args.app, db_path) for _ in range(args.repeats)]
+
+    result = {
+        'app': args.app,
+        'repeats': args.repeats,
+        'first_run_ms': statistics.median(run['first_run_ms'] for run in runs),
+        'rerun_ms': statistics.median(run['rerun_ms'] for run in runs),
+        'exceptions': max(run['exceptions'] for run in runs),
+        'heavy_modules_loaded': runs[-1]['loaded']
+    }
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+    print(f"{result['app']} (median dari {result['repeats']} proses baru)")
+    print(f"  run pertama halaman login: {result['first_run_ms']:.0f} ms")
+    print(f"  rerun:                     {result['rerun_ms']:.1f} ms")
+    print(f"  modul berat termuat:       {', '.join(result['heavy_modules_loaded']) or '-'}")
+    if result['exceptions']:
+        print(f"  PERINGATAN: {result['exceptions']} exception saat menjalankan app")
+
+
+if __name__ == '__main__':
+    main()
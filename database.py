@@ -0,0 +1,1092 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+from passwords import dummy_hash, hash_password, is_legacy_hash, needs_rehash, verify_password
+
+DB_PATH = 'stunting_app.db'
+POOL_SIZE = 8
+# Lama menunggu koneksi jika semua koneksi pool sedang dipinjam; setelah itu
+# OperationalError, bukan menggantung selamanya (mis. koneksi bocor)
+POOL_TIMEOUT_SECONDS = float(os.environ.get('STUNTING_DB_POOL_TIMEOUT', 30))
+BUSY_TIMEOUT_MS = 5000
+
+# Hapus massal dilakukan per chunk (satu transaksi per chunk) dengan jeda singkat
+# agar INSERT dari sesi lain tetap bisa mendapat write lock di antara chunk
+DELETE_CHUNK_SIZE = 1000
+DELETE_PAUSE_SECONDS = 0.005
+VACUUM_STEP_PAGES = 2000
+
+# Query yang dipakai berulang, disimpan sebagai konstanta agar statement-nya
+# di-cache oleh sqlite3 (prepared statement) di setiap koneksi pool
+SQL_INSERT_USER = '''
+INSERT INTO users (username, password, nama_lengkap, jabatan, instansi)
+VALUES (?, ?, ?, ?, ?)
+'''
+SQL_SELECT_USER = 'SELECT id, password, nama_lengkap, jabatan, instansi FROM users WHERE username = ?'
+SQL_UPDATE_PASSWORD = 'UPDATE users SET password = ? WHERE id = ? AND password = ?'
+SQL_INSERT_SESSION = '''
+INSERT OR REPLACE INTO sessions (session_hash, user_info, expires_at, fingerprint) VALUES (?, ?, ?, ?)
+'''
+SQL_SELECT_SESSION = 'SELECT user_info, expires_at, fingerprint FROM sessions WHERE session_hash = ? AND expires_at > ?'
+SQL_DELETE_SESSION = 'DELETE FROM sessions WHERE session_hash = ?'
+SQL_PURGE_SESSIONS = 'DELETE FROM sessions WHERE expires_at <= ?'
+SQL_SELECT_USER_ID = 'SELECT id FROM users WHERE username = ?'
+SQL_USER_STATISTICS = 'SELECT total_prediksi, berisiko FROM user_prediction_stats WHERE user_id = ?'
+SQL_COMPUTE_STATISTICS = '''
+SELECT user_id, COUNT(*), COALESCE(SUM(hasil_prediksi = 'Berisiko stunting'), 0)
+FROM prediksi_stunting
+GROUP BY user_id
+'''
+SQL_DELETE_PREDICTIONS_CHUNK = '''
+DELETE FROM prediksi_stunting WHERE id IN (
+    SELECT id FROM prediksi_stunting WHERE user_id = ? LIMIT ?
+)
+'''
+SQL_DELETE_OLD_PREDICTIONS_CHUNK = '''
+DELETE FROM prediksi_stunting WHERE id IN (
+    SELECT id FROM prediksi_stunting WHERE created_at < ? ORDER BY created_at LIMIT ?
+)
+'''
+SQL_COUNT_OLD_PREDICTIONS = 'SELECT COUNT(*) FROM prediksi_stunting WHERE created_at < ?'
+SQL_RECENT_PREDICTIONS = '''
+SELECT nama, hasil_prediksi, created_at
+FROM prediksi_stunting
+WHERE user_id = ?
+ORDER BY created_at DESC
+LIMIT ?
+'''
+SQL_INSERT_PREDICTION = '''
+INSERT INTO prediksi_stunting
+(user_id, nama, gender, usia, berat_lahir, panjang_lahir,
+ berat_sekarang, panjang_sekarang, asi, hasil_prediksi, zscore_pb_u, zscore_bb_u)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+SQL_SELECT_ZSCORE_INPUTS = '''
+SELECT id, gender, usia, berat_sekarang, panjang_sekarang
+FROM prediksi_stunting
+WHERE id > ?
+ORDER BY id
+LIMIT ?
+'''
+SQL_UPDATE_ZSCORES = 'UPDATE prediksi_stunting SET zscore_pb_u = ?, zscore_bb_u = ? WHERE id = ?'
+SQL_PREDICTION_HISTORY_PAGE = '''
+SELECT id, nama, gender, usia, berat_lahir, panjang_lahir,
+       berat_sekarang, panjang_sekarang, asi, hasil_prediksi, zscore_pb_u, zscore_bb_u, created_at
+FROM prediksi_stunting
+WHERE user_id = ?{filters}
+ORDER BY created_at DESC, id DESC
+LIMIT ?
+'''
+HISTORY_COLUMNS = ['nama', 'gender', 'usia', 'berat_lahir', 'panjang_lahir',
+                   'berat_sekarang', 'panjang_sekarang', 'asi', 'hasil_prediksi',
+                   'zscore_pb_u', 'zscore_bb_u', 'created_at']
+ZSCORE_CHUNK_SIZE = 50000
+
+# Kelompok usia (bulan) untuk rollup dashboard instansi: (batas atas, label)
+AGE_BANDS = [(5, '0-5'), (11, '6-11'), (23, '12-23'), (35, '24-35'), (47, '36-47'), (60, '48-60')]
+ROLLUP_COLUMNS = ['instansi', 'bulan', 'gender', 'kelompok_usia', 'hasil_prediksi']
+
+
+# Ekspresi SQL kunci rollup (instansi, bulan, gender, kelompok usia, hasil) untuk
+# baris prediksi dengan alias tertentu (NEW/OLD di trigger, p di query)
+def _rollup_key_exprs(alias, instansi=None):
+    age_cases = ' '.join(f"WHEN {alias}.usia <= {high} THEN '{label}'" for high, label in AGE_BANDS)
+    instansi = instansi or f'(SELECT instansi FROM users WHERE id = {alias}.user_id)'
+    return [
+        f"COALESCE({instansi}, '-')",
+        f"COALESCE(strftime('%Y-%m', {alias}.created_at), '-')",
+        f"COALESCE({alias}.gender, '-')",
+        f"CASE {age_cases} ELSE '>60' END",
+        f"COALESCE({alias}.hasil_prediksi, '-')"
+    ]
+
+
+def _rollup_key_sql(alias, instansi=None):
+    return ', '.join(_rollup_key_exprs(alias, instansi))
+
+
+SQL_COMPUTE_ROLLUP = f'''
+SELECT {_rollup_key_sql('p', 'u.instansi')}, COUNT(*)
+FROM prediksi_stunting AS p LEFT JOIN users AS u ON u.id = p.user_id
+GROUP BY 1, 2, 3, 4, 5
+'''
+SQL_ROLLUP_ADD = '''
+INSERT INTO instansi_rollup (instansi, bulan, gender, kelompok_usia, hasil_prediksi, jumlah)
+VALUES ({key}, 1)
+ON CONFLICT (instansi, bulan, gender, kelompok_usia, hasil_prediksi) DO UPDATE SET jumlah = jumlah + 1;
+'''
+SQL_ROLLUP_SUBTRACT = '''
+UPDATE instansi_rollup SET jumlah = jumlah - 1
+WHERE (instansi, bulan, gender, kelompok_usia, hasil_prediksi) = ({key});
+'''
+SQL_ROLLUP_INSTANSI = '''
+SELECT instansi, bulan, gender, kelompok_usia, hasil_prediksi, jumlah
+FROM instansi_rollup
+WHERE jumlah > 0{filters}
+'''
+SQL_ROLLUP_INSTANSI_LIST = 'SELECT DISTINCT instansi FROM instansi_rollup WHERE jumlah > 0 ORDER BY instansi'
+
+# Ringkasan drift harian (lihat drift_monitor.py). Gabungan Welford/Chan di
+# SET memakai nilai lama semua kolom, jadi urutan ekspresi tidak berpengaruh.
+SQL_DRIFT_STATS_ADD = '''
+INSERT INTO drift_feature_stats (hari, fitur, n, mean, m2) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (hari, fitur) DO UPDATE SET
+    n = n + excluded.n,
+    mean = mean + (excluded.mean - mean) * excluded.n / (n + excluded.n),
+    m2 = m2 + excluded.m2 + (excluded.mean - mean) * (excluded.mean - mean) * n * excluded.n / (n + excluded.n)
+'''
+SQL_DRIFT_HISTOGRAM_ADD = '''
+INSERT INTO drift_histogram (hari, fitur, bin, jumlah) VALUES (?, ?, ?, ?)
+ON CONFLICT (hari, fitur, bin) DO UPDATE SET jumlah = jumlah + excluded.jumlah
+'''
+SQL_DRIFT_POSITIVE_ADD = '''
+INSERT INTO drift_positive (hari, instansi, total, berisiko)
+SELECT ?, COALESCE((SELECT instansi FROM users WHERE id = ?), '-'), ?, ? WHERE true
+ON CONFLICT (hari, instansi) DO UPDATE SET
+    total = total + excluded.total,
+    berisiko = berisiko + excluded.berisiko
+'''
+SQL_DRIFT_STATS_WINDOW = 'SELECT fitur, n, mean, m2 FROM drift_feature_stats WHERE hari >= ? AND hari < ?'
+SQL_DRIFT_HISTOGRAM_WINDOW = '''
+SELECT fitur, bin, SUM(jumlah) FROM drift_histogram WHERE hari >= ? AND hari < ? GROUP BY fitur, bin
+'''
+SQL_DRIFT_POSITIVE_WINDOW = '''
+SELECT instansi, SUM(total), SUM(berisiko) FROM drift_positive WHERE hari >= ? AND hari < ? GROUP BY instansi
+'''
+# Pencarian anak lewat indeks FTS5 trigram prediksi_nama_fts (migrasi 8). Semua
+# yang cocok diurutkan dulu (nama yang diawali kata kunci di atas, lalu per nama
+# dari pengukuran terbaru), baru dibatasi LIMIT.
+SQL_SEARCH_CHILDREN = '''
+SELECT p.nama, p.gender, p.usia, p.berat_sekarang, p.panjang_sekarang, p.hasil_prediksi,
+       p.zscore_pb_u, p.zscore_bb_u, p.created_at, u.nama_lengkap, u.instansi
+FROM prediksi_nama_fts AS f
+JOIN prediksi_stunting AS p ON p.id = f.rowid
+LEFT JOIN users AS u ON u.id = p.user_id
+WHERE prediksi_nama_fts MATCH ?{scope}
+ORDER BY p.nama LIKE ? ESCAPE '\\' DESC, lower(p.nama), p.created_at DESC
+LIMIT ?
+'''
+# Cakupan pencarian: 'user' dan 'instansi' butuh nilai (id user / nama instansi),
+# 'all' (semua instansi) hanya untuk admin
+SEARCH_SCOPES = {
+    'user': ' AND p.user_id = ?',
+    'instansi': ' AND p.user_id IN (SELECT id FROM users WHERE instansi = ?)',
+    'all': '',
+}
+SEARCH_COLUMNS = ['nama', 'gender', 'usia', 'berat_sekarang', 'panjang_sekarang', 'hasil_prediksi',
+                  'zscore_pb_u', 'zscore_bb_u', 'created_at', 'petugas', 'instansi']
+SEARCH_MIN_LENGTH = 3  # tokenizer trigram butuh minimal 3 karakter
+SEARCH_LIMIT = 200
+FUZZY_CANDIDATES = 2000
+SEARCH_MERGE_PAGES = 500  # kerja merge segmen FTS5 per putaran pemeliharaan
+FUZZY_MAX_MISSING = 4  # satu huruf salah mengubah <= 3 trigram, dua huruf tertukar <= 4
+SQL_SELECT_DRIFT_INPUTS = '''
+SELECT id, user_id, nama, gender, usia, berat_lahir, panjang_lahir,
+       berat_sekarang, panjang_sekarang, asi, hasil_prediksi, COALESCE(date(created_at), '-')
+FROM prediksi_stunting
+WHERE id > ?
+ORDER BY id
+LIMIT ?
+'''
+
+# Tambahkan z-score WHO (lihat growth_reference.py) ke baris prediksi
+# (user_id, nama, gender, usia, berat_lahir, panjang_lahir, berat_sekarang,
+# panjang_sekarang, asi, hasil_prediksi), dihitung sekaligus untuk semua baris
+def _with_zscores(rows):
+    import growth_reference
+
+    if not rows:
+        return rows
+    _, _, genders, ages, _, _, weights, lengths, _, _ = zip(*rows)
+    zscores = growth_reference.compute_zscores(growth_reference.sex_codes(genders), ages, weights, lengths)
+    return [
+        (*row, *_nullable(z_pb_u, z_bb_u))
+        for row, z_pb_u, z_bb_u in zip(rows, *(z.tolist() for z in zscores))
+    ]
+
+
+def _nullable(*values):
+    return tuple(None if value != value else value for value in values)  # NaN -> NULL
+
+
+# Isi z-score untuk baris yang sudah ada, per chunk id (dipakai migrasi 6)
+def backfill_zscores(conn, chunk_size=ZSCORE_CHUNK_SIZE):
+    import growth_reference
+
+    last_id, updated = 0, 0
+    while True:
+        rows = conn.execute(SQL_SELECT_ZSCORE_INPUTS, (last_id, chunk_size)).fetchall()
+        if not rows:
+            return updated
+        ids, genders, ages, weights, lengths = zip(*rows)
+        zscores = growth_reference.compute_zscores(growth_reference.sex_codes(genders), ages, weights, lengths)
+        conn.executemany(SQL_UPDATE_ZSCORES, (
+            (*_nullable(z_pb_u, z_bb_u), row_id)
+            for row_id, z_pb_u, z_bb_u in zip(ids, *(z.tolist() for z in zscores))
+        ))
+        last_id = ids[-1]
+        updated += len(rows)
+
+
+# Tambahkan ringkasan drift satu batch baris insert ke tabel drift_* hari tertentu,
+# di dalam transaksi pemanggil
+def _record_drift(conn, rows, day):
+    import drift_monitor
+
+    stats, histograms, positives = drift_monitor.summarize_batch(rows)
+    conn.executemany(SQL_DRIFT_STATS_ADD, ((day, *stat) for stat in stats))
+    conn.executemany(SQL_DRIFT_HISTOGRAM_ADD, ((day, *histogram) for histogram in histograms))
+    conn.executemany(SQL_DRIFT_POSITIVE_ADD, ((day, *positive) for positive in positives))
+
+
+def _today():
+    # created_at diisi CURRENT_TIMESTAMP (UTC), jadi hari ringkasan juga UTC
+    return datetime.now(timezone.utc).strftime('%Y-%m-%d')
+
+
+# Isi ringkasan drift dari prediksi yang sudah ada, per chunk id (dipakai migrasi 7)
+def backfill_drift(conn, chunk_size=ZSCORE_CHUNK_SIZE):
+    last_id = 0
+    while True:
+        rows = conn.execute(SQL_SELECT_DRIFT_INPUTS, (last_id, chunk_size)).fetchall()
+        if not rows:
+            return
+        by_day = {}
+        for row in rows:
+            by_day.setdefault(row[-1], []).append(row[1:-1])
+        for day, day_rows in by_day.items():
+            _record_drift(conn, day_rows, day)
+        last_id = rows[-1][0]
+
+
+# Migrasi skema, dijalankan berurutan sesuai PRAGMA user_version.
+# Migrasi baru cukup ditambahkan di akhir list. Selain SQL, langkah migrasi
+# boleh berupa fungsi yang menerima koneksi (untuk pengisian data dengan Python).
+MIGRATIONS = [
+    # 1: indeks untuk statistik sidebar dan riwayat per user
+    [
+        'CREATE INDEX IF NOT EXISTS idx_prediksi_user_created ON prediksi_stunting (user_id, created_at)',
+        'CREATE INDEX IF NOT EXISTS idx_prediksi_user_hasil ON prediksi_stunting (user_id, hasil_prediksi)',
+    ],
+    # 2: ringkasan statistik per user yang dijaga oleh trigger
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS user_prediction_stats (
+            user_id INTEGER PRIMARY KEY,
+            total_prediksi INTEGER NOT NULL DEFAULT 0,
+            berisiko INTEGER NOT NULL DEFAULT 0
+        )
+        ''',
+        '''
+        INSERT OR REPLACE INTO user_prediction_stats (user_id, total_prediksi, berisiko)
+        SELECT user_id, COUNT(*), COALESCE(SUM(hasil_prediksi = 'Berisiko stunting'), 0)
+        FROM prediksi_stunting
+        GROUP BY user_id
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_stats_insert AFTER INSERT ON prediksi_stunting
+        BEGIN
+            INSERT INTO user_prediction_stats (user_id, total_prediksi, berisiko)
+            VALUES (NEW.user_id, 1, NEW.hasil_prediksi = 'Berisiko stunting')
+            ON CONFLICT (user_id) DO UPDATE SET
+                total_prediksi = total_prediksi + 1,
+                berisiko = berisiko + excluded.berisiko;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_stats_delete AFTER DELETE ON prediksi_stunting
+        BEGIN
+            UPDATE user_prediction_stats SET
+                total_prediksi = total_prediksi - 1,
+                berisiko = berisiko - (OLD.hasil_prediksi = 'Berisiko stunting')
+            WHERE user_id = OLD.user_id;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_stats_update AFTER UPDATE OF user_id, hasil_prediksi ON prediksi_stunting
+        BEGIN
+            UPDATE user_prediction_stats SET
+                total_prediksi = total_prediksi - 1,
+                berisiko = berisiko - (OLD.hasil_prediksi = 'Berisiko stunting')
+            WHERE user_id = OLD.user_id;
+            INSERT INTO user_prediction_stats (user_id, total_prediksi, berisiko)
+            VALUES (NEW.user_id, 1, NEW.hasil_prediksi = 'Berisiko stunting')
+            ON CONFLICT (user_id) DO UPDATE SET
+                total_prediksi = total_prediksi + 1,
+                berisiko = berisiko + excluded.berisiko;
+        END
+        ''',
+    ],
+    # 3: sesi login yang disimpan server (lihat sessions.py)
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS sessions (
+            session_hash TEXT PRIMARY KEY,
+            user_info TEXT NOT NULL,
+            expires_at REAL NOT NULL
+        )
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_sessions_expires ON sessions (expires_at)',
+    ],
+    # 4: rollup jumlah prediksi per instansi x bulan x gender x kelompok usia x hasil,
+    # dijaga oleh trigger agar dashboard instansi tidak perlu memindai prediksi_stunting
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS instansi_rollup (
+            instansi TEXT NOT NULL,
+            bulan TEXT NOT NULL,
+            gender TEXT NOT NULL,
+            kelompok_usia TEXT NOT NULL,
+            hasil_prediksi TEXT NOT NULL,
+            jumlah INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (instansi, bulan, gender, kelompok_usia, hasil_prediksi)
+        ) WITHOUT ROWID
+        ''',
+        f'''
+        INSERT INTO instansi_rollup (instansi, bulan, gender, kelompok_usia, hasil_prediksi, jumlah)
+        {SQL_COMPUTE_ROLLUP}
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS trg_rollup_insert AFTER INSERT ON prediksi_stunting
+        BEGIN
+            {SQL_ROLLUP_ADD.format(key=_rollup_key_sql('NEW'))}
+        END
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS trg_rollup_delete AFTER DELETE ON prediksi_stunting
+        BEGIN
+            {SQL_ROLLUP_SUBTRACT.format(key=_rollup_key_sql('OLD'))}
+        END
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS trg_rollup_update
+        AFTER UPDATE OF user_id, gender, usia, hasil_prediksi, created_at ON prediksi_stunting
+        BEGIN
+            {SQL_ROLLUP_SUBTRACT.format(key=_rollup_key_sql('OLD'))}
+            {SQL_ROLLUP_ADD.format(key=_rollup_key_sql('NEW'))}
+        END
+        ''',
+        # Instansi user berubah: pindahkan seluruh hitungan prediksi user tersebut
+        f'''
+        CREATE TRIGGER IF NOT EXISTS trg_rollup_user_instansi
+        AFTER UPDATE OF instansi ON users WHEN OLD.instansi IS NOT NEW.instansi
+        BEGIN
+            UPDATE instansi_rollup SET jumlah = jumlah - (
+                SELECT COUNT(*) FROM prediksi_stunting AS p
+                WHERE p.user_id = NEW.id AND ({', '.join(_rollup_key_exprs('p')[1:])}) = (
+                    instansi_rollup.bulan, instansi_rollup.gender,
+                    instansi_rollup.kelompok_usia, instansi_rollup.hasil_prediksi
+                )
+            )
+            WHERE instansi = COALESCE(OLD.instansi, '-');
+            INSERT INTO instansi_rollup (instansi, bulan, gender, kelompok_usia, hasil_prediksi, jumlah)
+            SELECT {_rollup_key_sql('p', 'NEW.instansi')}, COUNT(*)
+            FROM prediksi_stunting AS p WHERE p.user_id = NEW.id GROUP BY 1, 2, 3, 4, 5 HAVING true
+            ON CONFLICT (instansi, bulan, gender, kelompok_usia, hasil_prediksi) DO UPDATE SET
+                jumlah = jumlah + excluded.jumlah;
+        END
+        ''',
+    ],
+    # 5: indeks tanggal untuk purge retensi (hapus prediksi lama per chunk)
+    [
+        'CREATE INDEX IF NOT EXISTS idx_prediksi_created ON prediksi_stunting (created_at)',
+    ],
+    # 6: z-score WHO PB/U dan BB/U disimpan di samping hasil_prediksi
+    [
+        'ALTER TABLE prediksi_stunting ADD COLUMN zscore_pb_u REAL',
+        'ALTER TABLE prediksi_stunting ADD COLUMN zscore_bb_u REAL',
+        backfill_zscores,
+    ],
+    # 7: ringkasan harian untuk monitor drift input (diisi per batch insert)
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS drift_feature_stats (
+            hari TEXT NOT NULL,
+            fitur TEXT NOT NULL,
+            n INTEGER NOT NULL,
+            mean REAL NOT NULL,
+            m2 REAL NOT NULL,
+            PRIMARY KEY (hari, fitur)
+        ) WITHOUT ROWID
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS drift_histogram (
+            hari TEXT NOT NULL,
+            fitur TEXT NOT NULL,
+            bin INTEGER NOT NULL,
+            jumlah INTEGER NOT NULL,
+            PRIMARY KEY (hari, fitur, bin)
+        ) WITHOUT ROWID
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS drift_positive (
+            hari TEXT NOT NULL,
+            instansi TEXT NOT NULL,
+            total INTEGER NOT NULL,
+            berisiko INTEGER NOT NULL,
+            PRIMARY KEY (hari, instansi)
+        ) WITHOUT ROWID
+        ''',
+        backfill_drift,
+    ],
+    # 8: indeks FTS5 trigram atas nama anak (external content, dijaga trigger)
+    [
+        '''
+        CREATE VIRTUAL TABLE IF NOT EXISTS prediksi_nama_fts USING fts5(
+            nama, content='prediksi_stunting', content_rowid='id', tokenize='trigram'
+        )
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_nama_fts_insert AFTER INSERT ON prediksi_stunting
+        BEGIN
+            INSERT INTO prediksi_nama_fts (rowid, nama) VALUES (NEW.id, NEW.nama);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_nama_fts_delete AFTER DELETE ON prediksi_stunting
+        BEGIN
+            INSERT INTO prediksi_nama_fts (prediksi_nama_fts, rowid, nama) VALUES ('delete', OLD.id, OLD.nama);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_nama_fts_update AFTER UPDATE OF nama ON prediksi_stunting
+        BEGIN
+            INSERT INTO prediksi_nama_fts (prediksi_nama_fts, rowid, nama) VALUES ('delete', OLD.id, OLD.nama);
+            INSERT INTO prediksi_nama_fts (rowid, nama) VALUES (NEW.id, NEW.nama);
+        END
+        ''',
+        "INSERT INTO prediksi_nama_fts (prediksi_nama_fts) VALUES ('rebuild')",
+    ],
+    # 9: sesi diikat ke sidik jari klien (hash User-Agent/Accept-Language);
+    # sesi lama tanpa sidik jari tidak bisa dipulihkan lagi, jadi dibuang
+    [
+        'ALTER TABLE sessions ADD COLUMN fingerprint TEXT',
+        'DELETE FROM sessions',
+    ],
+]
+
+
+# Pool koneksi SQLite yang aman dipakai bersama oleh banyak thread/sesi
+class ConnectionPool:
+    def __init__(self, path, size=POOL_SIZE, timeout=POOL_TIMEOUT_SECONDS):
+        self.path = path
+        self.size = size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.path,
+            timeout=BUSY_TIMEOUT_MS / 1000,
+            check_same_thread=False,
+            cached_statements=256
+        )
+        # File database baru langsung memakai auto_vacuum incremental (harus sebelum
+        # WAL); database lama perlu enable_incremental_vacuum() (VACUUM penuh sekali)
+        conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(f'PRAGMA busy_timeout={BUSY_TIMEOUT_MS}')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        return conn
+
+    def acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                create = True
+            else:
+                create = False
+        if create:
+            try:
+                return self._connect()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        # Pool penuh, tunggu koneksi yang dikembalikan sesi lain
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise sqlite3.OperationalError(
+                f'connection pool exhausted: {self.size} koneksi dipinjam lebih dari {self.timeout:g} detik'
+            ) from None
+
+    def release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+    def close(self):
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._created -= 1
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DB_PATH)
+    return _pool
+
+
+# Ganti lokasi database (dipakai untuk benchmark/testing)
+def configure_database(path, pool_size=POOL_SIZE, pool_timeout=POOL_TIMEOUT_SECONDS):
+    global _pool, DB_PATH
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+        DB_PATH = path
+        _pool = ConnectionPool(path, pool_size, pool_timeout)
+
+
+# Meminjam koneksi dari pool, otomatis dikembalikan setelah selesai
+@contextmanager
+def get_connection():
+    pool = get_pool()
+    conn = pool.acquire()
+    try:
+        yield conn
+    finally:
+        pool.release(conn)
+
+
+# Jalankan init_database sekali per proses untuk setiap file database
+# (dipakai aplikasi Streamlit yang mengeksekusi ulang script di setiap rerun)
+_initialized = set()
+_init_lock = threading.Lock()
+
+
+def ensure_database():
+    if DB_PATH in _initialized:
+        return
+    with _init_lock:
+        if DB_PATH not in _initialized:
+            init_database()
+            _initialized.add(DB_PATH)
+
+
+# Inisialisasi database
+def init_database():
+    with get_connection() as conn, conn:
+        # Tabel untuk users (petugas kesehatan)
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password TEXT NOT NULL,
+            nama_lengkap TEXT NOT NULL,
+            jabatan TEXT,
+            instansi TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''')
+
+        # Tabel untuk prediksi stunting (dimodifikasi dengan user_id)
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS prediksi_stunting (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            nama TEXT,
+            gender TEXT,
+            usia INTEGER,
+            berat_lahir REAL,
+            panjang_lahir REAL,
+            berat_sekarang REAL,
+            panjang_sekarang REAL,
+            asi TEXT,
+            hasil_prediksi TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+        ''')
+
+    with get_connection() as conn:
+        migrate_database(conn)
+
+
+# Jalankan migrasi skema yang belum diterapkan
+def migrate_database(conn):
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+        for number, statements in enumerate(MIGRATIONS[version:], start=version + 1):
+            for sql in statements:
+                if callable(sql):
+                    sql(conn)
+                else:
+                    conn.execute(sql)
+            conn.execute(f'PRAGMA user_version = {number}')
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+# Fungsi registrasi
+def register_user(username, password, nama_lengkap, jabatan, instansi):
+    hashed_password = hash_password(password)
+    try:
+        with get_connection() as conn, conn:
+            conn.execute(SQL_INSERT_USER, (username, hashed_password, nama_lengkap, jabatan, instansi))
+        return True
+    except sqlite3.IntegrityError:
+        return False
+
+
+# Fungsi login
+def login_user(username, password):
+    with get_connection() as conn:
+        user = conn.execute(SQL_SELECT_USER, (username,)).fetchone()
+
+    # Username tidak ada atau hash lama tanpa KDF: tetap jalankan KDF dengan biaya
+    # yang sama, agar waktu respons tidak membocorkan username yang terdaftar
+    if user is None or is_legacy_hash(user[1]):
+        verify_password(password, dummy_hash())
+    if user and verify_password(password, user[1]):
+        # Ganti hash lama (SHA-256 tanpa salt / biaya KDF lama) dengan hash baru
+        if needs_rehash(user[1]):
+            with get_connection() as conn, conn:
+                conn.execute(SQL_UPDATE_PASSWORD, (hash_password(password), user[0], user[1]))
+        return {
+            'id': user[0],
+            'username': username,
+            'nama_lengkap': user[2],
+            'jabatan': user[3],
+            'instansi': user[4]
+        }
+    return None
+
+
+# Cari id user berdasarkan username (tanpa verifikasi password)
+def get_user_id(username):
+    with get_connection() as conn:
+        row = conn.execute(SQL_SELECT_USER_ID, (username,)).fetchone()
+    return row[0] if row else None
+
+
+# Simpan sesi login (user_info dalam JSON) untuk sessions.SessionStore
+def save_session(session_hash, user_info, expires_at, fingerprint):
+    with get_connection() as conn, conn:
+        conn.execute(SQL_INSERT_SESSION, (session_hash, json.dumps(user_info), expires_at, fingerprint))
+
+
+# Ambil sesi yang belum kedaluwarsa sebagai (user_info, expires_at, fingerprint), None jika tidak ada
+def load_session(session_hash, now):
+    with get_connection() as conn:
+        row = conn.execute(SQL_SELECT_SESSION, (session_hash, now)).fetchone()
+    return (json.loads(row[0]), row[1], row[2]) if row else None
+
+
+def delete_session(session_hash):
+    with get_connection() as conn, conn:
+        conn.execute(SQL_DELETE_SESSION, (session_hash,))
+
+
+# Hapus sesi kedaluwarsa, mengembalikan jumlah sesi yang dihapus
+def purge_sessions(now):
+    with get_connection() as conn, conn:
+        return conn.execute(SQL_PURGE_SESSIONS, (now,)).rowcount
+
+
+# Fungsi untuk mendapatkan statistik user
+def get_user_statistics(user_id):
+    # Dibaca dari tabel ringkasan, O(1) berapapun jumlah prediksinya
+    with get_connection() as conn:
+        row = conn.execute(SQL_USER_STATISTICS, (user_id,)).fetchone()
+
+    total_prediksi, berisiko = row if row else (0, 0)
+    tidak_berisiko = total_prediksi - berisiko
+
+    return {
+        'total_prediksi': total_prediksi,
+        'berisiko': berisiko,
+        'tidak_berisiko': tidak_berisiko
+    }
+
+
+# Bandingkan tabel ringkasan dengan hitungan ulang dari prediksi_stunting.
+# Mengembalikan daftar user yang nilainya tidak cocok.
+def verify_user_statistics():
+    with get_connection() as conn:
+        actual = {row[0]: row[1:] for row in conn.execute(SQL_COMPUTE_STATISTICS)}
+        stored = {row[0]: row[1:] for row in conn.execute(
+            'SELECT user_id, total_prediksi, berisiko FROM user_prediction_stats'
+        )}
+
+    drift = []
+    for user_id in sorted(set(actual) | set(stored), key=lambda x: (x is None, x)):
+        expected = actual.get(user_id, (0, 0))
+        found = stored.get(user_id, (0, 0))
+        if expected != found:
+            drift.append({
+                'user_id': user_id,
+                'total_prediksi': found[0],
+                'total_prediksi_aktual': expected[0],
+                'berisiko': found[1],
+                'berisiko_aktual': expected[1]
+            })
+    return drift
+
+
+# Hitung ulang seluruh tabel ringkasan dari prediksi_stunting
+def rebuild_user_statistics():
+    with get_connection() as conn, conn:
+        conn.execute('DELETE FROM user_prediction_stats')
+        conn.execute(f'''
+        INSERT INTO user_prediction_stats (user_id, total_prediksi, berisiko)
+        {SQL_COMPUTE_STATISTICS}
+        ''')
+        return conn.execute('SELECT COUNT(*) FROM user_prediction_stats').fetchone()[0]
+
+
+# Bandingkan rollup instansi dengan hasil GROUP BY langsung, mengembalikan selisihnya
+def verify_instansi_rollup():
+    with get_connection() as conn:
+        actual = {row[:5]: row[5] for row in conn.execute(SQL_COMPUTE_ROLLUP)}
+        stored = {row[:5]: row[5] for row in conn.execute(
+            'SELECT instansi, bulan, gender, kelompok_usia, hasil_prediksi, jumlah FROM instansi_rollup'
+        )}
+
+    drift = []
+    for key in sorted(set(actual) | set(stored)):
+        if actual.get(key, 0) != stored.get(key, 0):
+            drift.append(dict(zip(ROLLUP_COLUMNS, key), jumlah=stored.get(key, 0), jumlah_aktual=actual.get(key, 0)))
+    return drift
+
+
+# Hitung ulang seluruh rollup instansi dari prediksi_stunting
+def rebuild_instansi_rollup():
+    with get_connection() as conn, conn:
+        conn.execute('DELETE FROM instansi_rollup')
+        conn.execute(f'''
+        INSERT INTO instansi_rollup (instansi, bulan, gender, kelompok_usia, hasil_prediksi, jumlah)
+        {SQL_COMPUTE_ROLLUP}
+        ''')
+        return conn.execute('SELECT COUNT(*) FROM instansi_rollup').fetchone()[0]
+
+
+# Bangun ulang indeks pencarian nama dari prediksi_stunting
+def rebuild_search_index():
+    with get_connection() as conn, conn:
+        conn.execute("INSERT INTO prediksi_nama_fts (prediksi_nama_fts) VALUES ('rebuild')")
+        return conn.execute('SELECT COUNT(*) FROM prediksi_stunting').fetchone()[0]
+
+
+# Cek indeks pencarian nama sesuai isi prediksi_stunting (False jika tidak sinkron)
+def verify_search_index():
+    try:
+        with get_connection() as conn:
+            conn.execute("INSERT INTO prediksi_nama_fts (prediksi_nama_fts, rank) VALUES ('integrity-check', 1)")
+    except sqlite3.DatabaseError:
+        return False
+    return True
+
+
+# Gabungkan segmen kecil indeks FTS5 secara bertahap (dipanggil pemeliharaan berkala)
+def merge_search_index(pages=SEARCH_MERGE_PAGES):
+    with get_connection() as conn, conn:
+        conn.execute("INSERT INTO prediksi_nama_fts (prediksi_nama_fts, rank) VALUES ('merge', ?)", (pages,))
+
+
+# Baris rollup (instansi, bulan, gender, kelompok_usia, hasil_prediksi, jumlah) untuk
+# dashboard; instansi=None berarti semua instansi, bulan dalam format 'YYYY-MM'
+def get_instansi_rollup(instansi=None, month_from=None, month_to=None):
+    clauses, params = [], []
+    if instansi:
+        clauses.append('instansi = ?')
+        params.append(instansi)
+    if month_from:
+        clauses.append('bulan >= ?')
+        params.append(month_from)
+    if month_to:
+        clauses.append('bulan <= ?')
+        params.append(month_to)
+    filters = ''.join(f' AND {clause}' for clause in clauses)
+    with get_connection() as conn:
+        return conn.execute(SQL_ROLLUP_INSTANSI.format(filters=filters), params).fetchall()
+
+
+def get_rollup_instansi_list():
+    with get_connection() as conn:
+        return [row[0] for row in conn.execute(SQL_ROLLUP_INSTANSI_LIST)]
+
+
+# Jalankan DELETE ... LIMIT chunk_size berulang, satu transaksi per chunk.
+# progress(deleted, total) dipanggil setelah setiap chunk.
+def _delete_in_chunks(sql, params, total, chunk_size, progress):
+    deleted = 0
+    while True:
+        with get_connection() as conn, conn:
+            count = conn.execute(sql, (*params, chunk_size)).rowcount
+        deleted += count
+        if progress is not None:
+            progress(deleted, max(total, deleted))
+        if count < chunk_size:
+            return deleted
+        time.sleep(DELETE_PAUSE_SECONDS)
+
+
+# Fungsi untuk menghapus semua riwayat prediksi user (per chunk, lihat _delete_in_chunks)
+def delete_all_predictions(user_id, chunk_size=DELETE_CHUNK_SIZE, progress=None):
+    total = get_user_statistics(user_id)['total_prediksi']
+    try:
+        return _delete_in_chunks(SQL_DELETE_PREDICTIONS_CHUNK, (user_id,), total, chunk_size, progress)
+    finally:
+        _bump_data_version([user_id])
+
+
+# Hapus prediksi yang lebih tua dari days hari (kebijakan retensi), per chunk
+def purge_old_predictions(days, chunk_size=DELETE_CHUNK_SIZE, progress=None):
+    # created_at diisi CURRENT_TIMESTAMP (UTC)
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).strftime('%Y-%m-%d %H:%M:%S')
+    with get_connection() as conn:
+        total = conn.execute(SQL_COUNT_OLD_PREDICTIONS, (cutoff,)).fetchone()[0]
+    if total == 0:
+        return 0
+    try:
+        return _delete_in_chunks(SQL_DELETE_OLD_PREDICTIONS_CHUNK, (cutoff,), total, chunk_size, progress)
+    finally:
+        _bump_data_version()
+
+
+# Ukuran file database: jumlah halaman, halaman kosong (freelist) dan mode auto_vacuum
+def get_storage_stats():
+    with get_connection() as conn:
+        page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+        page_count = conn.execute('PRAGMA page_count').fetchone()[0]
+        freelist = conn.execute('PRAGMA freelist_count').fetchone()[0]
+        auto_vacuum = conn.execute('PRAGMA auto_vacuum').fetchone()[0]
+    return {
+        'page_size': page_size,
+        'page_count': page_count,
+        'freelist_count': freelist,
+        'size_bytes': page_size * page_count,
+        'free_bytes': page_size * freelist,
+        'auto_vacuum': {0: 'none', 1: 'full', 2: 'incremental'}.get(auto_vacuum, auto_vacuum)
+    }
+
+
+# Kembalikan halaman kosong ke sistem file sedikit demi sedikit (butuh auto_vacuum
+# incremental). Mengembalikan jumlah halaman yang dibebaskan.
+def incremental_vacuum(max_pages=None, step=VACUUM_STEP_PAGES):
+    freed = 0
+    while max_pages is None or freed < max_pages:
+        with get_connection() as conn:
+            if conn.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+                return freed
+            free = conn.execute('PRAGMA freelist_count').fetchone()[0]
+            pages = min(free, step if max_pages is None else min(step, max_pages - freed))
+            if pages <= 0:
+                return freed
+            # executescript menjalankan pragma sampai selesai (execute hanya satu langkah = 1 halaman)
+            conn.executescript(f'PRAGMA incremental_vacuum({pages});')
+        freed += pages
+        time.sleep(DELETE_PAUSE_SECONDS)
+    return freed
+
+
+# Aktifkan auto_vacuum incremental pada database lama. VACUUM penuh menulis ulang
+# seluruh file dan mengunci database selama berjalan, jadi jalankan saat sepi.
+def enable_incremental_vacuum():
+    with get_connection() as conn:
+        conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+        conn.execute('VACUUM')
+
+
+# Versi data prediksi per user di proses ini, dinaikkan setiap kali prediksi
+# disimpan atau dihapus. Aplikasi memakainya sebagai kunci cache query sidebar
+# dan riwayat, sehingga cache hanya tidak berlaku saat datanya benar-benar berubah.
+_versions_lock = threading.Lock()
+_data_versions = {}
+_data_epoch = 0
+
+
+def _bump_data_version(user_ids=None):
+    global _data_epoch
+    with _versions_lock:
+        if user_ids is None:
+            _data_epoch += 1
+            return
+        for user_id in user_ids:
+            _data_versions[user_id] = _data_versions.get(user_id, 0) + 1
+
+
+def get_data_version(user_id):
+    with _versions_lock:
+        return _data_epoch, _data_versions.get(user_id, 0)
+
+
+# Ringkasan drift jendela [day_from, day_to): (stats per hari, histogram, jumlah per instansi)
+def get_drift_window(day_from, day_to):
+    with get_connection() as conn:
+        stats = conn.execute(SQL_DRIFT_STATS_WINDOW, (str(day_from), str(day_to))).fetchall()
+        histograms = conn.execute(SQL_DRIFT_HISTOGRAM_WINDOW, (str(day_from), str(day_to))).fetchall()
+        positives = conn.execute(SQL_DRIFT_POSITIVE_WINDOW, (str(day_from), str(day_to))).fetchall()
+    return stats, histograms, {instansi: (total, berisiko) for instansi, total, berisiko in positives}
+
+
+# Fungsi untuk mendapatkan riwayat terbaru
+def get_recent_predictions(user_id, limit=5):
+    with get_connection() as conn:
+        return conn.execute(SQL_RECENT_PREDICTIONS, (user_id, limit)).fetchall()
+
+
+# Fungsi untuk menyimpan hasil prediksi
+def insert_prediction(user_id, nama, gender, usia, berat_lahir, panjang_lahir,
+                      berat_sekarang, panjang_sekarang, asi, hasil_prediksi):
+    row, = _with_zscores([(
+        user_id, nama, gender, usia, berat_lahir, panjang_lahir,
+        berat_sekarang, panjang_sekarang, asi, hasil_prediksi
+    )])
+    with get_connection() as conn, conn:
+        cursor = conn.execute(SQL_INSERT_PREDICTION, row)
+        _record_drift(conn, [row], _today())
+    _bump_data_version([user_id])
+    return cursor.lastrowid
+
+
+# Simpan banyak hasil prediksi sekaligus dalam satu transaksi.
+# Setiap record berisi (nama, gender, usia, berat_lahir, panjang_lahir,
+# berat_sekarang, panjang_sekarang, asi, hasil_prediksi).
+def insert_predictions(user_id, records):
+    return insert_prediction_rows((user_id, *record) for record in records)
+
+
+# Simpan baris lengkap (user_id, nama, ..., hasil_prediksi) dari banyak user
+# dalam satu transaksi (dipakai write_queue untuk micro-batch)
+def insert_prediction_rows(rows):
+    rows = _with_zscores(list(rows))
+    if not rows:
+        return 0
+    with get_connection() as conn, conn:
+        cursor = conn.executemany(SQL_INSERT_PREDICTION, rows)
+        _record_drift(conn, rows, _today())
+    _bump_data_version({row[0] for row in rows})
+    return cursor.rowcount
+
+
+# Filter riwayat (nama, hasil, rentang tanggal) dalam bentuk klausa SQL + parameter
+def _history_filters(nama=None, hasil_prediksi=None, date_from=None, date_to=None):
+    clauses, params = [], []
+    if nama:
+        clauses.append("nama LIKE ? ESCAPE '\\'")
+        escaped = nama.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        params.append(f'%{escaped}%')
+    if hasil_prediksi:
+        clauses.append('hasil_prediksi = ?')
+        params.append(hasil_prediksi)
+    if date_from:
+        clauses.append('created_at >= ?')
+        params.append(str(date_from))
+    if date_to:
+        # date_to inklusif: ambil semua sebelum hari berikutnya
+        clauses.append("created_at < date(?, '+1 day')")
+        params.append(str(date_to))
+    return ''.join(f' AND {clause}' for clause in clauses), params
+
+
+# Query MATCH FTS5 untuk frasa (substring) apa adanya
+def _fts_phrase(text):
+    return '"' + text.replace('"', '""') + '"'
+
+
+# Potongan kata kunci untuk pencarian toleran salah ketik: satu huruf salah,
+# kurang atau lebih selalu menyisakan salah satu paruh kata kunci utuh
+def _fuzzy_pieces(query):
+    half = len(query) // 2
+    if half >= SEARCH_MIN_LENGTH:
+        return [query[:half], query[half:]]
+    return [query[i:i + SEARCH_MIN_LENGTH] for i in range(len(query) - SEARCH_MIN_LENGTH + 1)]
+
+
+def _trigrams(text):
+    text = text.lower()
+    return {text[i:i + SEARCH_MIN_LENGTH] for i in range(len(text) - SEARCH_MIN_LENGTH + 1)}
+
+
+# Cari riwayat pengukuran anak berdasarkan nama (substring, awalan diutamakan).
+# scope 'user' / 'instansi' membatasi ke scope_value (id user / nama instansi);
+# tanpa scope_value tidak ada hasil, bukan pencarian global. scope 'all' mencari
+# di semua instansi dan hanya boleh dipakai untuk admin.
+# Jika tidak ada yang cocok persis, dicoba pencarian toleran salah ketik.
+# Mengembalikan (daftar baris sesuai SEARCH_COLUMNS, True jika hasil fuzzy).
+def search_children(query, scope, scope_value=None, limit=SEARCH_LIMIT):
+    if scope not in SEARCH_SCOPES:
+        raise ValueError(f'Cakupan pencarian tidak dikenal: {scope!r}')
+    query = ' '.join((query or '').split())
+    if len(query) < SEARCH_MIN_LENGTH:
+        return [], False
+    if scope != 'all' and scope_value is None:
+        return [], False
+
+    scope_params = [] if scope == 'all' else [scope_value]
+    sql = SQL_SEARCH_CHILDREN.format(scope=SEARCH_SCOPES[scope])
+    escaped = query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+    with get_connection() as conn:
+        rows = conn.execute(sql, (_fts_phrase(query), *scope_params, f'{escaped}%', limit)).fetchall()
+        if rows or len(query) <= SEARCH_MIN_LENGTH:
+            return rows, False
+
+        # Kandidat fuzzy dibatasi FUZZY_CANDIDATES (diurutkan dengan aturan yang sama)
+        # karena skor trigram dihitung di Python
+        match = ' OR '.join(_fts_phrase(piece) for piece in _fuzzy_pieces(query))
+        candidates = conn.execute(sql, (match, *scope_params, f'{escaped}%', FUZZY_CANDIDATES)).fetchall()
+
+    # Skor = jumlah trigram kata kunci yang ada di nama
+    query_trigrams = _trigrams(query)
+    needed = max(len(query_trigrams) - FUZZY_MAX_MISSING, 1)
+    scores = {}
+    for row in candidates:
+        if row[0] not in scores:
+            scores[row[0]] = len(query_trigrams & _trigrams(row[0] or ''))
+    rows = [row for row in candidates if scores[row[0]] >= needed]
+    # Skor sama: nama yang diawali potongan pertama kata kunci lebih dulu (sort stabil)
+    prefix = query[:SEARCH_MIN_LENGTH].lower()
+    rows.sort(key=lambda row: (-scores[row[0]], not (row[0] or '').lower().startswith(prefix)))
+    return rows[:limit], True
+
+
+# Satu halaman riwayat prediksi dengan keyset pagination pada (created_at, id).
+# cursor adalah (created_at, id) baris terakhir halaman sebelumnya, None untuk halaman pertama.
+# Mengembalikan (daftar baris sesuai HISTORY_COLUMNS, cursor halaman berikutnya atau None).
+def get_prediction_history_page(user_id, page_size=50, cursor=None, nama=None,
+                                hasil_prediksi=None, date_from=None, date_to=None):
+    filters, params = _history_filters(nama, hasil_prediksi, date_from, date_to)
+    if cursor is not None:
+        filters += ' AND (created_at, id) < (?, ?)'
+        params.extend(cursor)
+
+    sql = SQL_PREDICTION_HISTORY_PAGE.format(filters=filters)
+    with get_connection() as conn:
+        rows = conn.execute(sql, (user_id, *params, page_size + 1)).fetchall()
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = (rows[-1][-1], rows[-1][0])
+    return [row[1:] for row in rows], next_cursor
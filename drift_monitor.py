@@ -0,0 +1,225 @@
+# Monitor drift input: apakah data anak yang diukur sekarang masih mirip dengan
+# distribusi data latih (Stunting_Dataset.csv)?
+#
+# Setiap batch insert ke prediksi_stunting diringkas di sini secara vektor
+# (jumlah, mean dan M2 Welford per fitur, histogram bin tetap, jumlah prediksi
+# berisiko per user), lalu database.py menambahkannya ke tabel drift_* per hari
+# dalam transaksi yang sama. Biaya per insert konstan dan laporan hanya membaca
+# tabel ringkasan harian, tanpa memindai prediksi_stunting.
+#
+# Laporan membandingkan jendela N hari terakhir dengan profil data latih:
+#   PSI  Population Stability Index pada bin yang dikelompokkan per desil data latih
+#   KS   statistik Kolmogorov-Smirnov dari CDF histogram bin halus
+# serta tingkat prediksi berisiko per instansi dibanding jendela sebelumnya.
+# Riwayat yang dihapus tidak mengurangi ringkasan: monitor mencatat aliran data
+# yang masuk, bukan isi tabel saat ini.
+import math
+import os
+import threading
+
+import numpy as np
+
+DRIFT_WINDOW_DAYS = int(os.environ.get('STUNTING_DRIFT_WINDOW_DAYS', 30))
+DRIFT_MIN_SAMPLES = int(os.environ.get('STUNTING_DRIFT_MIN_SAMPLES', 100))
+PSI_WARN = 0.1
+PSI_ALERT = 0.25
+PSI_GROUPS = 10
+KS_COEFFICIENT = 1.358  # nilai kritis KS dua sampel untuk alpha 0.05
+RATE_Z_ALERT = 3.0
+POSITIVE_LABEL = 'Berisiko stunting'
+
+# Bin tetap per fitur: (nilai awal, lebar bin, jumlah bin), mencakup batas input
+# form. Nilai di luar rentang masuk bin pertama/terakhir.
+FEATURE_BINS = {
+    'gender': (0, 1, 2),
+    'usia': (0, 1, 61),
+    'berat_lahir': (1.0, 0.1, 40),
+    'panjang_lahir': (30.0, 0.5, 60),
+    'berat_sekarang': (1.0, 0.25, 76),
+    'panjang_sekarang': (30.0, 1.0, 90),
+    'asi': (0, 1, 2)
+}
+FEATURES = list(FEATURE_BINS)
+CATEGORY_CODES = {
+    'gender': {'laki-laki': 0, 'male': 0, 'perempuan': 1, 'female': 1},
+    'asi': {'tidak': 0, 'no': 0, 'ya': 1, 'yes': 1}
+}
+# Posisi fitur dalam baris insert (user_id, nama, gender, usia, berat_lahir,
+# panjang_lahir, berat_sekarang, panjang_sekarang, asi, hasil_prediksi)
+ROW_POSITIONS = {'gender': 2, 'usia': 3, 'berat_lahir': 4, 'panjang_lahir': 5,
+                 'berat_sekarang': 6, 'panjang_sekarang': 7, 'asi': 8}
+DATASET_COLUMNS = {'gender': 'Gender', 'usia': 'Age', 'berat_lahir': 'Birth Weight', 'panjang_lahir': 'Birth Length',
+                   'berat_sekarang': 'Body Weight', 'panjang_sekarang': 'Body Length', 'asi': 'Breastfeeding'}
+
+
+def bin_index(feature, values):
+    start, width, count = FEATURE_BINS[feature]
+    return np.clip(np.floor((values - start) / width + 1e-9), 0, count - 1).astype(np.int64)
+
+
+def _encode(feature, values):
+    codes = CATEGORY_CODES.get(feature)
+    if codes is None:
+        return np.asarray(values, dtype=np.float64)
+    labels, inverse = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+    mapped = np.array([codes.get(label.strip().lower(), np.nan) for label in labels], dtype=np.float64)
+    return mapped[inverse.reshape(-1)]
+
+
+# Ringkas satu batch baris insert. Mengembalikan
+#   stats       [(fitur, n, mean, M2)]
+#   histograms  [(fitur, bin, jumlah)] untuk bin yang terisi
+#   positives   [(user_id, total, berisiko)]
+def summarize_batch(rows):
+    columns = list(zip(*rows))
+    stats, histograms = [], []
+    for feature in FEATURES:
+        values = _encode(feature, columns[ROW_POSITIONS[feature]])
+        values = values[~np.isnan(values)]
+        if not len(values):
+            continue
+        mean = float(values.mean())
+        stats.append((feature, len(values), mean, float(((values - mean) ** 2).sum())))
+        counts = np.bincount(bin_index(feature, values), minlength=FEATURE_BINS[feature][2])
+        histograms.extend((feature, int(b), int(counts[b])) for b in np.flatnonzero(counts))
+
+    user_ids, inverse = np.unique(np.asarray(columns[0]), return_inverse=True)
+    inverse = inverse.reshape(-1)
+    totals = np.bincount(inverse, minlength=len(user_ids))
+    positives = np.bincount(inverse, weights=np.asarray(columns[9]) == POSITIVE_LABEL, minlength=len(user_ids))
+    return stats, histograms, [
+        (user_id, int(total), int(positive)) for user_id, total, positive in zip(user_ids.tolist(), totals, positives)
+    ]
+
+
+# Gabungkan beberapa ringkasan (n, mean, M2) menjadi (n, mean, varians) (Chan dkk.)
+def merge_stats(parts):
+    n, mean, m2 = 0, 0.0, 0.0
+    for part_n, part_mean, part_m2 in parts:
+        if not part_n:
+            continue
+        delta = part_mean - mean
+        total = n + part_n
+        mean += delta * part_n / total
+        m2 += part_m2 + delta * delta * n * part_n / total
+        n = total
+    return n, mean, m2 / (n - 1) if n > 1 else 0.0
+
+
+_lock = threading.Lock()
+_reference = {}
+
+
+# Profil data latih dengan bin yang sama: n, mean, std, histogram, tingkat berisiko
+def reference_profile(dataset_path=None):
+    import predictor
+
+    dataset_path = dataset_path or predictor.DATASET_PATH
+    with _lock:
+        if dataset_path not in _reference:
+            dataset = predictor.load_dataset(dataset_path)
+            profile = {}
+            for feature in FEATURES:
+                values = dataset[DATASET_COLUMNS[feature]].to_numpy(dtype=np.float64)
+                values = values[~np.isnan(values)]
+                profile[feature] = {
+                    'n': len(values),
+                    'mean': float(values.mean()),
+                    'std': float(values.std(ddof=1)),
+                    'counts': np.bincount(bin_index(feature, values), minlength=FEATURE_BINS[feature][2])
+                }
+            profile['positive_rate'] = float(dataset[predictor.DATASET_TARGET].mean())
+            _reference[dataset_path] = profile
+        return _reference[dataset_path]
+
+
+# Kelompokkan bin halus menjadi PSI_GROUPS grup menurut desil data latih
+def _psi_groups(reference_counts):
+    if len(reference_counts) <= PSI_GROUPS:
+        return np.arange(len(reference_counts))
+    before = (np.cumsum(reference_counts) - reference_counts) / reference_counts.sum()
+    return np.minimum((before * PSI_GROUPS).astype(np.int64), PSI_GROUPS - 1)
+
+
+def psi(reference_counts, counts):
+    groups = _psi_groups(reference_counts)
+    expected = np.bincount(groups, weights=reference_counts)
+    actual = np.bincount(groups, weights=counts, minlength=len(expected))
+    expected = np.maximum(expected / expected.sum(), 1e-4)
+    actual = np.maximum(actual / actual.sum(), 1e-4)
+    return float(((actual - expected) * np.log(actual / expected)).sum())
+
+
+# Statistik KS dari histogram bin halus dan nilai kritisnya (alpha 0.05)
+def ks_statistic(reference_counts, counts):
+    n, m = reference_counts.sum(), counts.sum()
+    statistic = float(np.abs(np.cumsum(reference_counts) / n - np.cumsum(counts) / m).max())
+    return statistic, KS_COEFFICIENT * math.sqrt((n + m) / (n * m))
+
+
+# Laporan drift per fitur dari ringkasan harian jendela yang diminta.
+# stats_rows: [(fitur, n, mean, M2)] per hari; histogram_rows: [(fitur, bin, jumlah)]
+def feature_report(stats_rows, histogram_rows, reference=None):
+    reference = reference or reference_profile()
+    parts = {feature: [] for feature in FEATURES}
+    for feature, n, mean, m2 in stats_rows:
+        if feature in parts:
+            parts[feature].append((n, mean, m2))
+    counts = {feature: np.zeros(FEATURE_BINS[feature][2]) for feature in FEATURES}
+    for feature, b, count in histogram_rows:
+        if feature in counts:
+            counts[feature][b] += count
+
+    report = []
+    for feature in FEATURES:
+        n, mean, variance = merge_stats(parts[feature])
+        ref = reference[feature]
+        row = {
+            'fitur': feature,
+            'n': n,
+            'mean': mean if n else None,
+            'std': math.sqrt(variance) if n > 1 else None,
+            'mean_latih': ref['mean'],
+            'std_latih': ref['std'],
+            'psi': None,
+            'ks': None,
+            'ks_kritis': None,
+            'status': 'data kurang'
+        }
+        if n >= DRIFT_MIN_SAMPLES:
+            row['psi'] = psi(ref['counts'], counts[feature])
+            row['ks'], row['ks_kritis'] = ks_statistic(ref['counts'], counts[feature])
+            if row['psi'] >= PSI_ALERT:
+                row['status'] = 'drift'
+            elif row['psi'] >= PSI_WARN or row['ks'] > row['ks_kritis']:
+                row['status'] = 'waspada'
+            else:
+                row['status'] = 'stabil'
+        report.append(row)
+    return report, counts
+
+
+# Tingkat prediksi berisiko per instansi: jendela sekarang dibanding jendela
+# sebelumnya (uji z dua proporsi). current/previous: {instansi: (total, berisiko)}
+def positive_rate_report(current, previous):
+    report = []
+    for instansi in sorted(current):
+        total, positive = current[instansi]
+        previous_total, previous_positive = previous.get(instansi, (0, 0))
+        rate = positive / total if total else None
+        previous_rate = previous_positive / previous_total if previous_total else None
+        z = None
+        if total and previous_total:
+            pooled = (positive + previous_positive) / (total + previous_total)
+            spread = math.sqrt(pooled * (1 - pooled) * (1 / total + 1 / previous_total))
+            z = (rate - previous_rate) / spread if spread else 0.0
+        report.append({
+            'instansi': instansi,
+            'total': total,
+            'tingkat_berisiko': rate,
+            'total_sebelumnya': previous_total,
+            'tingkat_sebelumnya': previous_rate,
+            'z': z,
+            'status': 'berubah' if z is not None and abs(z) >= RATE_Z_ALERT and total >= DRIFT_MIN_SAMPLES else 'stabil'
+        })
+    return report
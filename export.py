@@ -0,0 +1,152 @@
+import csv
+import io
+import tempfile
+
+from database import get_connection
+
+EXPORT_CHUNK_SIZE = 10000
+
+# Kolom hasil export (urutan sama dengan file CSV/Parquet)
+EXPORT_COLUMNS = ['id', 'username', 'instansi', 'nama', 'gender', 'usia', 'berat_lahir', 'panjang_lahir',
+                  'berat_sekarang', 'panjang_sekarang', 'asi', 'hasil_prediksi', 'zscore_pb_u', 'zscore_bb_u',
+                  'created_at']
+
+SQL_EXPORT = '''
+SELECT p.id, u.username, u.instansi, p.nama, p.gender, p.usia, p.berat_lahir, p.panjang_lahir,
+       p.berat_sekarang, p.panjang_sekarang, p.asi, p.hasil_prediksi, p.zscore_pb_u, p.zscore_bb_u,
+       p.created_at
+FROM prediksi_stunting p
+LEFT JOIN users u ON u.id = p.user_id
+WHERE 1 = 1{filters}
+ORDER BY p.id
+'''
+SQL_EXPORT_COUNT = '''
+SELECT COUNT(*)
+FROM prediksi_stunting p
+LEFT JOIN users u ON u.id = p.user_id
+WHERE 1 = 1{filters}
+'''
+
+
+def _export_filters(user_id=None, instansi=None, date_from=None, date_to=None):
+    clauses, params = [], []
+    if user_id is not None:
+        clauses.append('p.user_id = ?')
+        params.append(user_id)
+    if instansi:
+        clauses.append('u.instansi = ?')
+        params.append(instansi)
+    if date_from:
+        clauses.append('p.created_at >= ?')
+        params.append(str(date_from))
+    if date_to:
+        clauses.append("p.created_at < date(?, '+1 day')")
+        params.append(str(date_to))
+    return ''.join(f' AND {clause}' for clause in clauses), params
+
+
+# Baca prediksi per potongan (chunk) dengan cursor, tanpa memuat seluruh tabel ke memori
+def iter_prediction_chunks(user_id=None, instansi=None, date_from=None, date_to=None,
+                           chunk_size=EXPORT_CHUNK_SIZE):
+    filters, params = _export_filters(user_id, instansi, date_from, date_to)
+    with get_connection() as conn:
+        cursor = conn.execute(SQL_EXPORT.format(filters=filters), params)
+        try:
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            cursor.close()
+
+
+# Jumlah baris yang akan diekspor dengan filter yang sama
+def count_export_rows(user_id=None, instansi=None, date_from=None, date_to=None):
+    filters, params = _export_filters(user_id, instansi, date_from, date_to)
+    with get_connection() as conn:
+        return conn.execute(SQL_EXPORT_COUNT.format(filters=filters), params).fetchone()[0]
+
+
+# Export CSV sebagai potongan bytes UTF-8 (header lalu satu potongan per chunk),
+# untuk dikirim langsung sebagai respons HTTP tanpa file sementara
+def iter_csv(chunk_size=EXPORT_CHUNK_SIZE, **filters):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for rows in iter_prediction_chunks(chunk_size=chunk_size, **filters):
+        writer.writerows(rows)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+# Tulis export CSV ke file yang sudah dibuka (mode teks). Mengembalikan jumlah baris.
+def write_csv(output, chunk_size=EXPORT_CHUNK_SIZE, **filters):
+    writer = csv.writer(output)
+    writer.writerow(EXPORT_COLUMNS)
+    total = 0
+    for rows in iter_prediction_chunks(chunk_size=chunk_size, **filters):
+        writer.writerows(rows)
+        total += len(rows)
+    return total
+
+
+def _parquet_schema():
+    import pyarrow as pa
+
+    return pa.schema([
+        ('id', pa.int64()),
+        ('username', pa.string()),
+        ('instansi', pa.string()),
+        ('nama', pa.string()),
+        ('gender', pa.string()),
+        ('usia', pa.int64()),
+        ('berat_lahir', pa.float64()),
+        ('panjang_lahir', pa.float64()),
+        ('berat_sekarang', pa.float64()),
+        ('panjang_sekarang', pa.float64()),
+        ('asi', pa.string()),
+        ('hasil_prediksi', pa.string()),
+        ('zscore_pb_u', pa.float64()),
+        ('zscore_bb_u', pa.float64()),
+        ('created_at', pa.string())
+    ])
+
+
+# Tulis export Parquet (satu row group per chunk). Membutuhkan pyarrow.
+def write_parquet(output, chunk_size=EXPORT_CHUNK_SIZE, **filters):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _parquet_schema()
+    total = 0
+    with pq.ParquetWriter(output, schema, compression='snappy') as writer:
+        for rows in iter_prediction_chunks(chunk_size=chunk_size, **filters):
+            columns = list(zip(*rows))
+            writer.write_batch(pa.RecordBatch.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                schema=schema
+            ))
+            total += len(rows)
+    return total
+
+
+# Buat file export di file sementara dan kembalikan file tersebut (posisi di awal).
+# Dipakai untuk tombol download agar pembuatan file tetap per chunk. Catatan:
+# st.download_button tetap membaca seluruh file ke memori server, jadi aplikasi
+# membatasi ukurannya (EXPORT_UI_MAX_ROWS); export besar lewat api.py /export
+# atau manage.py export yang benar-benar streaming.
+def export_to_tempfile(file_format='csv', chunk_size=EXPORT_CHUNK_SIZE, **filters):
+    output = tempfile.TemporaryFile()
+    if file_format == 'parquet':
+        write_parquet(output, chunk_size=chunk_size, **filters)
+    else:
+        text = io.TextIOWrapper(output, encoding='utf-8', newline='')
+        write_csv(text, chunk_size=chunk_size, **filters)
+        text.flush()
+        text.detach()
+    output.seek(0)
+    return output
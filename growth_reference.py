@@ -0,0 +1,114 @@
+# Z-score standar pertumbuhan WHO 2006 (metode LMS) untuk anak 0-60 bulan:
+#   PB/U  panjang/tinggi badan menurut umur (length/height-for-age)
+#   BB/U  berat badan menurut umur (weight-for-age)
+#
+# Tabel LMS resmi WHO Child Growth Standards disalin ke who_lms.csv (indikator,
+# jenis kelamin 0=laki-laki 1=perempuan, bulan, L, M, S) dan dimuat sekali ke
+# array NumPy berbentuk (2, 61, 3), sehingga z-score satu baris maupun ratusan
+# ribu baris dihitung dengan operasi vektor.
+#
+# Baris lhfa bulan 0-23 adalah referensi panjang badan (diukur berbaring) dan
+# bulan 24-60 tinggi badan (berdiri). Form aplikasi mencatat panjang badan, jadi
+# untuk usia >= 24 bulan nilainya dikurangi 0,7 cm sesuai pedoman WHO.
+import os
+import threading
+
+import numpy as np
+
+WHO_LMS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'who_lms.csv')
+MAX_AGE_MONTHS = 60
+HEIGHT_FROM_MONTH = 24
+RECUMBENT_ADJUSTMENT_CM = 0.7
+SEX_CODES = {'laki-laki': 0, 'perempuan': 1}
+
+# Kategori status gizi (Permenkes No. 2 Tahun 2020): (batas atas z-score, batas
+# atas termasuk, label). Contoh PB/U: < -3 sangat pendek, -3 s.d. < -2 pendek,
+# -2 s.d. +3 normal, > +3 tinggi.
+PB_U_CATEGORIES = [(-3, False, 'Sangat pendek'), (-2, False, 'Pendek'), (3, True, 'Normal'), (np.inf, True, 'Tinggi')]
+BB_U_CATEGORIES = [(-3, False, 'Berat badan sangat kurang'), (-2, False, 'Berat badan kurang'), (1, True, 'Normal'),
+                   (np.inf, True, 'Risiko berat badan lebih')]
+
+_lock = threading.Lock()
+_tables = None
+
+
+# Baca who_lms.csv menjadi {indikator: array (jenis kelamin, bulan, [L, M, S])}
+def load_tables(path=WHO_LMS_PATH):
+    data = np.genfromtxt(path, delimiter=',', names=True, dtype=None, encoding='utf-8')
+    tables = {}
+    for indicator in np.unique(data['indicator']):
+        rows = data[data['indicator'] == indicator]
+        table = np.full((2, MAX_AGE_MONTHS + 1, 3), np.nan)
+        table[rows['sex'], rows['month']] = np.column_stack([rows['L'], rows['M'], rows['S']])
+        tables[str(indicator)] = table
+    return tables
+
+
+def get_tables():
+    global _tables
+    if _tables is None:
+        with _lock:
+            if _tables is None:
+                _tables = load_tables()
+    return _tables
+
+
+# Z-score LMS untuk array jenis kelamin (0/1), usia (bulan) dan nilai ukur.
+# Usia di luar 0-60 bulan atau nilai tidak valid menghasilkan NaN.
+def lms_zscore(indicator, sex, age, value, restricted=False):
+    table = get_tables()[indicator]
+    sex = np.asarray(sex, dtype=np.int64)
+    age = np.asarray(age, dtype=np.float64)
+    value = np.asarray(value, dtype=np.float64)
+
+    month = np.rint(age)
+    valid = (month >= 0) & (month <= MAX_AGE_MONTHS) & ((sex == 0) | (sex == 1)) & (value > 0)
+    lms = table[np.where(valid, sex, 0), np.where(valid, month, 0).astype(np.int64)]
+    L, M, S = lms[..., 0], lms[..., 1], lms[..., 2]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = np.where(L == 0, np.log(value / M) / S, ((value / M) ** L - 1) / (L * S))
+        if restricted:
+            # BB/U: di luar +-3 SD WHO memakai jarak SD ke-3 secara linear
+            # (distribusi berat badan miring, lihat WHO Anthro technical report)
+            def at(sd):
+                return M * (1 + L * S * sd) ** (1 / L)
+
+            sd3pos, sd3neg = at(3), at(-3)
+            z = np.where(z > 3, 3 + (value - sd3pos) / (sd3pos - at(2)), z)
+            z = np.where(z < -3, -3 + (value - sd3neg) / (at(-2) - sd3neg), z)
+    return np.where(valid, z, np.nan)
+
+
+# Z-score PB/U; panjang badan berbaring dikonversi ke tinggi untuk usia >= 24 bulan
+def length_for_age(sex, age, length, recumbent=True):
+    age = np.asarray(age, dtype=np.float64)
+    length = np.asarray(length, dtype=np.float64)
+    if recumbent:
+        length = np.where(np.rint(age) >= HEIGHT_FROM_MONTH, length - RECUMBENT_ADJUSTMENT_CM, length)
+    return lms_zscore('lhfa', sex, age, length)
+
+
+def weight_for_age(sex, age, weight):
+    return lms_zscore('wfa', sex, age, weight, restricted=True)
+
+
+# Kode jenis kelamin dari label form/database ('Laki-laki'/'Perempuan'), -1 jika tidak dikenal
+def sex_codes(genders):
+    labels, inverse = np.unique(np.asarray(genders, dtype=str), return_inverse=True)
+    codes = np.array([SEX_CODES.get(label.strip().lower(), -1) for label in labels], dtype=np.int64)
+    return codes[inverse.reshape(-1)]
+
+
+# (z PB/U, z BB/U) dibulatkan 2 desimal untuk banyak baris sekaligus
+def compute_zscores(sex, age, weight, length):
+    zscore_pb_u = np.round(length_for_age(sex, age, length), 2)
+    zscore_bb_u = np.round(weight_for_age(sex, age, weight), 2)
+    return zscore_pb_u, zscore_bb_u
+
+
+# Label kategori status gizi untuk array z-score (None untuk NaN)
+def categorize(zscores, categories):
+    zscores = np.asarray(zscores, dtype=np.float64)
+    conditions = [zscores <= high if inclusive else zscores < high for high, inclusive, _ in categories]
+    return np.select(conditions, [label for _, _, label in categories], default=None)
@@ -0,0 +1,157 @@
+# Tabel lookup hasil prediksi untuk seluruh ruang input form prediksi.
+#
+# Form membatasi input pada grid tetap (usia 0-60 per 1, berat/panjang per 0.1,
+# gender dan ASI biner). Threshold forest membagi setiap fitur menjadi interval;
+# semua nilai grid dalam interval yang sama selalu mengambil cabang yang sama di
+# setiap node, sehingga cukup satu prediksi per kombinasi interval (sel).
+# Prediksi tiap sel dihitung dengan menelusuri setiap tree sebagai kotak
+# (box) interval, lalu disimpan sebagai bit dalam file .npz yang ringkas.
+# Prediksi form menjadi lookup O(1); input di luar grid kembali ke forest.
+import time
+
+import numpy as np
+
+LOOKUP_PATH = 'stunting_lookup.npz'
+FORMAT_VERSION = 1
+
+# Grid input form per fitur (urutan sesuai fitur model): (min, max, step)
+FORM_GRID = [
+    (0, 1, 1),          # gender_num
+    (0, 60, 1),         # usia
+    (1.0, 5.0, 0.1),    # berat_lahir
+    (30.0, 60.0, 0.1),  # panjang_lahir
+    (1.0, 20.0, 0.1),   # berat_sekarang
+    (30.0, 120.0, 0.1), # panjang_sekarang
+    (0, 1, 1)           # asi_num
+]
+
+
+# Nilai grid dibulatkan ke 2 desimal agar sama persis dengan float dari form (mis. 3.1)
+def grid_values(low, high, step):
+    count = int(round((high - low) / step)) + 1
+    return np.array([round(low + i * step, 2) for i in range(count)], dtype=np.float64)
+
+
+# Bangun tabel dari FusedForest (threshold sudah di ruang input mentah)
+def build_table(forest, model_version):
+    start = time.perf_counter()
+    feature = np.asarray(forest.feature)
+    is_leaf = forest.is_leaf
+    threshold = forest.threshold
+
+    # Per fitur: peta indeks grid -> indeks sel, dan nilai perwakilan tiap sel
+    cell_of, representatives = [], []
+    for f, (low, high, step) in enumerate(FORM_GRID):
+        values = grid_values(low, high, step)
+        bounds = np.unique(threshold[~is_leaf & (feature == f)])
+        interval = np.searchsorted(bounds, values, side='left')
+        _, first, cells = np.unique(interval, return_index=True, return_inverse=True)
+        cell_of.append(cells.astype(np.uint16))
+        representatives.append(values[first])
+    shape = tuple(len(rep) for rep in representatives)
+
+    # Jumlah sel yang masuk cabang kiri untuk setiap node internal
+    split = np.zeros(len(feature), dtype=np.int64)
+    for f, rep in enumerate(representatives):
+        nodes = np.flatnonzero(~is_leaf & (feature == f))
+        split[nodes] = np.searchsorted(rep, threshold[nodes], side='right')
+
+    labels = np.empty(shape, dtype=bool)
+    positive = list(forest.classes_).index(1)
+    # Diproses per gender agar memori akumulator tetap kecil
+    for gender in range(shape[0]):
+        tile_low = [gender] + [0] * (len(shape) - 1)
+        tile_high = [gender + 1] + list(shape[1:])
+        proba = np.zeros((1,) + shape[1:] + (len(forest.classes_),), dtype=np.float64)
+        for root in forest.roots:
+            stack = [(int(root), tile_low, tile_high)]
+            while stack:
+                node, low, high = stack.pop()
+                if is_leaf[node]:
+                    box = tuple(slice(lo - tlo, hi - tlo) for lo, hi, tlo in zip(low, high, tile_low))
+                    proba[box] += forest.value[node]
+                    continue
+                f, k = feature[node], split[node]
+                if low[f] < k:
+                    left_high = list(high)
+                    left_high[f] = min(high[f], k)
+                    stack.append((int(forest.children[node, 0]), low, left_high))
+                if high[f] > k:
+                    right_low = list(low)
+                    right_low[f] = max(low[f], k)
+                    stack.append((int(forest.children[node, 1]), right_low, high))
+        proba /= len(forest.roots)
+        labels[gender] = forest.classes_.take(np.argmax(proba, axis=-1))[0] == forest.classes_[positive]
+
+    table = {
+        'format_version': np.int64(FORMAT_VERSION),
+        'model_version': np.str_(model_version),
+        'grid': np.array(FORM_GRID, dtype=np.float64),
+        'shape': np.array(shape, dtype=np.int64),
+        'bits': np.packbits(labels.ravel())
+    }
+    for f, cells in enumerate(cell_of):
+        table[f'cell_of_{f}'] = cells
+    return table, time.perf_counter() - start
+
+
+def save_table(table, path=LOOKUP_PATH):
+    np.savez_compressed(path, **table)
+
+
+# Tabel lookup yang sudah dimuat ke memori
+class LookupTable:
+    def __init__(self, data):
+        self.model_version = str(data['model_version'])
+        self.grid = [tuple(row) for row in data['grid']]
+        self.shape = tuple(int(n) for n in data['shape'])
+        self.cell_of = [data[f'cell_of_{f}'] for f in range(len(self.shape))]
+        self.bits = data['bits']
+        self.strides = np.cumprod((self.shape[1:] + (1,))[::-1])[::-1]
+
+    # Indeks sel untuk tuple fitur, None jika bukan tepat nilai grid form
+    def cell_index(self, features):
+        index = 0
+        for value, (low, high, step), cells, stride in zip(features, self.grid, self.cell_of, self.strides):
+            i = int(round((value - low) / step))
+            if i < 0 or i >= len(cells) or round(low + i * step, 2) != value:
+                return None
+            index += int(cells[i]) * int(stride)
+        return index
+
+    # Prediksi (0/1) dari tabel, None jika input tidak tercakup
+    def lookup(self, features):
+        index = self.cell_index(features)
+        if index is None:
+            return None
+        return int((self.bits[index >> 3] >> (7 - (index & 7))) & 1)
+
+    def report(self):
+        grid_points = 1
+        for cells in self.cell_of:
+            grid_points *= len(cells)
+        cells = int(np.prod(self.shape))
+        return {
+            'model_version': self.model_version,
+            'grid_points': grid_points,
+            'cells': cells,
+            'shape': self.shape,
+            'bytes_in_memory': int(self.bits.nbytes + sum(c.nbytes for c in self.cell_of))
+        }
+
+
+def load_table(path=LOOKUP_PATH):
+    with np.load(path) as data:
+        if int(data['format_version']) != FORMAT_VERSION:
+            raise ValueError(f"Versi format tabel lookup tidak didukung: {int(data['format_version'])}")
+        return LookupTable({name: data[name] for name in data.files})
+
+
+# Acak titik-titik grid form (dalam bentuk tuple fitur) untuk pengecekan
+def sample_grid(count, seed=0):
+    rng = np.random.default_rng(seed)
+    columns = []
+    for low, high, step in FORM_GRID:
+        values = grid_values(low, high, step)
+        columns.append(values[rng.integers(0, len(values), count)])
+    return np.column_stack(columns)
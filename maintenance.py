@@ -0,0 +1,75 @@
+# Pemeliharaan database di latar belakang: purge retensi dan incremental vacuum.
+#
+# Jika STUNTING_RETENTION_DAYS > 0, prediksi yang lebih tua dari jumlah hari
+# tersebut dihapus per chunk setiap STUNTING_MAINTENANCE_INTERVAL detik, lalu
+# halaman kosong dikembalikan ke sistem file dengan PRAGMA incremental_vacuum
+# (database lama perlu "python manage.py maintenance enable-vacuum" sekali).
+# Sesi login yang kedaluwarsa ikut dibersihkan dan segmen indeks pencarian nama
+# (FTS5) digabung sedikit demi sedikit.
+import os
+import threading
+import time
+
+import database
+
+RETENTION_DAYS = int(os.environ.get('STUNTING_RETENTION_DAYS', 0))
+MAINTENANCE_INTERVAL = float(os.environ.get('STUNTING_MAINTENANCE_INTERVAL', 3600))
+
+_lock = threading.Lock()
+_thread = None
+_status = {
+    'retention_days': RETENTION_DAYS,
+    'interval_seconds': MAINTENANCE_INTERVAL,
+    'runs': 0,
+    'last_run_at': None,
+    'last_seconds': 0.0,
+    'last_purged': 0,
+    'last_freed_pages': 0,
+    'total_purged': 0,
+    'last_error': None
+}
+
+
+# Satu putaran pemeliharaan; dipakai thread latar belakang dan manage.py
+def run_maintenance(retention_days=RETENTION_DAYS):
+    start = time.perf_counter()
+    purged = database.purge_old_predictions(retention_days) if retention_days > 0 else 0
+    freed = database.incremental_vacuum()
+    database.purge_sessions(time.time())
+    database.merge_search_index()
+    with _lock:
+        _status['runs'] += 1
+        _status['last_run_at'] = time.time()
+        _status['last_seconds'] = time.perf_counter() - start
+        _status['last_purged'] = purged
+        _status['last_freed_pages'] = freed
+        _status['total_purged'] += purged
+        _status['last_error'] = None
+    return purged, freed
+
+
+# Jalankan pemeliharaan berkala di thread latar belakang (sekali per proses)
+def start_maintenance(interval=MAINTENANCE_INTERVAL):
+    global _thread
+    if _thread is not None:
+        return
+    with _lock:
+        if _thread is not None:
+            return
+
+        def run():
+            while True:
+                time.sleep(interval)
+                try:
+                    run_maintenance()
+                except Exception as e:
+                    with _lock:
+                        _status['last_error'] = str(e)
+
+        _thread = threading.Thread(target=run, name='db-maintenance', daemon=True)
+        _thread.start()
+
+
+def get_maintenance_status():
+    with _lock:
+        return dict(_status)
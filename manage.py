@@ -0,0 +1,366 @@
+# Perintah pemeliharaan aplikasi prediksi stunting.
+# Contoh:
+#   python manage.py stats verify
+#   python manage.py stats rebuild
+#   python manage.py rollup verify
+#   python manage.py search check
+#   python manage.py maintenance purge --days 730
+#   python manage.py maintenance enable-vacuum
+#   python manage.py export --format parquet --instansi "Puskesmas A" --from 2025-01-01 -o laporan.parquet
+#   python manage.py model export
+#   python manage.py model check
+#   python manage.py train --candidates 30 --folds 5 --install
+#   python manage.py lookup build
+#   python manage.py lookup check --samples 200000
+#   python manage.py drift report --days 30
+import argparse
+import sys
+import warnings
+from datetime import datetime, timedelta, timezone
+
+import database
+import drift_monitor
+import export
+import maintenance
+import lookup_table
+import model_artifact
+import model_registry
+import prediction_cache
+import predictor
+import train
+
+
+def cmd_stats(args):
+    database.init_database()
+
+    if args.action == 'rebuild':
+        users = database.rebuild_user_statistics()
+        print(f'Ringkasan statistik dihitung ulang untuk {users} user.')
+        return 0
+
+    drift = database.verify_user_statistics()
+    if not drift:
+        print('Ringkasan statistik sesuai dengan prediksi_stunting.')
+        return 0
+
+    print(f'Ditemukan selisih pada {len(drift)} user:')
+    for row in drift:
+        print(
+            f"  user_id={row['user_id']}: total {row['total_prediksi']} (aktual {row['total_prediksi_aktual']}), "
+            f"berisiko {row['berisiko']} (aktual {row['berisiko_aktual']})"
+        )
+    print('Jalankan "python manage.py stats rebuild" untuk memperbaiki.')
+    return 1
+
+
+def cmd_rollup(args):
+    database.init_database()
+
+    if args.action == 'rebuild':
+        rows = database.rebuild_instansi_rollup()
+        print(f'Rollup instansi dihitung ulang ({rows} baris).')
+        return 0
+
+    drift = database.verify_instansi_rollup()
+    if not drift:
+        print('Rollup instansi sesuai dengan prediksi_stunting.')
+        return 0
+
+    print(f'Ditemukan selisih pada {len(drift)} kelompok:')
+    for row in drift[:50]:
+        print(
+            f"  {row['instansi']} {row['bulan']} {row['gender']} usia {row['kelompok_usia']} "
+            f"{row['hasil_prediksi']}: {row['jumlah']} (aktual {row['jumlah_aktual']})"
+        )
+    print('Jalankan "python manage.py rollup rebuild" untuk memperbaiki.')
+    return 1
+
+
+def cmd_search(args):
+    database.init_database()
+
+    if args.action == 'rebuild':
+        rows = database.rebuild_search_index()
+        print(f'Indeks pencarian nama dibangun ulang ({rows} baris).')
+        return 0
+
+    if database.verify_search_index():
+        print('Indeks pencarian nama sesuai dengan prediksi_stunting.')
+        return 0
+    print('Indeks pencarian nama tidak sinkron. Jalankan "python manage.py search rebuild" untuk memperbaiki.')
+    return 1
+
+
+def print_progress(deleted, total):
+    print(f'\r  {deleted}/{total} baris dihapus', end='', flush=True)
+
+
+def cmd_maintenance(args):
+    database.init_database()
+
+    if args.action == 'purge':
+        days = args.days if args.days is not None else maintenance.RETENTION_DAYS
+        if days <= 0:
+            print('Retensi tidak di-set (gunakan --days atau STUNTING_RETENTION_DAYS).')
+            return 1
+        purged = database.purge_old_predictions(days, chunk_size=args.chunk_size, progress=print_progress)
+        print(f'\n{purged} prediksi lebih tua dari {days} hari dihapus.')
+        print(f'{database.incremental_vacuum()} halaman dikembalikan ke sistem file.')
+    elif args.action == 'vacuum':
+        print(f'{database.incremental_vacuum()} halaman dikembalikan ke sistem file.')
+    elif args.action == 'enable-vacuum':
+        print('Menjalankan VACUUM penuh (database terkunci selama proses)...')
+        database.enable_incremental_vacuum()
+
+    storage = database.get_storage_stats()
+    print(
+        f"Ukuran database {storage['size_bytes']:,} byte, {storage['free_bytes']:,} byte kosong, "
+        f"auto_vacuum={storage['auto_vacuum']}"
+    )
+    return 0
+
+
+def cmd_export(args):
+    user_id = None
+    if args.user:
+        user_id = database.get_user_id(args.user)
+        if user_id is None:
+            print(f'User "{args.user}" tidak ditemukan.')
+            return 1
+
+    filters = {
+        'user_id': user_id,
+        'instansi': args.instansi,
+        'date_from': args.date_from,
+        'date_to': args.date_to
+    }
+    if args.format == 'parquet':
+        total = export.write_parquet(args.output, chunk_size=args.chunk_size, **filters)
+    else:
+        with open(args.output, 'w', encoding='utf-8', newline='') as f:
+            total = export.write_csv(f, chunk_size=args.chunk_size, **filters)
+    print(f'{total} baris diekspor ke {args.output}.')
+    return 0
+
+
+# Bandingkan backend artefak datar dengan sklearn pada seluruh baris dataset
+def check_model_parity(classifier, scaler, directory, dataset_path):
+    import numpy as np
+
+    X = predictor.load_dataset(dataset_path)[predictor.DATASET_FEATURES].to_numpy(dtype=np.float64)
+    expected_proba = classifier.predict_proba(scaler.transform(X))
+    expected = classifier.predict(scaler.transform(X))
+
+    backends = {
+        'flat': model_artifact.load_artifact(directory),
+        'fused': model_artifact.load_fused(directory)
+    }
+    ok = True
+    for name, (engine, engine_scaler) in backends.items():
+        proba = engine.predict_proba(engine_scaler.transform(X))
+        prediction = engine.predict(engine_scaler.transform(X))
+        proba_diff = int((proba != expected_proba).any(axis=1).sum())
+        prediction_diff = int((prediction != expected).sum())
+        status = 'OK' if proba_diff == 0 and prediction_diff == 0 else 'BERBEDA'
+        print(f'{name:6s} {status}: {len(X)} baris, {prediction_diff} prediksi berbeda, '
+              f'{proba_diff} probabilitas tidak identik bit-per-bit')
+        ok = ok and status == 'OK'
+    return ok
+
+
+def cmd_model(args):
+    warnings.filterwarnings("ignore", category=UserWarning, module="sklearn")
+    classifier = model_registry.load_artifact(args.model)
+    scaler = model_registry.load_artifact(args.scaler)
+
+    if args.action == 'check':
+        return 0 if check_model_parity(classifier, scaler, args.output, args.dataset) else 1
+
+    meta = model_artifact.export_artifact(classifier, scaler, args.output,
+                                          sources={'model': args.model, 'scaler': args.scaler})
+    print(
+        f"Artefak versi {meta['version']} ditulis ke {args.output}/ "
+        f"({meta['n_estimators']} tree, {meta['n_nodes']} node)."
+    )
+    return 0
+
+
+def cmd_train(args):
+    warnings.filterwarnings("ignore", category=UserWarning, module="sklearn")
+    if args.candidates > 1 and args.folds < 2:
+        print('Pencarian hyperparameter butuh --folds minimal 2.')
+        return 1
+
+    manifest, classifier, scaler = train.train(
+        args.dataset, candidates=args.candidates, folds=args.folds, eta=args.eta, workers=args.workers, seed=args.seed
+    )
+    directory, manifest = train.save_models(manifest, classifier, scaler, args.models_dir)
+    print(f"Model versi {manifest['version']} disimpan di {directory}/ (manifest.json berisi metrik).")
+    if args.install:
+        train.install_models(directory)
+        print(f'Dipasang sebagai model aktif ({model_registry.MODEL_PATH}, {model_registry.SCALER_PATH}, '
+              f'{model_registry.ARTIFACT_DIR}/). Jalankan "python manage.py lookup build" untuk tabel lookup baru.')
+    return 0
+
+
+def print_lookup_report(table, path):
+    import os
+
+    report = table.report()
+    print(f"Tabel lookup {path} untuk model versi {report['model_version']}:")
+    print(f"  {report['grid_points']:,} kombinasi input form tercakup dalam {report['cells']:,} sel "
+          f"(sel per fitur: {' x '.join(str(n) for n in report['shape'])})")
+    print(f"  ukuran file {os.path.getsize(path):,} byte, {report['bytes_in_memory']:,} byte di memori")
+
+
+# Bandingkan tabel lookup dengan classifier yang sedang dipakai aplikasi
+def check_lookup_table(table, samples, dataset_path):
+    import numpy as np
+
+    classifier, scaler = model_registry.load_model()
+    if table.model_version != model_registry.get_model_version():
+        print(f'Tabel dibangun untuk model {table.model_version}, model aktif '
+              f'{model_registry.get_model_version()}: tabel tidak akan dipakai.')
+        return False
+
+    dataset = predictor.load_dataset(dataset_path)[predictor.DATASET_FEATURES].to_numpy(dtype=np.float64)
+    ok = True
+    for name, X in [('grid acak', lookup_table.sample_grid(samples)), ('dataset', dataset)]:
+        lookups = [table.lookup(prediction_cache.cache_key(row)) for row in X]
+        covered = np.array([value is not None for value in lookups])
+        expected = predictor.predict_batch(classifier, scaler, X[covered])
+        actual = np.array([value for value in lookups if value is not None], dtype=np.int64)
+        diff = int((actual != expected).sum())
+        status = 'OK' if diff == 0 else 'BERBEDA'
+        print(f'{name:10s} {status}: {int(covered.sum())}/{len(X)} baris tercakup tabel '
+              f'({covered.mean():.1%}), {diff} prediksi berbeda')
+        ok = ok and diff == 0
+    return ok
+
+
+def cmd_lookup(args):
+    warnings.filterwarnings("ignore", category=UserWarning, module="sklearn")
+
+    if args.action == 'build':
+        forest, _ = model_artifact.load_fused(args.artifact)
+        table, elapsed = lookup_table.build_table(forest, forest.meta['version'])
+        lookup_table.save_table(table, args.output)
+        print(f'Tabel lookup dibangun dalam {elapsed:.1f} detik.')
+
+    table = lookup_table.load_table(args.output)
+    print_lookup_report(table, args.output)
+    if args.action == 'report':
+        return 0
+    return 0 if check_lookup_table(table, args.samples, args.dataset) else 1
+
+
+def format_number(value, spec):
+    return '-' if value is None else format(value, spec)
+
+
+def cmd_drift(args):
+    database.init_database()
+
+    day_to = datetime.now(timezone.utc).date() + timedelta(days=1)
+    day_from = day_to - timedelta(days=args.days)
+    stats_rows, histogram_rows, current_rates = database.get_drift_window(day_from, day_to)
+    _, _, previous_rates = database.get_drift_window(day_from - timedelta(days=args.days), day_from)
+    report, _ = drift_monitor.feature_report(stats_rows, histogram_rows, drift_monitor.reference_profile(args.dataset))
+    rate_report = drift_monitor.positive_rate_report(current_rates, previous_rates)
+
+    print(f'Drift input {day_from} s.d. {day_to - timedelta(days=1)} (UTC) dibanding data latih:')
+    for row in report:
+        print(
+            f"  {row['fitur']:<17} n={row['n']:<8} mean {format_number(row['mean'], '.2f')} "
+            f"(latih {row['mean_latih']:.2f}) PSI {format_number(row['psi'], '.3f')} "
+            f"KS {format_number(row['ks'], '.3f')}/{format_number(row['ks_kritis'], '.3f')}  {row['status']}"
+        )
+    print('Tingkat prediksi berisiko per instansi (jendela sebelumnya):')
+    for row in rate_report:
+        print(
+            f"  {row['instansi']}: {format_number(row['tingkat_berisiko'], '.1%')} dari {row['total']} "
+            f"({format_number(row['tingkat_sebelumnya'], '.1%')} dari {row['total_sebelumnya']}) "
+            f"z {format_number(row['z'], '.2f')}  {row['status']}"
+        )
+
+    alerts = [row for row in report if row['status'] == 'drift'] + [row for row in rate_report if row['status'] == 'berubah']
+    return 1 if alerts else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Perintah pemeliharaan aplikasi prediksi stunting')
+    parser.add_argument('--db', default=database.DB_PATH, help='Lokasi file database SQLite')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    stats = subparsers.add_parser('stats', help='Verifikasi/bangun ulang tabel user_prediction_stats')
+    stats.add_argument('action', choices=['verify', 'rebuild'])
+    stats.set_defaults(func=cmd_stats)
+
+    rollup = subparsers.add_parser('rollup', help='Verifikasi/bangun ulang tabel instansi_rollup (dashboard instansi)')
+    rollup.add_argument('action', choices=['verify', 'rebuild'])
+    rollup.set_defaults(func=cmd_rollup)
+
+    search = subparsers.add_parser('search', help='Verifikasi/bangun ulang indeks FTS5 pencarian nama anak')
+    search.add_argument('action', choices=['check', 'rebuild'])
+    search.set_defaults(func=cmd_search)
+
+    maintenance_parser = subparsers.add_parser('maintenance', help='Purge retensi, incremental vacuum, status penyimpanan')
+    maintenance_parser.add_argument('action', choices=['purge', 'vacuum', 'enable-vacuum', 'status'])
+    maintenance_parser.add_argument('--days', type=int, help='Hapus prediksi lebih tua dari N hari')
+    maintenance_parser.add_argument('--chunk-size', type=int, default=database.DELETE_CHUNK_SIZE)
+    maintenance_parser.set_defaults(func=cmd_maintenance)
+
+    export_parser = subparsers.add_parser('export', help='Export riwayat prediksi ke CSV/Parquet secara bertahap')
+    export_parser.add_argument('-o', '--output', required=True, help='File tujuan')
+    export_parser.add_argument('--format', choices=['csv', 'parquet'], default='csv')
+    export_parser.add_argument('--user', help='Username petugas')
+    export_parser.add_argument('--instansi', help='Nama instansi')
+    export_parser.add_argument('--from', dest='date_from', help='Tanggal awal (YYYY-MM-DD)')
+    export_parser.add_argument('--to', dest='date_to', help='Tanggal akhir, inklusif (YYYY-MM-DD)')
+    export_parser.add_argument('--chunk-size', type=int, default=export.EXPORT_CHUNK_SIZE)
+    export_parser.set_defaults(func=cmd_export)
+
+    model = subparsers.add_parser('model', help='Export artefak array datar / cek kesamaan hasil dengan sklearn')
+    model.add_argument('action', choices=['export', 'check'])
+    model.add_argument('--model', default=model_registry.MODEL_PATH)
+    model.add_argument('--scaler', default=model_registry.SCALER_PATH)
+    model.add_argument('-o', '--output', default=model_artifact.ARTIFACT_DIR, help='Folder artefak')
+    model.add_argument('--dataset', default=predictor.DATASET_PATH, help='Dataset untuk cek kesamaan')
+    model.set_defaults(func=cmd_model)
+
+    train_parser = subparsers.add_parser('train', help='Latih ulang model (dedup, CV paralel, pencarian hyperparameter)')
+    train_parser.add_argument('--dataset', default=predictor.DATASET_PATH)
+    train_parser.add_argument('--candidates', type=int, default=1, help='Jumlah kandidat hyperparameter (1 = parameter notebook)')
+    train_parser.add_argument('--folds', type=int, default=5, help='Fold cross-validation (0 = tanpa CV)')
+    train_parser.add_argument('--eta', type=int, default=3, help='Hanya 1/eta kandidat terbaik lanjut ke tahap berikutnya')
+    train_parser.add_argument('--workers', type=int, help='Jumlah proses (default: semua core)')
+    train_parser.add_argument('--seed', type=int, default=0)
+    train_parser.add_argument('--models-dir', default=train.MODELS_DIR, help='Folder artefak berversi')
+    train_parser.add_argument('--install', action='store_true', help='Pasang hasil sebagai model aktif aplikasi')
+    train_parser.set_defaults(func=cmd_train)
+
+    lookup = subparsers.add_parser('lookup', help='Bangun/cek tabel lookup prediksi untuk input form')
+    lookup.add_argument('action', choices=['build', 'check', 'report'])
+    lookup.add_argument('--artifact', default=model_artifact.ARTIFACT_DIR, help='Folder artefak model datar')
+    lookup.add_argument('-o', '--output', default=lookup_table.LOOKUP_PATH, help='File tabel lookup')
+    lookup.add_argument('--samples', type=int, default=100000, help='Jumlah titik grid acak untuk cek')
+    lookup.add_argument('--dataset', default=predictor.DATASET_PATH, help='Dataset untuk cek kesamaan')
+    lookup.set_defaults(func=cmd_lookup)
+
+    drift = subparsers.add_parser('drift', help='Laporan drift input dan tingkat berisiko per instansi')
+    drift.add_argument('action', choices=['report'])
+    drift.add_argument('--days', type=int, default=drift_monitor.DRIFT_WINDOW_DAYS, help='Panjang jendela (hari)')
+    drift.add_argument('--dataset', default=predictor.DATASET_PATH, help='Dataset latih sebagai referensi')
+    drift.set_defaults(func=cmd_drift)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    database.configure_database(args.db)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,319 @@
+# Format artefak model yang ringkas: RandomForest dan StandardScaler disimpan
+# sebagai array NumPy datar (.npy) dalam satu folder, lalu dibaca dengan mmap
+# sehingga cepat dimuat, tidak bergantung versi sklearn, dan halaman memorinya
+# bisa dipakai bersama oleh beberapa proses worker.
+#
+# Isi folder artefak:
+#   meta.json        informasi model (jumlah fitur, kelas, versi, sha256 pickle
+#                    sumber, dsb.)
+#   feature.npy      indeks fitur per node (-2 untuk leaf)
+#   threshold.npy    threshold per node (ruang fitur yang sudah dinormalisasi)
+#   left.npy         indeks global anak kiri (-1 untuk leaf)
+#   right.npy        indeks global anak kanan (-1 untuk leaf)
+#   value.npy        probabilitas kelas per node (sudah dinormalisasi per tree)
+#   roots.npy        indeks node akar tiap tree
+#   scaler_mean.npy  mean StandardScaler
+#   scaler_scale.npy scale StandardScaler
+import hashlib
+import json
+import os
+
+import numpy as np
+
+ARTIFACT_DIR = 'stunting_model'
+FORMAT_VERSION = 1
+ARRAY_NAMES = ['feature', 'threshold', 'left', 'right', 'value', 'roots', 'scaler_mean', 'scaler_scale']
+
+
+# Ratakan semua tree dari RandomForestClassifier ke array node global
+def flatten_forest(classifier):
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset = 0
+    for estimator in classifier.estimators_:
+        tree = estimator.tree_
+        left = tree.children_left.astype(np.int32)
+        right = tree.children_right.astype(np.int32)
+        is_leaf = left == -1
+        left = np.where(is_leaf, -1, left + offset).astype(np.int32)
+        right = np.where(is_leaf, -1, right + offset).astype(np.int32)
+
+        # Probabilitas per tree dinormalisasi dengan cara yang sama seperti
+        # DecisionTreeClassifier.predict_proba
+        value = tree.value[:, 0, :].astype(np.float64)
+        normalizer = value.sum(axis=1)
+        normalizer[normalizer == 0.0] = 1.0
+        value = value / normalizer[:, np.newaxis]
+
+        features.append(tree.feature.astype(np.int32))
+        thresholds.append(tree.threshold.astype(np.float64))
+        lefts.append(left)
+        rights.append(right)
+        values.append(value)
+        roots.append(offset)
+        offset += tree.node_count
+
+    return {
+        'feature': np.concatenate(features),
+        'threshold': np.concatenate(thresholds),
+        'left': np.concatenate(lefts),
+        'right': np.concatenate(rights),
+        'value': np.concatenate(values),
+        'roots': np.asarray(roots, dtype=np.int64)
+    }
+
+
+# sha256 isi file (dipakai untuk mengikat artefak ke pickle sumbernya)
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# Simpan classifier + scaler ke folder artefak. Mengembalikan isi meta.json.
+# sources berisi path pickle asal {'model': ..., 'scaler': ...}; sha256-nya
+# dicatat agar model_registry bisa menolak artefak jika pickle diganti.
+def export_artifact(classifier, scaler, directory=ARTIFACT_DIR, sources=None):
+    arrays = flatten_forest(classifier)
+    arrays['scaler_mean'] = np.asarray(scaler.mean_, dtype=np.float64)
+    arrays['scaler_scale'] = np.asarray(scaler.scale_, dtype=np.float64)
+
+    digest = hashlib.sha256()
+    for name in ARRAY_NAMES:
+        digest.update(np.ascontiguousarray(arrays[name]).tobytes())
+
+    meta = {
+        'format_version': FORMAT_VERSION,
+        'version': digest.hexdigest()[:12],
+        'n_features': int(classifier.n_features_in_),
+        'n_estimators': len(classifier.estimators_),
+        'n_nodes': int(len(arrays['feature'])),
+        'max_depth': int(max(estimator.tree_.max_depth for estimator in classifier.estimators_)),
+        'classes': np.asarray(classifier.classes_).tolist(),
+        'feature_names': [str(name) for name in getattr(scaler, 'feature_names_in_', [])],
+        'source_sha256': {name: file_sha256(path) for name, path in (sources or {}).items()}
+    }
+
+    os.makedirs(directory, exist_ok=True)
+    for name in ARRAY_NAMES:
+        np.save(os.path.join(directory, f'{name}.npy'), np.ascontiguousarray(arrays[name]))
+    # meta.json ditulis terakhir, jadi keberadaannya menandakan artefak lengkap
+    with open(os.path.join(directory, 'meta.json'), 'w') as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+# Scaler pengganti StandardScaler.transform dengan operasi yang identik
+class FlatScaler:
+    def __init__(self, mean, scale):
+        self.mean_ = mean
+        self.scale_ = scale
+
+    def transform(self, X):
+        X = np.array(X, dtype=np.float64)
+        X -= self.mean_
+        X /= self.scale_
+        return X
+
+
+# Mesin inferensi RandomForest murni NumPy di atas array node datar.
+# Antarmukanya mengikuti classifier sklearn (classes_, predict, predict_proba)
+# dan hasilnya identik dengan RandomForestClassifier.
+class FlatForest:
+    def __init__(self, arrays, meta):
+        self.meta = meta
+        self.feature = arrays['feature']
+        self.threshold = arrays['threshold']
+        self.left = arrays['left']
+        self.right = arrays['right']
+        self.value = arrays['value']
+        self.roots = arrays['roots']
+        self.classes_ = np.asarray(meta['classes'])
+        self.n_features_in_ = meta['n_features']
+
+    def _validate(self, X):
+        # Sama seperti sklearn: input tree dikonversi ke float32
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f'Input harus berbentuk (n, {self.n_features_in_})')
+        if not np.isfinite(X).all():
+            raise ValueError('Input mengandung NaN atau inf')
+        return X
+
+    # Indeks leaf yang dicapai setiap baris pada satu tree
+    def _apply_tree(self, X, root):
+        node = np.full(len(X), root, dtype=np.int64)
+        active = np.arange(len(X))
+        while active.size:
+            current = node[active]
+            internal = self.left[current] != -1
+            active = active[internal]
+            current = current[internal]
+            go_left = X[active, self.feature[current]] <= self.threshold[current]
+            node[active] = np.where(go_left, self.left[current], self.right[current])
+        return node
+
+    def predict_proba(self, X):
+        X = self._validate(X)
+        proba = np.zeros((len(X), len(self.classes_)), dtype=np.float64)
+        # Dijumlahkan berurutan per tree seperti RandomForestClassifier
+        for root in self.roots:
+            proba += self.value[self._apply_tree(X, root)]
+        proba /= len(self.roots)
+        return proba
+
+    def predict(self, X):
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
+
+
+# Kunci uint64 yang urutannya sama dengan urutan nilai float64
+def _float_to_key(values):
+    bits = np.asarray(values, dtype=np.float64).view(np.uint64)
+    negative = (bits >> np.uint64(63)).astype(bool)
+    return np.where(negative, ~bits, bits | np.uint64(1 << 63))
+
+
+def _key_to_float(keys):
+    positive = (keys >> np.uint64(63)).astype(bool)
+    bits = np.where(positive, keys & np.uint64((1 << 63) - 1), ~keys)
+    return bits.view(np.float64)
+
+
+# Hitung threshold di ruang input mentah untuk setiap node internal.
+# Di sklearn sebuah baris ke kiri jika float32((x - mean) / scale) <= threshold.
+# Fungsi tersebut monoton naik terhadap x, jadi ada batas b (float64) sehingga
+# x <= b  <=>  kondisi di atas terpenuhi. b dicari dengan bisection pada urutan
+# bit float64, sehingga hasilnya tepat sama (bukan pendekatan t * scale + mean).
+def fuse_thresholds(feature, threshold, mean, scale):
+    internal = feature >= 0
+    t = threshold[internal]
+    m = mean[feature[internal]]
+    s = scale[feature[internal]]
+
+    def goes_left(keys):
+        x = _key_to_float(keys)
+        return ((x - m) / s).astype(np.float32) <= t
+
+    # Invariant: goes_left(lo) benar, goes_left(hi) salah
+    lo = np.full(len(t), _float_to_key(-np.inf), dtype=np.uint64)
+    hi = np.full(len(t), _float_to_key(np.inf), dtype=np.uint64)
+    one = np.uint64(1)
+    with np.errstate(invalid='ignore', over='ignore'):
+        while True:
+            pending = hi - lo > one
+            if not pending.any():
+                break
+            mid = lo + (hi - lo) // np.uint64(2)
+            left = goes_left(mid)
+            lo = np.where(pending & left, mid, lo)
+            hi = np.where(pending & ~left, mid, hi)
+
+    fused = np.full(len(threshold), np.inf)
+    fused[internal] = _key_to_float(lo)
+    return fused
+
+
+# Identitas: dipakai bersama FusedForest karena normalisasi sudah dilebur ke threshold
+class IdentityScaler:
+    def transform(self, X):
+        return np.asarray(X, dtype=np.float64)
+
+
+# Backend inferensi cepat: semua tree dievaluasi sekaligus dan StandardScaler
+# dilebur ke threshold, sehingga input mentah langsung dibandingkan.
+# Hasil predict/predict_proba identik bit-per-bit dengan sklearn.
+class FusedForest:
+    CHUNK_SIZE = 1024
+    # Pasangan (baris, tree) yang sudah di leaf dibuang setiap beberapa level
+    COMPACT_EVERY = 4
+
+    def __init__(self, forest, mean, scale):
+        self.meta = forest.meta
+        self.classes_ = forest.classes_
+        self.n_features_in_ = forest.n_features_in_
+        self.roots = np.asarray(forest.roots, dtype=np.int32)
+        self.value = np.asarray(forest.value)
+
+        feature = np.asarray(forest.feature)
+        self.is_leaf = feature < 0
+        self.feature = np.where(self.is_leaf, 0, feature).astype(np.intp)
+        # Leaf menunjuk ke dirinya sendiri sehingga traversal bisa diteruskan tanpa cabang
+        self.threshold = fuse_thresholds(feature, np.asarray(forest.threshold), mean, scale)
+        node_ids = np.arange(len(feature), dtype=np.int32)
+        self.children = np.stack([
+            np.where(self.is_leaf, node_ids, forest.left),
+            np.where(self.is_leaf, node_ids, forest.right)
+        ], axis=1).astype(np.int32)
+
+    def _validate(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f'Input harus berbentuk (n, {self.n_features_in_})')
+        if not np.isfinite(X).all():
+            raise ValueError('Input mengandung NaN atau inf')
+        return np.ascontiguousarray(X)
+
+    # Leaf untuk setiap pasangan (baris, tree), semua tree diproses sekaligus
+    def _apply(self, X):
+        n_trees = len(self.roots)
+        node = np.tile(self.roots, len(X))
+        row_offset = np.repeat(np.arange(len(X), dtype=np.intp) * X.shape[1], n_trees)
+        flat_X = X.ravel()
+        active = np.arange(len(node), dtype=np.intp)
+        level = 0
+        while active.size:
+            current = node[active]
+            go_right = flat_X[row_offset[active] + self.feature[current]] > self.threshold[current]
+            current = self.children[current, go_right.view(np.int8)]
+            node[active] = current
+            level += 1
+            if level % self.COMPACT_EVERY == 0:
+                active = active[~self.is_leaf[current]]
+        return node.reshape(len(X), n_trees)
+
+    def predict_proba(self, X):
+        X = self._validate(X)
+        proba = np.zeros((len(X), len(self.classes_)), dtype=np.float64)
+        for start in range(0, len(X), self.CHUNK_SIZE):
+            leaves = self._apply(X[start:start + self.CHUNK_SIZE])
+            chunk = proba[start:start + self.CHUNK_SIZE]
+            # Dijumlahkan berurutan per tree seperti RandomForestClassifier
+            for tree in range(leaves.shape[1]):
+                chunk += self.value[leaves[:, tree]]
+        proba /= len(self.roots)
+        return proba
+
+    def predict(self, X):
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
+
+
+def artifact_exists(directory=ARTIFACT_DIR):
+    return os.path.exists(os.path.join(directory, 'meta.json'))
+
+
+def read_meta(directory=ARTIFACT_DIR):
+    with open(os.path.join(directory, 'meta.json')) as f:
+        return json.load(f)
+
+
+# Muat artefak (default dengan mmap agar halaman memori bisa dibagi antar proses).
+# Mengembalikan (classifier, scaler) yang bisa langsung menggantikan hasil pickle.
+def load_artifact(directory=ARTIFACT_DIR, mmap=True):
+    meta = read_meta(directory)
+    if meta.get('format_version') != FORMAT_VERSION:
+        raise ValueError(f"Versi format artefak tidak didukung: {meta.get('format_version')}")
+
+    arrays = {
+        name: np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r' if mmap else None)
+        for name in ARRAY_NAMES
+    }
+    scaler = FlatScaler(np.asarray(arrays['scaler_mean']), np.asarray(arrays['scaler_scale']))
+    return FlatForest(arrays, meta), scaler
+
+
+# Muat artefak sebagai FusedForest. Scaler yang dikembalikan adalah identitas
+# karena normalisasi sudah termasuk di dalam threshold.
+def load_fused(directory=ARTIFACT_DIR):
+    forest, scaler = load_artifact(directory)
+    return FusedForest(forest, scaler.mean_, scaler.scale_), IdentityScaler()
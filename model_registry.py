@@ -0,0 +1,228 @@
+import hashlib
+import os
+import pickle
+import threading
+import time
+
+import lookup_table
+import model_artifact
+
+MODEL_PATH = 'stunting.sav'
+SCALER_PATH = 'scaler.sav'
+ARTIFACT_DIR = model_artifact.ARTIFACT_DIR
+LOOKUP_PATH = lookup_table.LOOKUP_PATH
+
+# Format/backend model yang dipakai:
+#   'auto'   artefak datar dengan backend fused jika ada dan dibuat dari
+#            stunting.sav + scaler.sav yang sekarang, selain itu pickle
+#   'fused'  artefak datar, semua tree sekaligus + scaler dilebur ke threshold
+#   'flat'   artefak datar, evaluasi per tree
+#   'pickle' stunting.sav + scaler.sav (sklearn)
+MODEL_FORMAT = os.environ.get('STUNTING_MODEL_FORMAT', 'auto')
+RESOLVE_ATTEMPTS = 5
+
+# Registry artefak model per proses, dikunci dengan path + mtime + ukuran file
+_lock = threading.Lock()
+_registry = {}
+_metrics = {}
+# Nilai turunan isi file (sha256 pickle, meta.json), dihitung ulang jika file berubah
+_derived = {}
+
+
+def _file_key(path):
+    stat = os.stat(path)
+    return (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+
+def _new_metrics():
+    return {
+        'loads': 0,
+        'hits': 0,
+        'last_load_seconds': 0.0,
+        'total_load_seconds': 0.0,
+        'size_bytes': 0,
+        'version': None,
+        'loaded_at': None
+    }
+
+
+def _load_pickle(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    return pickle.loads(data), hashlib.sha256(data).hexdigest()[:12]
+
+
+def _load_flat(meta_path):
+    classifier, scaler = model_artifact.load_artifact(os.path.dirname(meta_path))
+    return (classifier, scaler), classifier.meta['version']
+
+
+def _load_fused(meta_path):
+    classifier, scaler = model_artifact.load_fused(os.path.dirname(meta_path))
+    return (classifier, scaler), classifier.meta['version']
+
+
+def _load_lookup(path):
+    table = lookup_table.load_table(path)
+    return table, table.model_version
+
+
+def _derive_cached(path, compute):
+    key = _file_key(path)
+    entry = _derived.get((key[0], compute))
+    if entry is None or entry[0] != key:
+        entry = (key, compute(path))
+        _derived[(key[0], compute)] = entry
+    return entry[1]
+
+
+def _read_meta(meta_path):
+    return model_artifact.read_meta(os.path.dirname(meta_path))
+
+
+# Muat objek melalui loader, hanya dimuat ulang jika file kunci berubah.
+# name membedakan beberapa objek yang dibangun dari file yang sama.
+def _load_cached(path, loader, name=None):
+    key = _file_key(path)
+    name = name or key[0]
+    entry = _registry.get(name)
+    if entry is not None and entry['key'] == key:
+        with _lock:
+            _metrics[name]['hits'] += 1
+        return entry['object']
+
+    with _lock:
+        # Cek ulang setelah mendapat lock, mungkin thread lain sudah memuat
+        entry = _registry.get(name)
+        if entry is not None and entry['key'] == key:
+            _metrics[name]['hits'] += 1
+            return entry['object']
+
+        start = time.perf_counter()
+        obj, version = loader(path)
+        elapsed = time.perf_counter() - start
+
+        _registry[name] = {'key': key, 'object': obj, 'version': version}
+
+        metrics = _metrics.setdefault(name, _new_metrics())
+        metrics['loads'] += 1
+        metrics['last_load_seconds'] = elapsed
+        metrics['total_load_seconds'] += elapsed
+        metrics['size_bytes'] = key[2]
+        metrics['version'] = version
+        metrics['loaded_at'] = time.time()
+        return obj
+
+
+# Fungsi untuk memuat artefak pickle, hanya dibaca ulang jika file berubah
+def load_artifact(path, name=None):
+    return _load_cached(path, _load_pickle, name)
+
+
+# Fungsi untuk memuat artefak model datar (lihat model_artifact.py)
+def load_flat_model(directory=ARTIFACT_DIR, name=None):
+    return _load_cached(os.path.join(directory, 'meta.json'), _load_flat, name)
+
+
+# Artefak datar dengan backend fused (threshold sudah termasuk normalisasi)
+def load_fused_model(directory=ARTIFACT_DIR, name=None):
+    meta_path = os.path.join(directory, 'meta.json')
+    return _load_cached(meta_path, _load_fused, name=name or os.path.abspath(meta_path) + ':fused')
+
+
+# Tabel lookup prediksi form (lihat lookup_table.py), None jika belum dibangun
+def load_lookup_table(path=LOOKUP_PATH):
+    if not os.path.exists(path):
+        return None
+    return _load_cached(path, _load_lookup)
+
+
+# Apakah artefak datar dibuat dari pickle yang ada di disk sekarang (sha256 di
+# meta.json). Pickle yang tidak ada dilewati, sehingga deploy yang hanya berisi
+# artefak tetap jalan; artefak lama tanpa source_sha256 dianggap tidak cocok.
+def artifact_matches_sources(artifact_dir=ARTIFACT_DIR, model_path=MODEL_PATH, scaler_path=SCALER_PATH):
+    recorded = _derive_cached(os.path.join(artifact_dir, 'meta.json'), _read_meta).get('source_sha256') or {}
+    for name, path in [('model', model_path), ('scaler', scaler_path)]:
+        if os.path.exists(path) and recorded.get(name) != _derive_cached(path, model_artifact.file_sha256):
+            return False
+    return True
+
+
+# realpath pickle, scaler dan folder artefak dalam satu snapshot. Setelah
+# "manage.py train --install" ketiganya symlink lewat models/active; jika symlink
+# itu ditukar di antara resolusi, hasilnya menunjuk ke folder versi berbeda dan
+# resolusi diulang, sehingga yang dimuat selalu satu set yang sama.
+def _resolve_paths(model_path, scaler_path, artifact_dir):
+    for _ in range(RESOLVE_ATTEMPTS):
+        paths = [os.path.realpath(path) for path in (model_path, scaler_path, artifact_dir)]
+        linked = {os.path.dirname(real) for path, real in zip((model_path, scaler_path, artifact_dir), paths)
+                  if os.path.islink(path)}
+        if len(linked) <= 1:
+            break
+    return paths
+
+
+# Backend yang dipakai sesuai MODEL_FORMAT: 'fused', 'flat' atau 'pickle'.
+# Artefak yang tidak cocok dengan pickle-nya tidak pernah dipakai: mode 'auto'
+# kembali ke pickle, mode 'fused'/'flat' menolak dengan ValueError.
+def get_backend(artifact_dir=ARTIFACT_DIR, model_path=MODEL_PATH, scaler_path=SCALER_PATH):
+    if MODEL_FORMAT == 'pickle':
+        return 'pickle'
+    if model_artifact.artifact_exists(artifact_dir) and artifact_matches_sources(artifact_dir, model_path, scaler_path):
+        return 'fused' if MODEL_FORMAT == 'auto' else MODEL_FORMAT
+    if MODEL_FORMAT == 'auto':
+        return 'pickle'
+    raise ValueError(
+        f'Artefak {artifact_dir}/ tidak ada atau tidak dibuat dari {model_path} + {scaler_path}; '
+        'jalankan "python manage.py model export"'
+    )
+
+
+# Fungsi untuk memuat classifier dan scaler sekaligus. File dibaca dari path
+# aslinya tetapi dicatat di registry dengan path yang diminta, jadi pergantian
+# versi lewat symlink menggantikan entri lama.
+def load_model(model_path=MODEL_PATH, scaler_path=SCALER_PATH, artifact_dir=ARTIFACT_DIR):
+    real_model, real_scaler, real_artifact = _resolve_paths(model_path, scaler_path, artifact_dir)
+    backend = get_backend(real_artifact, real_model, real_scaler)
+    meta_name = os.path.abspath(os.path.join(artifact_dir, 'meta.json'))
+    if backend == 'fused':
+        return load_fused_model(real_artifact, name=meta_name + ':fused')
+    if backend == 'flat':
+        return load_flat_model(real_artifact, name=meta_name)
+    classifier = load_artifact(real_model, name=os.path.abspath(model_path))
+    scaler = load_artifact(real_scaler, name=os.path.abspath(scaler_path))
+    return classifier, scaler
+
+
+# Versi model (hash isi file) yang sedang dimuat, None jika belum dimuat
+def get_model_version(model_path=MODEL_PATH, scaler_path=SCALER_PATH, artifact_dir=ARTIFACT_DIR):
+    real_model, real_scaler, real_artifact = _resolve_paths(model_path, scaler_path, artifact_dir)
+    backend = get_backend(real_artifact, real_model, real_scaler)
+    meta_path = os.path.abspath(os.path.join(artifact_dir, 'meta.json'))
+    if backend == 'fused':
+        names = [meta_path + ':fused']
+    elif backend == 'flat':
+        names = [meta_path]
+    else:
+        names = [os.path.abspath(model_path), os.path.abspath(scaler_path)]
+
+    versions = []
+    for name in names:
+        entry = _registry.get(name)
+        if entry is None:
+            return None
+        versions.append(entry['version'])
+    return '-'.join(versions)
+
+
+# Metrik waktu muat per artefak
+def get_load_metrics():
+    with _lock:
+        return {path: dict(metrics) for path, metrics in _metrics.items()}
+
+
+# Kosongkan registry (misalnya untuk memaksa muat ulang)
+def clear_registry():
+    with _lock:
+        _registry.clear()
+        _derived.clear()
@@ -0,0 +1,137 @@
+# Hashing password dengan KDF ber-salt (scrypt atau PBKDF2 dari hashlib).
+#
+# Perhitungan KDF sengaja mahal, jadi dijalankan di pool thread terbatas
+# (hashlib melepas GIL selama scrypt/PBKDF2) agar lonjakan login tidak
+# memakai lebih banyak core dari yang diizinkan dan sesi lain tetap jalan.
+# Format hash yang disimpan:
+#   scrypt$<n>$<r>$<p>$<salt hex>$<hash hex>
+#   pbkdf2_sha256$<iterasi>$<salt hex>$<hash hex>
+# Hash SHA-256 lama (64 karakter hex tanpa salt) masih bisa diverifikasi dan
+# diganti dengan hash baru saat login berhasil (lihat database.login_user).
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+KDF_ALGORITHM = os.environ.get('STUNTING_KDF', 'scrypt')
+SCRYPT_N = int(os.environ.get('STUNTING_SCRYPT_N', 2 ** 14))
+SCRYPT_R = int(os.environ.get('STUNTING_SCRYPT_R', 8))
+SCRYPT_P = int(os.environ.get('STUNTING_SCRYPT_P', 1))
+PBKDF2_ITERATIONS = int(os.environ.get('STUNTING_PBKDF2_ITERATIONS', 600000))
+SALT_BYTES = 16
+HASH_BYTES = 32
+
+# Jumlah KDF yang berjalan bersamaan, dan batas antrean sebelum login ditolak
+KDF_WORKERS = int(os.environ.get('STUNTING_KDF_WORKERS', os.cpu_count() or 1))
+KDF_MAX_PENDING = int(os.environ.get('STUNTING_KDF_MAX_PENDING', 64))
+KDF_QUEUE_TIMEOUT_SECONDS = 10
+
+
+class HashingBusyError(RuntimeError):
+    pass
+
+
+def _scrypt(password, salt, n, r, p):
+    return hashlib.scrypt(password.encode('utf-8'), salt=salt, n=n, r=r, p=p,
+                          maxmem=256 * n * r + 1024 * 1024, dklen=HASH_BYTES)
+
+
+def _pbkdf2(password, salt, iterations):
+    return hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, iterations, dklen=HASH_BYTES)
+
+
+def _legacy_sha256(password):
+    return hashlib.sha256(str.encode(password)).hexdigest()
+
+
+def is_legacy_hash(hashed):
+    return '$' not in hashed
+
+
+# Hitung hash baru dengan algoritma dan biaya saat ini (langsung di thread pemanggil)
+def compute_hash(password, algorithm=None):
+    algorithm = algorithm or KDF_ALGORITHM
+    salt = secrets.token_bytes(SALT_BYTES)
+    if algorithm == 'scrypt':
+        derived = _scrypt(password, salt, SCRYPT_N, SCRYPT_R, SCRYPT_P)
+        return f'scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${salt.hex()}${derived.hex()}'
+    if algorithm == 'pbkdf2_sha256':
+        derived = _pbkdf2(password, salt, PBKDF2_ITERATIONS)
+        return f'pbkdf2_sha256${PBKDF2_ITERATIONS}${salt.hex()}${derived.hex()}'
+    raise ValueError(f'Algoritma KDF tidak dikenal: {algorithm}')
+
+
+# Verifikasi password terhadap hash tersimpan (format baru maupun SHA-256 lama)
+def check_hash(password, hashed):
+    if is_legacy_hash(hashed):
+        return hmac.compare_digest(_legacy_sha256(password), hashed)
+
+    parts = hashed.split('$')
+    if parts[0] == 'scrypt' and len(parts) == 6:
+        n, r, p = (int(value) for value in parts[1:4])
+        derived = _scrypt(password, bytes.fromhex(parts[4]), n, r, p)
+        return hmac.compare_digest(derived.hex(), parts[5])
+    if parts[0] == 'pbkdf2_sha256' and len(parts) == 4:
+        derived = _pbkdf2(password, bytes.fromhex(parts[2]), int(parts[1]))
+        return hmac.compare_digest(derived.hex(), parts[3])
+    return False
+
+
+# Hash pengganti untuk login dengan username yang tidak ada (atau hash SHA-256
+# lama yang murah): format dan biaya sama dengan hash baru, jadi verifikasinya
+# sama mahal, tetapi tidak pernah cocok dengan password apa pun
+def dummy_hash():
+    if KDF_ALGORITHM == 'scrypt':
+        return f'scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${"00" * SALT_BYTES}${"00" * HASH_BYTES}'
+    return f'pbkdf2_sha256${PBKDF2_ITERATIONS}${"00" * SALT_BYTES}${"00" * HASH_BYTES}'
+
+
+# True jika hash perlu diganti: format lama atau biaya berbeda dari konfigurasi
+def needs_rehash(hashed):
+    if is_legacy_hash(hashed):
+        return True
+    parts = hashed.split('$')
+    if KDF_ALGORITHM == 'scrypt':
+        return parts[:4] != ['scrypt', str(SCRYPT_N), str(SCRYPT_R), str(SCRYPT_P)]
+    return parts[:2] != ['pbkdf2_sha256', str(PBKDF2_ITERATIONS)]
+
+
+# Pool thread terbatas untuk KDF, antrean dibatasi dengan semaphore
+class HashingService:
+    def __init__(self, workers=KDF_WORKERS, max_pending=KDF_MAX_PENDING):
+        self.workers = workers
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='kdf')
+        self._slots = threading.BoundedSemaphore(workers + max_pending)
+
+    def _run(self, func, *args):
+        if not self._slots.acquire(timeout=KDF_QUEUE_TIMEOUT_SECONDS):
+            raise HashingBusyError('Server sedang sibuk memproses login, silakan coba lagi')
+        try:
+            future = self._executor.submit(func, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
+
+    def hash_password(self, password):
+        return self._run(compute_hash, password)
+
+    def verify_password(self, password, hashed):
+        return self._run(check_hash, password, hashed)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+
+hashing_service = HashingService()
+
+
+def hash_password(password):
+    return hashing_service.hash_password(password)
+
+
+def verify_password(password, hashed):
+    return hashing_service.verify_password(password, hashed)
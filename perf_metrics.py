@@ -0,0 +1,126 @@
+# Instrumentasi waktu fase-fase utama aplikasi (muat model, query DB, prediksi, ...).
+#
+# Setiap fase menyimpan durasi terakhir dalam ring buffer berukuran tetap,
+# sehingga p50/p95/p99 selalu dihitung dari RING_SIZE pengukuran terbaru.
+# Jika STUNTING_METRICS_FILE di-set, metrik ditulis berkala dalam format teks
+# Prometheus ke file tersebut (misalnya untuk textfile collector node_exporter).
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+RING_SIZE = int(os.environ.get('STUNTING_METRICS_RING_SIZE', 1024))
+METRICS_FILE = os.environ.get('STUNTING_METRICS_FILE')
+METRICS_DUMP_INTERVAL = float(os.environ.get('STUNTING_METRICS_DUMP_INTERVAL', 15))
+QUANTILES = [0.5, 0.95, 0.99]
+
+
+# Buffer berupa list biasa agar modul ini (diimpor halaman login) tidak memuat numpy
+class RingBuffer:
+    def __init__(self, size=RING_SIZE):
+        self.values = [0.0] * size
+        self.position = 0
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, value):
+        self.values[self.position] = value
+        self.position = (self.position + 1) % len(self.values)
+        self.count += 1
+        self.total += value
+
+    def recent(self):
+        return self.values[:min(self.count, len(self.values))]
+
+
+_lock = threading.Lock()
+_phases = {}
+
+
+def record(phase, seconds):
+    with _lock:
+        buffer = _phases.get(phase)
+        if buffer is None:
+            buffer = _phases[phase] = RingBuffer()
+        buffer.add(seconds)
+
+
+# Ukur durasi blok kode sebagai fase tertentu
+@contextmanager
+def timed(phase):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(phase, time.perf_counter() - start)
+
+
+# Ringkasan per fase: jumlah, total detik, dan kuantil dari ring buffer
+def snapshot():
+    import numpy as np
+
+    with _lock:
+        buffers = {phase: (np.array(buffer.recent()), buffer.count, buffer.total) for phase, buffer in _phases.items()}
+    result = {}
+    for phase, (values, count, total) in sorted(buffers.items()):
+        quantiles = np.quantile(values, QUANTILES) if len(values) else [0.0] * len(QUANTILES)
+        result[phase] = {
+            'count': count,
+            'sum_seconds': total,
+            'window': len(values),
+            'p50_ms': float(quantiles[0]) * 1000,
+            'p95_ms': float(quantiles[1]) * 1000,
+            'p99_ms': float(quantiles[2]) * 1000,
+            'max_ms': float(values.max()) * 1000 if len(values) else 0.0
+        }
+    return result
+
+
+def to_prometheus():
+    lines = [
+        '# HELP stunting_phase_seconds Durasi fase aplikasi (kuantil dari ring buffer terbaru)',
+        '# TYPE stunting_phase_seconds summary'
+    ]
+    for phase, stats in snapshot().items():
+        for quantile, key in zip(QUANTILES, ['p50_ms', 'p95_ms', 'p99_ms']):
+            lines.append(f'stunting_phase_seconds{{phase="{phase}",quantile="{quantile}"}} {stats[key] / 1000:.9f}')
+        lines.append(f'stunting_phase_seconds_sum{{phase="{phase}"}} {stats["sum_seconds"]:.9f}')
+        lines.append(f'stunting_phase_seconds_count{{phase="{phase}"}} {stats["count"]}')
+    return '\n'.join(lines) + '\n'
+
+
+# Tulis metrik ke file secara atomik (file sementara lalu rename)
+def dump_prometheus(path=METRICS_FILE):
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as f:
+        f.write(to_prometheus())
+    os.replace(tmp_path, path)
+
+
+_dump_thread = None
+
+
+# Jalankan dump berkala di thread latar belakang (sekali per proses)
+def start_prometheus_dump(path=METRICS_FILE, interval=METRICS_DUMP_INTERVAL):
+    global _dump_thread
+    if not path or _dump_thread is not None:
+        return
+    with _lock:
+        if _dump_thread is not None:
+            return
+
+        def run():
+            while True:
+                time.sleep(interval)
+                try:
+                    dump_prometheus(path)
+                except OSError:
+                    pass
+
+        _dump_thread = threading.Thread(target=run, name='metrics-dump', daemon=True)
+        _dump_thread.start()
+
+
+def reset():
+    with _lock:
+        _phases.clear()
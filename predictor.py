@@ -0,0 +1,245 @@
+import numpy as np
+
+import growth_reference
+from model_registry import get_model_version, load_lookup_table, load_model
+from prediction_cache import cache_key, prediction_cache
+
+# Urutan fitur sesuai saat model dilatih (lihat Stunting.ipynb)
+FEATURE_COLUMNS = ['gender_num', 'usia', 'berat_lahir', 'panjang_lahir',
+                   'berat_sekarang', 'panjang_sekarang', 'asi_num']
+
+# Kolom yang diharapkan pada file upload batch
+BATCH_COLUMNS = ['nama', 'gender', 'usia', 'berat_lahir', 'panjang_lahir',
+                 'berat_sekarang', 'panjang_sekarang', 'asi']
+
+# Nama kolom alternatif (format Stunting_Dataset.csv)
+COLUMN_ALIASES = {
+    'gender': 'gender',
+    'jenis_kelamin': 'gender',
+    'age': 'usia',
+    'birth_weight': 'berat_lahir',
+    'birth_length': 'panjang_lahir',
+    'body_weight': 'berat_sekarang',
+    'body_length': 'panjang_sekarang',
+    'breastfeeding': 'asi',
+    'asi_eksklusif': 'asi'
+}
+
+# Encoding sama dengan form prediksi
+GENDER_MAPPING = {'laki-laki': 0, 'male': 0, 'l': 0, 'perempuan': 1, 'female': 1, 'p': 1}
+ASI_MAPPING = {'tidak': 0, 'no': 0, 'ya': 1, 'yes': 1}
+GENDER_LABELS = {0: 'Laki-laki', 1: 'Perempuan'}
+ASI_LABELS = {0: 'Tidak', 1: 'Ya'}
+
+# Batas nilai sama dengan batas input pada form
+VALUE_RANGES = {
+    'usia': (0, 60),
+    'berat_lahir': (1.0, 5.0),
+    'panjang_lahir': (30.0, 60.0),
+    'berat_sekarang': (1.0, 20.0),
+    'panjang_sekarang': (30.0, 120.0)
+}
+
+# Dataset pelatihan (format kolom bahasa Inggris)
+DATASET_PATH = 'Stunting_Dataset.csv'
+DATASET_FEATURES = ['Gender', 'Age', 'Birth Weight', 'Birth Length', 'Body Weight', 'Body Length', 'Breastfeeding']
+DATASET_TARGET = 'Stunting'
+
+LABEL_BERISIKO = 'Berisiko stunting'
+LABEL_TIDAK_BERISIKO = 'Tidak berisiko stunting'
+BATCH_CHUNK_SIZE = 10000
+
+# Batch sampai ukuran ini dilayani lewat cache prediksi; batch lebih besar
+# (misalnya upload file) langsung ke model agar tidak membanjiri cache
+CACHE_MAX_BATCH = 64
+
+
+# Label hasil prediksi yang disimpan ke database
+def prediction_label(prediction):
+    return LABEL_BERISIKO if prediction == 1 else LABEL_TIDAK_BERISIKO
+
+
+# Konversi input form ke vektor fitur model
+def encode_input(gender, usia, berat_lahir, panjang_lahir, berat_sekarang, panjang_sekarang, asi):
+    gender_num = 0 if gender == "Laki-laki" else 1
+    asi_num = 0 if asi == "Tidak" else 1
+    return (gender_num, usia, berat_lahir, panjang_lahir,
+            berat_sekarang, panjang_sekarang, asi_num)
+
+
+# Prediksi dari tabel lookup, None jika tabel tidak ada, dibangun untuk versi
+# model lain, atau input di luar grid form
+def predict_lookup(features):
+    load_model()
+    table = load_lookup_table()
+    if table is None or table.model_version != get_model_version():
+        return None
+    return table.lookup(cache_key(features))
+
+
+# Prediksi untuk satu anak (dipakai form prediksi)
+def predict_one(gender, usia, berat_lahir, panjang_lahir, berat_sekarang, panjang_sekarang, asi):
+    input_data = encode_input(gender, usia, berat_lahir, panjang_lahir,
+                              berat_sekarang, panjang_sekarang, asi)
+    prediction = predict_lookup(input_data)
+    if prediction is not None:
+        return prediction
+    predictions, _ = predict_cached([input_data])
+    return int(predictions[0])
+
+
+# Baca dataset pelatihan dengan encoding yang sama seperti Stunting.ipynb
+def load_dataset(path=DATASET_PATH):
+    import pandas as pd
+
+    dataset = pd.read_csv(path)
+    dataset['Gender'] = dataset['Gender'].map({'Female': 1, 'Male': 0})
+    dataset['Breastfeeding'] = dataset['Breastfeeding'].map({'No': 0, 'Yes': 1})
+    dataset['Stunting'] = dataset['Stunting'].map({'No': 0, 'Yes': 1})
+    return dataset
+
+
+def _normalize_column(name):
+    key = str(name).strip().lower().replace(' ', '_')
+    return COLUMN_ALIASES.get(key, key)
+
+
+# Validasi dan encoding data upload. Mengembalikan (data valid, daftar error).
+# Data valid berisi kolom BATCH_COLUMNS (gender/asi dalam label aplikasi)
+# ditambah gender_num dan asi_num untuk model.
+# first_row=2 menyamakan nomor baris dengan tampilan spreadsheet (baris 1 = header).
+def prepare_batch(df, first_row=2):
+    import pandas as pd
+
+    df = df.rename(columns=_normalize_column)
+    missing = [col for col in BATCH_COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(f"Kolom tidak ditemukan: {', '.join(missing)}")
+
+    df = df[BATCH_COLUMNS].copy()
+    df.index = pd.RangeIndex(first_row, len(df) + first_row, name='baris')
+    reasons = pd.Series('', index=df.index)
+
+    df['nama'] = df['nama'].fillna('').astype(str).str.strip()
+    reasons[df['nama'] == ''] += 'nama kosong; '
+
+    df['gender_num'] = df['gender'].astype(str).str.strip().str.lower().map(GENDER_MAPPING)
+    reasons[df['gender_num'].isna()] += 'gender tidak dikenali; '
+
+    df['asi_num'] = df['asi'].astype(str).str.strip().str.lower().map(ASI_MAPPING)
+    reasons[df['asi_num'].isna()] += 'asi tidak dikenali; '
+
+    for col, (low, high) in VALUE_RANGES.items():
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+        invalid = df[col].isna() | (df[col] < low) | (df[col] > high)
+        reasons[invalid] += f'{col} harus {low}-{high}; '
+
+    invalid_rows = reasons != ''
+    errors = pd.DataFrame({
+        'baris': df.index[invalid_rows],
+        'keterangan': reasons[invalid_rows].str.rstrip('; ')
+    }).reset_index(drop=True)
+
+    valid = df[~invalid_rows].copy()
+    valid['gender_num'] = valid['gender_num'].astype(int)
+    valid['asi_num'] = valid['asi_num'].astype(int)
+    valid['usia'] = valid['usia'].astype(int)
+    valid['gender'] = valid['gender_num'].map(GENDER_LABELS)
+    valid['asi'] = valid['asi_num'].map(ASI_LABELS)
+    return valid, errors
+
+
+# Prediksi vektor untuk banyak baris sekaligus, diproses per chunk
+def predict_batch(classifier, scaler, features, chunk_size=BATCH_CHUNK_SIZE):
+    features = np.asarray(features, dtype=np.float64)
+    predictions = np.empty(len(features), dtype=np.int64)
+    for start in range(0, len(features), chunk_size):
+        chunk = features[start:start + chunk_size]
+        predictions[start:start + chunk_size] = classifier.predict(scaler.transform(chunk))
+    return predictions
+
+
+# Prediksi beserta probabilitas kelas berisiko (kelas 1) untuk banyak baris.
+# Label diambil dari argmax probabilitas, sama seperti classifier.predict.
+def predict_proba_batch(classifier, scaler, features, chunk_size=BATCH_CHUNK_SIZE):
+    features = np.asarray(features, dtype=np.float64)
+    classes = np.asarray(classifier.classes_)
+    positive = list(classes).index(1)
+    predictions = np.empty(len(features), dtype=np.int64)
+    probabilities = np.empty(len(features), dtype=np.float64)
+    for start in range(0, len(features), chunk_size):
+        proba = classifier.predict_proba(scaler.transform(features[start:start + chunk_size]))
+        predictions[start:start + chunk_size] = classes.take(np.argmax(proba, axis=1))
+        probabilities[start:start + chunk_size] = proba[:, positive]
+    return predictions, probabilities
+
+
+# Prediksi baris fitur memakai cache prediksi (model dari model_registry).
+# Kunci cache adalah tuple fitur apa adanya + versi model, jadi hasilnya sama
+# dengan predict_frame untuk batch besar/upload.
+# Mengembalikan (prediksi, probabilitas kelas berisiko).
+def predict_cached(features):
+    classifier, scaler = load_model()
+    version = get_model_version()
+    keys = [cache_key(row) for row in features]
+    predictions = np.empty(len(keys), dtype=np.int64)
+    probabilities = np.empty(len(keys), dtype=np.float64)
+
+    missing = []
+    for i, key in enumerate(keys):
+        cached = prediction_cache.get(version, key)
+        if cached is None:
+            missing.append(i)
+        else:
+            predictions[i], probabilities[i] = cached
+
+    if missing:
+        X = np.array([keys[i] for i in missing], dtype=np.float64)
+        new_predictions, new_probabilities = predict_proba_batch(classifier, scaler, X)
+        for i, prediction, probability in zip(missing, new_predictions.tolist(), new_probabilities.tolist()):
+            predictions[i] = prediction
+            probabilities[i] = probability
+            prediction_cache.put(version, keys[i], (prediction, probability))
+    return predictions, probabilities
+
+
+def _with_predictions(valid, predictions, probabilities=None):
+    result = valid.copy()
+    if probabilities is not None:
+        result['probabilitas'] = probabilities
+    result['prediction'] = predictions
+    result['hasil_prediksi'] = np.where(predictions == 1, LABEL_BERISIKO, LABEL_TIDAK_BERISIKO)
+    result['zscore_pb_u'], result['zscore_bb_u'] = growth_reference.compute_zscores(
+        result['gender_num'].to_numpy(), result['usia'].to_numpy(),
+        result['berat_sekarang'].to_numpy(), result['panjang_sekarang'].to_numpy()
+    )
+    return result
+
+
+# Prediksi seluruh data batch yang sudah divalidasi, menambah kolom hasil_prediksi
+# (dan probabilitas jika with_proba=True)
+def predict_frame(classifier, scaler, valid, chunk_size=BATCH_CHUNK_SIZE, with_proba=False):
+    features = valid[FEATURE_COLUMNS].to_numpy()
+    if with_proba:
+        return _with_predictions(valid, *predict_proba_batch(classifier, scaler, features, chunk_size))
+    return _with_predictions(valid, predict_batch(classifier, scaler, features, chunk_size))
+
+
+# Validasi dan prediksi daftar record (dict) dari luar UI, misalnya API.
+# Mengembalikan (hasil prediksi, daftar error) dengan indeks berbasis 0.
+# Batch kecil memakai cache prediksi.
+def predict_records(records):
+    import pandas as pd
+
+    valid, errors = prepare_batch(pd.DataFrame.from_records(records), first_row=0)
+    if len(valid) <= CACHE_MAX_BATCH:
+        features = valid[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+        return _with_predictions(valid, *predict_cached(features)), errors
+    classifier, scaler = load_model()
+    return predict_frame(classifier, scaler, valid, with_proba=True), errors
+
+
+# Ubah hasil batch menjadi tuple Python biasa untuk disimpan ke database
+def to_records(result):
+    columns = BATCH_COLUMNS + ['hasil_prediksi']
+    return list(zip(*(result[col].tolist() for col in columns)))
@@ -0,0 +1,277 @@
+# Penyimpanan sesi login di sisi server.
+#
+# Setelah login, user mendapat token bertanda tangan "<id sesi>.<HMAC>" yang
+# disimpan di st.session_state dan di cookie browser (SameSite=Strict), sehingga
+# refresh browser atau tab kedua langsung dikenali tanpa query ke tabel users
+# maupun verifikasi password (KDF).
+#
+# Token TIDAK pernah ditaruh di URL: query parameter ikut tercatat di riwayat
+# browser, log server/proxy, header Referer dan link yang dibagikan. Cookie
+# ditulis lewat JavaScript (Streamlit tidak memberi akses ke header respons),
+# jadi tidak bisa HttpOnly dan tetap terbaca oleh skrip di halaman yang sama.
+# Untuk membatasi dampak token yang bocor, setiap sesi diikat ke sidik jari
+# klien (hash User-Agent + Accept-Language) dan token dirotasi setiap kali sesi
+# dipulihkan, sehingga token lama tidak berlaku lagi. Selama
+# SESSION_ROTATE_GRACE detik setelah rotasi, token lama masih dipetakan ke
+# token penggantinya agar dua tab yang dipulihkan bersamaan tidak saling
+# mengeluarkan.
+# Sesi disimpan di dict dalam memori (LRU + TTL) dan, jika diaktifkan, juga di
+# tabel sessions SQLite agar tetap berlaku setelah server restart. Database
+# hanya menyimpan hash SHA-256 dari id sesi.
+#
+# STUNTING_SESSION_SECRET harus di-set agar token tetap valid setelah restart;
+# tanpa itu kunci dibuat acak per proses dan semua sesi berakhir saat restart.
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from collections import Counter, OrderedDict
+
+import database
+
+SESSION_SECRET = os.environ.get('STUNTING_SESSION_SECRET') or secrets.token_hex(32)
+SESSION_TTL_SECONDS = float(os.environ.get('STUNTING_SESSION_TTL', 8 * 3600))
+SESSION_MAX = int(os.environ.get('STUNTING_SESSION_MAX', 10000))
+SESSION_PERSIST = os.environ.get('STUNTING_SESSION_PERSIST', '1') != '0'
+SESSION_ROTATE_GRACE = float(os.environ.get('STUNTING_SESSION_ROTATE_GRACE', 30))
+
+# Username admin (dipisah koma) yang boleh membuka halaman performa/monitoring
+ADMIN_USERS = {name.strip() for name in os.environ.get('STUNTING_ADMIN_USERS', '').split(',') if name.strip()}
+
+# Header permintaan yang membentuk sidik jari klien
+FINGERPRINT_HEADERS = ('User-Agent', 'Accept-Language')
+
+# Sesi kedaluwarsa dibersihkan dari memori/database paling sering sekali per interval ini
+PURGE_INTERVAL_SECONDS = 300
+
+
+def _sign(session_id):
+    return hmac.new(SESSION_SECRET.encode('utf-8'), session_id.encode('utf-8'), hashlib.sha256).hexdigest()
+
+
+def _session_hash(session_id):
+    return hashlib.sha256(session_id.encode('utf-8')).hexdigest()
+
+
+# Id sesi dari token, None jika format atau tanda tangan tidak valid
+def parse_token(token):
+    if not token or '.' not in token:
+        return None
+    session_id, signature = token.rsplit('.', 1)
+    if not hmac.compare_digest(_sign(session_id), signature):
+        return None
+    return session_id
+
+
+# Sidik jari klien dari header permintaan (mis. st.context.headers)
+def client_fingerprint(headers):
+    values = [(headers or {}).get(name) or '' for name in FINGERPRINT_HEADERS]
+    return hashlib.sha256('\n'.join(values).encode('utf-8')).hexdigest()
+
+
+class SessionStore:
+    def __init__(self, ttl=SESSION_TTL_SECONDS, maxsize=SESSION_MAX, persist=SESSION_PERSIST):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.persist = persist
+        self._data = OrderedDict()
+        # Jumlah sesi per user_id, dijaga setiap sesi masuk/keluar agar hitungan
+        # "online" di sidebar tidak perlu memindai semua sesi
+        self._user_sessions = Counter()
+        # Id sesi lama -> (token pengganti, waktu rotasi, sidik jari)
+        self._successors = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_purge = time.time()
+        self.hits = 0
+        self.misses = 0
+        self.restored = 0
+        self.rotations = 0
+        self.fingerprint_mismatches = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _put(self, session_id, user_info, expires_at, fingerprint):
+        if session_id not in self._data:
+            self._user_sessions[user_info['id']] += 1
+        self._data[session_id] = (user_info, expires_at, fingerprint)
+        self._data.move_to_end(session_id)
+        while len(self._data) > self.maxsize:
+            _, entry = self._data.popitem(last=False)
+            self._forget(entry)
+            self.evictions += 1
+
+    def _forget(self, entry):
+        user_id = entry[0]['id']
+        self._user_sessions[user_id] -= 1
+        if self._user_sessions[user_id] <= 0:
+            del self._user_sessions[user_id]
+
+    def _drop(self, session_id):
+        entry = self._data.pop(session_id, None)
+        if entry is not None:
+            self._forget(entry)
+
+    # Buat sesi baru untuk user yang baru login, mengembalikan token
+    def create(self, user_info, fingerprint=None):
+        session_id = secrets.token_urlsafe(32)
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._put(session_id, dict(user_info), expires_at, fingerprint)
+        if self.persist:
+            database.save_session(_session_hash(session_id), user_info, expires_at, fingerprint)
+        return f'{session_id}.{_sign(session_id)}'
+
+    # user_info untuk token yang valid, belum kedaluwarsa dan berasal dari klien
+    # dengan sidik jari yang sama, selain itu None
+    def resolve(self, token, fingerprint=None):
+        session_id = parse_token(token)
+        if session_id is None:
+            return None
+        now = time.time()
+        self._maybe_purge(now)
+
+        with self._lock:
+            entry = self._data.get(session_id)
+            if entry is not None:
+                user_info, expires_at, bound = entry
+                if expires_at > now:
+                    if not hmac.compare_digest(bound or '', fingerprint or ''):
+                        self.fingerprint_mismatches += 1
+                        return None
+                    self._data.move_to_end(session_id)
+                    self.hits += 1
+                    return dict(user_info)
+                self._drop(session_id)
+                self.expirations += 1
+
+        # Tidak ada di memori (proses baru / tereviksi): coba dari database
+        stored = database.load_session(_session_hash(session_id), now) if self.persist else None
+        with self._lock:
+            if stored is None:
+                self.misses += 1
+                return None
+            if not hmac.compare_digest(stored[2] or '', fingerprint or ''):
+                self.fingerprint_mismatches += 1
+                return None
+            self._put(session_id, *stored)
+            self.restored += 1
+            return dict(stored[0])
+
+    # Pulihkan sesi lalu ganti tokennya: token lama dicabut dan token baru
+    # dibuat untuk klien yang sama. Mengembalikan (user_info, token baru),
+    # atau (None, None) jika token tidak valid. Token yang baru saja dirotasi
+    # (masih dalam masa tenggang) menghasilkan token pengganti yang sama.
+    def rotate(self, token, fingerprint=None):
+        session_id = parse_token(token)
+        if session_id is None:
+            return None, None
+        result = self._from_successor(session_id, fingerprint)
+        if result is not None:
+            return result
+
+        user_info = self.resolve(token, fingerprint)
+        if user_info is None:
+            # Bisa jadi tab lain baru saja merotasi token ini
+            return self._from_successor(session_id, fingerprint) or (None, None)
+        new_token = self.create(user_info, fingerprint)
+        with self._lock:
+            winner = self._successors.get(session_id)
+            if winner is None:
+                self._successors[session_id] = (new_token, time.time(), fingerprint)
+                while len(self._successors) > self.maxsize:
+                    self._successors.popitem(last=False)
+                self.rotations += 1
+        if winner is not None:
+            # Tab lain merotasi token yang sama pada saat bersamaan: pakai tokennya
+            self.revoke(new_token)
+            return user_info, winner[0]
+        self.revoke(token)
+        return user_info, new_token
+
+    # (user_info, token pengganti) untuk sesi yang sudah dirotasi, (None, None) jika
+    # masa tenggangnya lewat atau klien berbeda, None jika sesi belum pernah dirotasi
+    def _from_successor(self, session_id, fingerprint):
+        with self._lock:
+            successor = self._successors.get(session_id)
+        if successor is None:
+            return None
+        successor_token, rotated_at, bound = successor
+        if time.time() - rotated_at > SESSION_ROTATE_GRACE or not hmac.compare_digest(bound or '', fingerprint or ''):
+            return None, None
+        user_info = self.resolve(successor_token, fingerprint)
+        return (user_info, successor_token) if user_info else (None, None)
+
+    # True jika token pernah valid tetapi sudah diganti lewat rotasi (cookie
+    # kemungkinan sudah berisi token penggantinya, jadi jangan dihapus)
+    def superseded(self, token):
+        session_id = parse_token(token)
+        with self._lock:
+            return session_id is not None and session_id in self._successors
+
+    def revoke(self, token):
+        session_id = parse_token(token)
+        if session_id is None:
+            return
+        with self._lock:
+            self._drop(session_id)
+        if self.persist:
+            database.delete_session(_session_hash(session_id))
+
+    def _maybe_purge(self, now):
+        if now - self._last_purge < PURGE_INTERVAL_SECONDS:
+            return
+        self._last_purge = now
+        self.purge(now)
+
+    # Buang sesi kedaluwarsa dari memori dan database
+    def purge(self, now=None):
+        now = now or time.time()
+        with self._lock:
+            expired = [session_id for session_id, (_, expires_at, _) in self._data.items() if expires_at <= now]
+            for session_id in expired:
+                self._drop(session_id)
+            self.expirations += len(expired)
+            for session_id in [session_id for session_id, (_, rotated_at, _) in self._successors.items()
+                               if rotated_at + self.ttl <= now]:
+                del self._successors[session_id]
+        if self.persist:
+            database.purge_sessions(now)
+        return len(expired)
+
+    # O(1): sesi kedaluwarsa yang belum dibersihkan ikut terhitung sampai purge
+    # berikutnya (paling lama PURGE_INTERVAL_SECONDS)
+    def stats(self):
+        self._maybe_purge(time.time())
+        with self._lock:
+            return {
+                'active_sessions': len(self._data),
+                'active_users': len(self._user_sessions),
+                'maxsize': self.maxsize,
+                'ttl_seconds': self.ttl,
+                'persist': self.persist,
+                'hits': self.hits,
+                'misses': self.misses,
+                'restored': self.restored,
+                'rotations': self.rotations,
+                'fingerprint_mismatches': self.fingerprint_mismatches,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
+
+    # Jumlah sesi aktif milik satu user (di memori proses ini)
+    def count_user_sessions(self, user_id):
+        with self._lock:
+            return self._user_sessions.get(user_id, 0)
+
+
+def is_admin(user_info):
+    return bool(user_info) and user_info['username'] in ADMIN_USERS
+
+
+session_store = SessionStore()
+
+
+def get_session_stats():
+    return session_store.stats()
@@ -1,16 +1,29 @@
 import streamlit as st
-import numpy as np
-import pickle
-import pandas as pd
-import sqlite3
-import uuid
-import hashlib
-from datetime import datetime
+import os
+import time
+from datetime import datetime, timezone
 import warnings
+# Hanya modul ringan yang dimuat di sini; pandas, numpy dan model dimuat
+# setelah login (halaman login tidak membutuhkannya)
+from database import (
+    ensure_database, register_user, login_user, get_user_statistics, get_data_version,
+    delete_all_predictions, get_recent_predictions,
+    insert_predictions, get_prediction_history_page,
+    AGE_BANDS, ROLLUP_COLUMNS, get_instansi_rollup, get_rollup_instansi_list, get_storage_stats,
+    get_drift_window, search_children, SEARCH_COLUMNS, SEARCH_MIN_LENGTH
+)
+from maintenance import get_maintenance_status, start_maintenance
+from passwords import HashingBusyError
+from sessions import client_fingerprint, is_admin, session_store
+from write_queue import get_write_queue_stats, submit_prediction, write_queue
+from perf_metrics import METRICS_FILE, dump_prometheus, record, snapshot, start_prometheus_dump, timed
 
 # Suppress sklearn version warnings
 warnings.filterwarnings("ignore", category=UserWarning, module="sklearn")
 
+# Awal rerun, untuk metrik durasi seluruh script
+rerun_start = time.perf_counter()
+
 # Konfigurasi halaman
 st.set_page_config(
     page_title="Prediksi Stunting - Petugas Kesehatan", 
@@ -19,324 +32,84 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# CSS styling yang lebih modern dan user-friendly
-st.markdown("""
-<style>
-    /* Background dan tema utama */
-    .stApp {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        background-attachment: fixed;
-    }
-    
-    /* Card styling */
-    .main-card {
-        background: transparent; 
-        padding: 2rem;
-        border-radius: 15px;
-        box-shadow: none; 
-        backdrop-filter: none; 
-        border: none; 
-        margin: 1rem 0;
-    }
-    
-    /* Header styling */
-    .header-container {
-        text-align: center;
-        padding: 2rem 0;
-        background: rgba(255, 255, 255, 0.1);
-        border-radius: 15px;
-        margin-bottom: 2rem;
-        backdrop-filter: blur(10px);
-    }
-    
-    .main-title {
-        font-size: 2.5rem;
-        font-weight: 700;
-        color: white;
-        text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
-        margin-bottom: 0.5rem;
-    }
-    
-    .subtitle {
-        font-size: 1.2rem;
-        color: rgba(255, 255, 255, 0.9);
-        font-weight: 300;
-    }
-    
-    /* Form styling */
-    .form-container {
-    background: transparent;
-    padding: 2rem;
-    border-radius: 15px;
-    box-shadow: none;
-    margin: 1rem 0;
-    backdrop-filter: none;
-    border: none;
-}
-    
-    /* Button styling */
-    .stButton > button {
-        background: linear-gradient(45deg, #667eea, #764ba2);
-        color: white;
-        border: none;
-        border-radius: 25px;
-        padding: 0.75rem 2rem;
-        font-weight: 600;
-        font-size: 1.1rem;
-        transition: all 0.3s ease;
-        box-shadow: 0 4px 15px rgba(102, 126, 234, 0.4);
-    }
-    
-    .stButton > button:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 6px 20px rgba(102, 126, 234, 0.6);
-    }
-    
-    /* Alert styling */
-    .stSuccess > div {
-        background: linear-gradient(45deg, #56ab2f, #a8e6cf);
-        color: white;
-        border-radius: 10px;
-        padding: 1.5rem;
-        border: none;
-    }
-    
-    .stError > div {
-        background: linear-gradient(45deg, #ff416c, #ff4b2b);
-        color: white;
-        border-radius: 10px;
-        padding: 1.5rem;
-        border: none;
-    }
-    
-    .stWarning > div {
-        background: linear-gradient(45deg, #f7971e, #ffd200);
-        color: #333;
-        border-radius: 10px;
-        padding: 1.5rem;
-        border: none;
-    }
-    
-    .stInfo > div {
-        background: linear-gradient(45deg, #2196F3, #21CBF3);
-        color: white;
-        border-radius: 10px;
-        padding: 1.5rem;
-        border: none;
-    }
-    
-    /* Sidebar styling */
-    .css-1d391kg {
-        background: rgba(255, 255, 255, 0.95);
-        backdrop-filter: blur(10px);
-    }
-    
-    /* Input field styling */
-    .stTextInput > div > div > input,
-    .stNumberInput > div > div > input,
-    .stSelectbox > div > div > select {
-        border-radius: 10px;
-        border: 2px solid #e0e0e0;
-        padding: 0.75rem;
-        font-size: 1rem;
-        transition: all 0.3s ease;
-    }
-    
-    .stTextInput > div > div > input:focus,
-    .stNumberInput > div > div > input:focus,
-    .stSelectbox > div > div > select:focus {
-        border-color: #667eea;
-        box-shadow: 0 0 10px rgba(102, 126, 234, 0.3);
-    }
-    
-    /* User info card */
-    .user-info {
-        background: linear-gradient(45deg, #667eea, #764ba2);
-        color: white;
-        padding: 1rem;
-        border-radius: 10px;
-        margin-bottom: 1rem;
-        text-align: center;
-    }
-    
-    /* Statistics cards */
-    .stat-card {
-        background: white;
-        padding: 1.5rem;
-        border-radius: 10px;
-        box-shadow: 0 4px 12px rgba(0, 0, 0, 0.1);
-        text-align: center;
-        margin: 0.5rem 0;
-    }
-    
-    .stat-number {
-        font-size: 2rem;
-        font-weight: 700;
-        color: #667eea;
-    }
-    
-    .stat-label {
-        font-size: 0.9rem;
-        color: #666;
-        margin-top: 0.5rem;
-    }
-    
-    /* Delete button styling */
-    .delete-button {
-        background: linear-gradient(45deg, #ff4757, #ff3742) !important;
-        color: white !important;
-        border: none !important;
-        border-radius: 5px !important;
-        padding: 0.3rem 0.8rem !important;
-        font-size: 0.8rem !important;
-        font-weight: 500 !important;
-    }
-    
-    .delete-button:hover {
-        transform: translateY(-1px) !important;
-        box-shadow: 0 4px 15px rgba(255, 71, 87, 0.4) !important;
-    }
-</style>
-""", unsafe_allow_html=True)
+# Isi static/style.css, dibaca sekali per proses
+@st.cache_resource
+def load_css():
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "style.css")) as f:
+        return f.read()
 
-# Fungsi untuk hash password
-def hash_password(password):
-    return hashlib.sha256(str.encode(password)).hexdigest()
 
-# Fungsi untuk verifikasi password
-def verify_password(password, hashed):
-    return hash_password(password) == hashed
+# Query sidebar dan riwayat di-cache per (user, versi data). Versi naik setiap kali
+# prediksi user disimpan atau dihapus (database.get_data_version), sehingga rerun
+# yang tidak mengubah data tidak menjalankan query. TTL menjadi batas atas untuk
+# perubahan dari proses lain (misalnya api.py).
+DATA_CACHE_TTL = float(os.environ.get('STUNTING_DATA_CACHE_TTL', 300))
+# Fragment sidebar dijalankan ulang berkala agar prediksi yang baru ditulis antrean
+# write-behind ikut tampil; tanpa perubahan versi data rerun ini tidak query apa pun
+SIDEBAR_REFRESH_SECONDS = float(os.environ.get('STUNTING_SIDEBAR_REFRESH', 5))
+# st.download_button menyimpan seluruh file export di memori server, jadi export
+# dari aplikasi dibatasi; yang lebih besar lewat api.py /export atau manage.py export
+EXPORT_UI_MAX_ROWS = int(os.environ.get('STUNTING_EXPORT_UI_MAX_ROWS', 100000))
+# Cookie penyimpan token sesi (batasan keamanannya dijelaskan di sessions.py)
+SESSION_COOKIE = 'stunting_session'
 
-# Inisialisasi database
-def init_database():
-    conn = sqlite3.connect('stunting_app.db')
-    c = conn.cursor()
-    
-    # Tabel untuk users (petugas kesehatan)
-    c.execute('''
-    CREATE TABLE IF NOT EXISTS users (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        username TEXT UNIQUE NOT NULL,
-        password TEXT NOT NULL,
-        nama_lengkap TEXT NOT NULL,
-        jabatan TEXT,
-        instansi TEXT,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )
-    ''')
-    
-    # Tabel untuk prediksi stunting (dimodifikasi dengan user_id)
-    c.execute('''
-    CREATE TABLE IF NOT EXISTS prediksi_stunting (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        user_id INTEGER,
-        nama TEXT,
-        gender TEXT,
-        usia INTEGER,
-        berat_lahir REAL,
-        panjang_lahir REAL,
-        berat_sekarang REAL,
-        panjang_sekarang REAL,
-        asi TEXT,
-        hasil_prediksi TEXT,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (user_id) REFERENCES users (id)
-    )
-    ''')
-    
-    conn.commit()
-    conn.close()
 
-# Fungsi registrasi
-def register_user(username, password, nama_lengkap, jabatan, instansi):
-    conn = sqlite3.connect('stunting_app.db')
-    c = conn.cursor()
-    
-    try:
-        hashed_password = hash_password(password)
-        c.execute('''
-        INSERT INTO users (username, password, nama_lengkap, jabatan, instansi)
-        VALUES (?, ?, ?, ?, ?)
-        ''', (username, hashed_password, nama_lengkap, jabatan, instansi))
-        conn.commit()
-        conn.close()
-        return True
-    except sqlite3.IntegrityError:
-        conn.close()
-        return False
+# Tulis cookie sesi di halaman induk lewat iframe HTML kecil (same-origin);
+# token kosong menghapus cookie
+def write_session_cookie(token):
+    import json
+    max_age = int(session_store.ttl) if token else 0
+    st.iframe(f"""
+    <script>
+    const secure = window.parent.location.protocol === 'https:' ? '; Secure' : '';
+    window.parent.document.cookie = {json.dumps(SESSION_COOKIE)} + '=' + {json.dumps(token)}
+        + '; Path=/; Max-Age={max_age}; SameSite=Strict' + secure;
+    </script>
+    """, height=1)
 
-# Fungsi login
-def login_user(username, password):
-    conn = sqlite3.connect('stunting_app.db')
-    c = conn.cursor()
-    
-    c.execute('SELECT id, password, nama_lengkap, jabatan, instansi FROM users WHERE username = ?', (username,))
-    user = c.fetchone()
-    conn.close()
-    
-    if user and verify_password(password, user[1]):
-        return {
-            'id': user[0],
-            'username': username,
-            'nama_lengkap': user[2],
-            'jabatan': user[3],
-            'instansi': user[4]
-        }
-    return None
 
-# Fungsi untuk mendapatkan statistik user
-def get_user_statistics(user_id):
-    conn = sqlite3.connect('stunting_app.db')
-    c = conn.cursor()
-    
-    # Total prediksi
-    c.execute('SELECT COUNT(*) FROM prediksi_stunting WHERE user_id = ?', (user_id,))
-    total_prediksi = c.fetchone()[0]
-    
-    # Prediksi berisiko
-    c.execute('SELECT COUNT(*) FROM prediksi_stunting WHERE user_id = ? AND hasil_prediksi = "Berisiko stunting"', (user_id,))
-    berisiko = c.fetchone()[0]
-    
-    # Prediksi tidak berisiko
-    tidak_berisiko = total_prediksi - berisiko
-    
-    conn.close()
-    
-    return {
-        'total_prediksi': total_prediksi,
-        'berisiko': berisiko,
-        'tidak_berisiko': tidak_berisiko
-    }
+@st.cache_data(ttl=DATA_CACHE_TTL, max_entries=10000, show_spinner=False)
+def cached_user_statistics(user_id, data_version):
+    with timed('user_statistics'):
+        return get_user_statistics(user_id)
+
+
+@st.cache_data(ttl=DATA_CACHE_TTL, max_entries=10000, show_spinner=False)
+def cached_recent_predictions(user_id, data_version, limit=5):
+    with timed('recent_predictions'):
+        return get_recent_predictions(user_id, limit)
+
+
+@st.cache_data(ttl=DATA_CACHE_TTL, max_entries=1000, show_spinner=False)
+def cached_history_page(user_id, data_version, page_size, cursor, nama, hasil_prediksi, date_from, date_to):
+    with timed('history_query'):
+        return get_prediction_history_page(
+            user_id, page_size=page_size, cursor=cursor, nama=nama,
+            hasil_prediksi=hasil_prediksi, date_from=date_from, date_to=date_to
+        )
 
-# Fungsi untuk menghapus semua riwayat prediksi user
-def delete_all_predictions(user_id):
-    conn = sqlite3.connect('stunting_app.db')
-    c = conn.cursor()
-    
-    c.execute('DELETE FROM prediksi_stunting WHERE user_id = ?', (user_id,))
-    affected_rows = c.rowcount
-    conn.commit()
-    conn.close()
-    
-    return affected_rows
 
-# Fungsi untuk mendapatkan riwayat terbaru
-def get_recent_predictions(user_id, limit=5):
-    conn = sqlite3.connect('stunting_app.db')
-    c = conn.cursor()
-    c.execute('''
-    SELECT nama, hasil_prediksi, created_at 
-    FROM prediksi_stunting 
-    WHERE user_id = ? 
-    ORDER BY created_at DESC 
-    LIMIT ?
-    ''', (user_id, limit))
-    recent_data = c.fetchall()
-    conn.close()
-    return recent_data
+@st.cache_data(ttl=DATA_CACHE_TTL, max_entries=1000, show_spinner=False)
+def cached_export_count(user_id, data_version, date_from, date_to):
+    from export import count_export_rows
+    return count_export_rows(user_id=user_id, date_from=date_from, date_to=date_to)
 
-# Inisialisasi database
-init_database()
+
+# CSS statis di static/style.css. Dengan static serving (.streamlit/config.toml) file
+# dikirim sekali lalu di-cache browser; tanpa itu CSS disisipkan inline.
+if st.get_option("server.enableStaticServing"):
+    st.markdown('<link rel="stylesheet" href="app/static/style.css">', unsafe_allow_html=True)
+else:
+    st.markdown(f"<style>{load_css()}</style>", unsafe_allow_html=True)
+
+# Inisialisasi/migrasi database sekali per proses
+ensure_database()
+
+# Dump metrik Prometheus berkala jika STUNTING_METRICS_FILE di-set
+start_prometheus_dump()
+
+# Purge retensi + incremental vacuum berkala di latar belakang (lihat maintenance.py)
+start_maintenance()
 
 # Inisialisasi session state
 if 'logged_in' not in st.session_state:
@@ -353,6 +126,33 @@ if 'prediction_made' not in st.session_state:
     st.session_state.prediction_made = False
 if 'last_prediction_result' not in st.session_state:
     st.session_state.last_prediction_result = None
+if 'batch_result' not in st.session_state:
+    st.session_state.batch_result = None
+
+# Token sesi dari versi lama yang masih ada di URL dibuang (tidak dipakai lagi)
+if 'session' in st.query_params:
+    del st.query_params['session']
+
+# Pulihkan login dari cookie sesi (refresh browser / tab kedua), sekali per sesi
+# Streamlit; token dirotasi setiap dipulihkan dan harus cocok dengan sidik jari klien
+client_fp = client_fingerprint(st.context.headers)
+if not st.session_state.logged_in and 'session_cookie_checked' not in st.session_state:
+    st.session_state.session_cookie_checked = True
+    cookie_token = st.context.cookies.get(SESSION_COOKIE)
+    if cookie_token:
+        restored_user, new_token = session_store.rotate(cookie_token, client_fp)
+        if restored_user:
+            st.session_state.logged_in = True
+            st.session_state.user_info = restored_user
+            st.session_state.session_token = new_token
+            st.session_state.pending_session_cookie = new_token
+        elif not session_store.superseded(cookie_token):
+            # Hanya token tidak valid/kedaluwarsa yang dihapus; token yang sudah dirotasi
+            # tab lain dibiarkan karena cookie sudah berisi token penggantinya
+            st.session_state.pending_session_cookie = ''
+
+if 'pending_session_cookie' in st.session_state:
+    write_session_cookie(st.session_state.pop('pending_session_cookie'))
 
 # Halaman Login/Register
 if not st.session_state.logged_in:
@@ -384,10 +184,16 @@ if not st.session_state.logged_in:
                 
                 if login_button:
                     if username and password:
-                        user = login_user(username, password)
+                        try:
+                            user = login_user(username, password)
+                        except HashingBusyError as e:
+                            st.warning(f"⏳ {e}")
+                            st.stop()
                         if user:
                             st.session_state.logged_in = True
                             st.session_state.user_info = user
+                            st.session_state.session_token = session_store.create(user, client_fp)
+                            st.session_state.pending_session_cookie = st.session_state.session_token
                             st.success(f"Selamat datang, {user['nama_lengkap']}!")
                             st.rerun()
                         else:
@@ -446,7 +252,17 @@ if not st.session_state.logged_in:
             st.markdown('</div>', unsafe_allow_html=True)
 
 else:
-    # Halaman utama setelah login
+    # Halaman utama setelah login. Import di sini hanya dieksekusi sekali per
+    # proses; rerun berikutnya cukup mengambil modul dari sys.modules.
+    import pandas as pd
+    from export import export_to_tempfile
+    from model_registry import get_load_metrics, load_model
+    from prediction_cache import get_cache_stats
+    from growth_reference import BB_U_CATEGORIES, PB_U_CATEGORIES, categorize, compute_zscores, sex_codes
+    from predictor import (
+        BATCH_COLUMNS, predict_one, prediction_label, prepare_batch, predict_frame, to_records
+    )
+    
     user_info = st.session_state.user_info
     
     # Header dengan info user
@@ -466,21 +282,24 @@ else:
             st.session_state.user_info = None
             st.session_state.prediction_made = False
             st.session_state.last_prediction_result = None
+            st.session_state.batch_result = None
+            if st.session_state.get('session_token'):
+                session_store.revoke(st.session_state.pop('session_token'))
+            st.session_state.pending_session_cookie = ''
             st.rerun()
     
-    # Load model dan scaler
+    # Load model dan scaler (di-cache per proses, dimuat ulang jika file berubah)
     try:
-        classifier = pickle.load(open('stunting.sav', 'rb'))
-        scaler = pickle.load(open('scaler.sav', 'rb'))
+        with timed('model_load'):
+            classifier, scaler = load_model()
     except FileNotFoundError:
         st.error("❌ File model tidak ditemukan! Pastikan file 'stunting.sav' dan 'scaler.sav' tersedia.")
         st.stop()
     
-    # Sidebar dengan statistik dan riwayat
-    with st.sidebar:
-        st.markdown("### 📊 Statistik Anda")
-        
-        stats = get_user_statistics(user_info['id'])
+    # Statistik sidebar (fragment: hanya dijalankan ulang sendiri, query hanya saat versi data berubah)
+    @st.fragment(run_every=SIDEBAR_REFRESH_SECONDS)
+    def sidebar_stats(user_info):
+        stats = cached_user_statistics(user_info['id'], get_data_version(user_info['id']))
         
         st.markdown(f"""
         <div class="stat-card">
@@ -503,12 +322,16 @@ else:
         </div>
         """, unsafe_allow_html=True)
         
-        st.markdown("---")
-        
-        # Riwayat prediksi
-        st.markdown("### 📋 Riwayat Prediksi")
-        
-        recent_data = get_recent_predictions(user_info['id'], 5)
+        session_stats = session_store.stats()
+        st.caption(
+            f"🟢 {session_store.count_user_sessions(user_info['id'])} sesi aktif Anda · "
+            f"{session_stats['active_users']} petugas online ({session_stats['active_sessions']} sesi)"
+        )
+    
+    # Lima prediksi terbaru (fragment, cache per versi data seperti statistik)
+    @st.fragment(run_every=SIDEBAR_REFRESH_SECONDS)
+    def sidebar_recent(user_info):
+        recent_data = cached_recent_predictions(user_info['id'], get_data_version(user_info['id']), 5)
         
         if recent_data:
             for data in recent_data:
@@ -517,6 +340,17 @@ else:
                 st.markdown(f"{icon} **{data[0]}** - {date_str}")
         else:
             st.info("Belum ada riwayat prediksi")
+    
+    # Sidebar dengan statistik dan riwayat
+    with st.sidebar:
+        st.markdown("### 📊 Statistik Anda")
+        sidebar_stats(user_info)
+        
+        st.markdown("---")
+        
+        # Riwayat prediksi
+        st.markdown("### 📋 Riwayat Prediksi")
+        sidebar_recent(user_info)
         
         col_history, col_delete = st.columns(2)
         with col_history:
@@ -524,44 +358,30 @@ else:
                 st.session_state.show_history = True
         
         with col_delete:
-            if stats['total_prediksi'] > 0:
+            if cached_user_statistics(user_info['id'], get_data_version(user_info['id']))['total_prediksi'] > 0:
                 if st.button("🗑️ Hapus Semua"):
                     st.session_state.delete_all_confirmation = True
-    
-    # Main content
-    st.markdown("""
-    <div class="header-container">
-        <h1 class="main-title">👶 Prediksi Risiko Stunting</h1>
-        <p class="subtitle">Masukkan data anak untuk analisis risiko stunting</p>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    # Konfirmasi hapus semua riwayat
-    if st.session_state.delete_all_confirmation:
-        st.markdown('<div class="main-card">', unsafe_allow_html=True)
-        st.warning("⚠️ **Konfirmasi Hapus Semua Riwayat**")
-        st.write("Apakah Anda yakin ingin menghapus semua riwayat prediksi? Tindakan ini tidak dapat dibatalkan.")
         
-        col_cancel, col_confirm = st.columns(2)
-        with col_cancel:
-            if st.button("❌ Batal", use_container_width=True):
-                st.session_state.delete_all_confirmation = False
-                st.rerun()
+        if st.button("🔎 Cari Anak", use_container_width=True):
+            st.session_state.show_search = True
         
-        with col_confirm:
-            if st.button("✅ Ya, Hapus Semua", use_container_width=True):
-                deleted_count = delete_all_predictions(user_info['id'])
-                if deleted_count > 0:
-                    st.success(f"✅ Berhasil menghapus {deleted_count} riwayat prediksi.")
-                else:
-                    st.info("ℹ️ Tidak ada riwayat yang dihapus.")
-                st.session_state.delete_all_confirmation = False
-                st.session_state.show_history = False
-                st.rerun()
+        if st.button("🏢 Dashboard Instansi", use_container_width=True):
+            st.session_state.show_dashboard = True
         
-        st.markdown('</div>', unsafe_allow_html=True)
+        # Halaman performa hanya untuk admin (STUNTING_ADMIN_USERS)
+        if is_admin(user_info):
+            if st.button("📈 Performa Aplikasi", use_container_width=True):
+                st.session_state.show_performance = True
+            if st.button("🧭 Drift Data", use_container_width=True):
+                st.session_state.show_drift = True
     
-    else:
+    def clear_prediction():
+        st.session_state.prediction_made = False
+        st.session_state.last_prediction_result = None
+    
+    # Form prediksi tunggal + hasilnya (fragment: mengetik/submit tidak menjalankan ulang sidebar dan riwayat)
+    @st.fragment
+    def prediction_panel(user_info):
         # Form input dalam card
         st.markdown('<div class="main-card">', unsafe_allow_html=True)
         
@@ -605,11 +425,22 @@ else:
             
             st.table(data_summary.set_index('Parameter'))
             
-            # Tombol untuk membuat prediksi baru
-            if st.button("🔄 Analisis Baru", use_container_width=True):
-                st.session_state.prediction_made = False
-                st.session_state.last_prediction_result = None
-                st.rerun()
+            # Z-score standar pertumbuhan WHO (lihat growth_reference.py)
+            st.markdown("### 📈 Z-score Standar Pertumbuhan WHO")
+            col_pb_u, col_bb_u = st.columns(2)
+            for column, title, key, categories in [
+                (col_pb_u, "Panjang Badan menurut Umur (PB/U)", 'zscore_pb_u', PB_U_CATEGORIES),
+                (col_bb_u, "Berat Badan menurut Umur (BB/U)", 'zscore_bb_u', BB_U_CATEGORIES)
+            ]:
+                with column:
+                    zscore = result.get(key)
+                    if zscore is None:
+                        st.metric(title, "-")
+                    else:
+                        st.metric(title, f"{zscore:+.2f} SD", categorize([zscore], categories)[0], delta_color="off")
+            
+            # Tombol untuk membuat prediksi baru (callback dijalankan sebelum fragment dirender ulang)
+            st.button("🔄 Analisis Baru", use_container_width=True, on_click=clear_prediction)
             
             st.markdown("---")
         
@@ -636,37 +467,24 @@ else:
                 
                 if submitted:
                     if nama.strip():
-                        # Konversi input ke format yang sesuai
-                        gender_num = 0 if gender == "Laki-laki" else 1
-                        asi_num = 0 if asi == "Tidak" else 1
-                        
-                        # Membuat array input
-                        input_data = (gender_num, usia, berat_lahir, panjang_lahir, 
-                                    berat_sekarang, panjang_sekarang, asi_num)
-                        
-                        input_data_as_numpy_array = np.array(input_data).reshape(1, -1)
-                        
-                        # Normalisasi data input
-                        std_data = scaler.transform(input_data_as_numpy_array)
-                        
-                        # Prediksi
-                        prediction = classifier.predict(std_data)
+                        # Prediksi (encoding, normalisasi, cache dan model ada di predictor.py)
+                        with timed('predict'):
+                            prediction = predict_one(gender, usia, berat_lahir, panjang_lahir,
+                                                     berat_sekarang, panjang_sekarang, asi)
                         
                         # Menyimpan hasil prediksi
-                        hasil_prediksi = "Berisiko stunting" if prediction[0] == 1 else "Tidak berisiko stunting"
+                        hasil_prediksi = prediction_label(prediction)
                         
-                        # Simpan ke database
-                        conn = sqlite3.connect('stunting_app.db')
-                        c = conn.cursor()
-                        c.execute('''
-                        INSERT INTO prediksi_stunting 
-                        (user_id, nama, gender, usia, berat_lahir, panjang_lahir, 
-                         berat_sekarang, panjang_sekarang, asi, hasil_prediksi) 
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        ''', (user_info['id'], nama, gender, usia, berat_lahir, panjang_lahir, 
-                              berat_sekarang, panjang_sekarang, asi, hasil_prediksi))
-                        conn.commit()
-                        conn.close()
+                        # Simpan ke database lewat antrean write-behind (lihat write_queue.py)
+                        with timed('insert'):
+                            submit_prediction(user_info['id'], nama, gender, usia, berat_lahir, panjang_lahir,
+                                              berat_sekarang, panjang_sekarang, asi, hasil_prediksi)
+                        
+                        # Z-score WHO untuk ditampilkan (NaN jika di luar rentang tabel)
+                        zscore_pb_u, zscore_bb_u = (
+                            float(z[0]) if z[0] == z[0] else None
+                            for z in compute_zscores(sex_codes([gender]), [usia], [berat_sekarang], [panjang_sekarang])
+                        )
                         
                         # Simpan hasil ke session state
                         st.session_state.prediction_made = True
@@ -679,10 +497,13 @@ else:
                             'berat_sekarang': berat_sekarang,
                             'panjang_sekarang': panjang_sekarang,
                             'asi': asi,
-                            'prediction': prediction[0]
+                            'prediction': prediction,
+                            'zscore_pb_u': zscore_pb_u,
+                            'zscore_bb_u': zscore_bb_u
                         }
                         
-                        # Rerun untuk memperbarui tampilan
+                        # Rerun seluruh halaman agar statistik sidebar ikut diperbarui
+                        # (query sidebar di-cache, jadi hanya berjalan jika data berubah)
                         st.rerun()
                         
                     else:
@@ -690,35 +511,100 @@ else:
         
         st.markdown('</div>', unsafe_allow_html=True)
     
-    # Tampilkan riwayat lengkap jika diminta
-    if 'show_history' in st.session_state and st.session_state.show_history:
+    # Riwayat lengkap dengan filter dan navigasi halaman (fragment, query di-cache per versi data)
+    @st.fragment
+    def history_view(user_info):
         st.markdown("---")
         st.markdown("### 📊 Riwayat Lengkap Prediksi")
         
-        conn = sqlite3.connect('stunting_app.db')
-        df_history = pd.read_sql_query('''
-        SELECT nama, gender, usia, berat_lahir, panjang_lahir, 
-               berat_sekarang, panjang_sekarang, asi, hasil_prediksi, created_at
-        FROM prediksi_stunting 
-        WHERE user_id = ? 
-        ORDER BY created_at DESC
-        ''', conn, params=(user_info['id'],))
-        conn.close()
-        
-        if not df_history.empty:
-            # Konversi tanggal dan pastikan semua kolom dalam format yang tepat
-            df_history['created_at'] = pd.to_datetime(df_history['created_at']).dt.strftime('%Y-%m-%d %H:%M')
-            df_history.columns = ['Nama', 'Gender', 'Usia (bln)', 'BB Lahir (kg)', 'PB Lahir (cm)', 
-                                'BB Sekarang (kg)', 'PB Sekarang (cm)', 'ASI', 'Hasil Prediksi', 'Tanggal']
+        # Filter dan ukuran halaman (diproses di database, bukan di pandas)
+        col_nama, col_hasil, col_tanggal, col_size = st.columns([2, 2, 2, 1])
+        with col_nama:
+            filter_nama = st.text_input("🔎 Cari nama", key="history_filter_nama")
+        with col_hasil:
+            filter_hasil = st.selectbox("Hasil", ["Semua", "Berisiko stunting", "Tidak berisiko stunting"],
+                                        key="history_filter_hasil")
+        with col_tanggal:
+            filter_tanggal = st.date_input("Rentang tanggal", value=(), key="history_filter_tanggal")
+        with col_size:
+            page_size = st.selectbox("Per halaman", [25, 50, 100, 200], index=1, key="history_page_size")
+        
+        date_from = filter_tanggal[0] if len(filter_tanggal) > 0 else None
+        date_to = filter_tanggal[1] if len(filter_tanggal) > 1 else date_from
+        history_filters = (filter_nama.strip(), filter_hasil, date_from, date_to, page_size)
+        
+        # Cursor awal setiap halaman yang sudah dikunjungi, direset jika filter berubah
+        if st.session_state.get('history_filters') != history_filters:
+            st.session_state.history_filters = history_filters
+            st.session_state.history_cursors = [None]
+        
+        history_rows, next_cursor = cached_history_page(
+            user_info['id'],
+            get_data_version(user_info['id']),
+            page_size,
+            st.session_state.history_cursors[-1],
+            filter_nama.strip() or None,
+            None if filter_hasil == "Semua" else filter_hasil,
+            date_from,
+            date_to
+        )
+        
+        if history_rows:
+            df_history = pd.DataFrame(history_rows, columns=[
+                'Nama', 'Gender', 'Usia (bln)', 'BB Lahir (kg)', 'PB Lahir (cm)',
+                'BB Sekarang (kg)', 'PB Sekarang (cm)', 'ASI', 'Hasil Prediksi', 'Z PB/U', 'Z BB/U', 'Tanggal'
+            ])
+            df_history['Tanggal'] = df_history['Tanggal'].str.slice(0, 16)
             
-            # Pastikan semua kolom numerik dalam format yang tepat
-            df_history['Usia (bln)'] = df_history['Usia (bln)'].astype(str)
-            df_history['BB Lahir (kg)'] = df_history['BB Lahir (kg)'].astype(str)
-            df_history['PB Lahir (cm)'] = df_history['PB Lahir (cm)'].astype(str)
-            df_history['BB Sekarang (kg)'] = df_history['BB Sekarang (kg)'].astype(str)
-            df_history['PB Sekarang (cm)'] = df_history['PB Sekarang (cm)'].astype(str)
+            st.dataframe(
+                df_history,
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    'Usia (bln)': st.column_config.NumberColumn(format="%d"),
+                    'BB Lahir (kg)': st.column_config.NumberColumn(format="%.1f"),
+                    'PB Lahir (cm)': st.column_config.NumberColumn(format="%.1f"),
+                    'BB Sekarang (kg)': st.column_config.NumberColumn(format="%.1f"),
+                    'PB Sekarang (cm)': st.column_config.NumberColumn(format="%.1f"),
+                    'Z PB/U': st.column_config.NumberColumn(format="%.2f", help="Z-score WHO panjang badan menurut umur"),
+                    'Z BB/U': st.column_config.NumberColumn(format="%.2f", help="Z-score WHO berat badan menurut umur")
+                }
+            )
             
-            st.dataframe(df_history, use_container_width=True)
+            # Navigasi halaman
+            page_number = len(st.session_state.history_cursors)
+            col_prev, col_page, col_next = st.columns([1, 2, 1])
+            with col_prev:
+                if page_number > 1:
+                    st.button("⬅️ Sebelumnya", use_container_width=True,
+                              on_click=st.session_state.history_cursors.pop)
+            with col_page:
+                st.markdown(f"<p style='text-align: center;'>Halaman {page_number}</p>", unsafe_allow_html=True)
+            with col_next:
+                if next_cursor is not None:
+                    st.button("Berikutnya ➡️", use_container_width=True,
+                              on_click=st.session_state.history_cursors.append, args=(next_cursor,))
+            
+            # Export riwayat (dibuat per chunk saat tombol download diklik)
+            with st.expander("⬇️ Export Riwayat"):
+                st.caption("Export mencakup semua riwayat Anda sesuai rentang tanggal yang dipilih.")
+                export_format = st.radio("Format", ["csv", "parquet"], horizontal=True, key="history_export_format")
+                export_filters = {'user_id': user_info['id'], 'date_from': date_from, 'date_to': date_to}
+                export_count = cached_export_count(user_info['id'], get_data_version(user_info['id']), date_from, date_to)
+                if export_count > EXPORT_UI_MAX_ROWS:
+                    st.warning(
+                        f"Export ini berisi {export_count:,} baris, melebihi batas {EXPORT_UI_MAX_ROWS:,} baris "
+                        "untuk download dari aplikasi. Persempit rentang tanggal, atau minta admin mengambilnya "
+                        "lewat endpoint /export di API atau `python manage.py export`."
+                    )
+                else:
+                    st.download_button(
+                        "⬇️ Download",
+                        data=lambda: export_to_tempfile(export_format, **export_filters),
+                        file_name=f"riwayat_prediksi_{datetime.now():%Y%m%d}.{export_format}",
+                        mime="text/csv" if export_format == "csv" else "application/octet-stream",
+                        use_container_width=True
+                    )
             
             # Tombol untuk menutup riwayat dan hapus semua
             col_close, col_delete_all = st.columns(2)
@@ -733,12 +619,407 @@ else:
                     st.session_state.show_history = False
                     st.rerun()
         else:
-            st.info("Belum ada riwayat prediksi yang tersimpan.")
+            if filter_nama.strip() or filter_hasil != "Semua" or date_from:
+                st.info("Tidak ada riwayat prediksi yang sesuai dengan filter.")
+            else:
+                st.info("Belum ada riwayat prediksi yang tersimpan.")
             
             # Tombol untuk menutup riwayat
             if st.button("❌ Tutup Riwayat"):
                 st.session_state.show_history = False
                 st.rerun()
+    
+    # Main content
+    st.markdown("""
+    <div class="header-container">
+        <h1 class="main-title">👶 Prediksi Risiko Stunting</h1>
+        <p class="subtitle">Masukkan data anak untuk analisis risiko stunting</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    input_mode = st.radio("Mode input", ["👶 Prediksi Tunggal", "📁 Upload Batch (CSV/Excel)"],
+                          horizontal=True, label_visibility="collapsed")
+    
+    # Konfirmasi hapus semua riwayat
+    if st.session_state.delete_all_confirmation:
+        st.markdown('<div class="main-card">', unsafe_allow_html=True)
+        st.warning("⚠️ **Konfirmasi Hapus Semua Riwayat**")
+        st.write("Apakah Anda yakin ingin menghapus semua riwayat prediksi? Tindakan ini tidak dapat dibatalkan.")
+        
+        col_cancel, col_confirm = st.columns(2)
+        with col_cancel:
+            if st.button("❌ Batal", use_container_width=True):
+                st.session_state.delete_all_confirmation = False
+                st.rerun()
+        
+        with col_confirm:
+            if st.button("✅ Ya, Hapus Semua", use_container_width=True):
+                # Pastikan prediksi yang masih di antrean ikut terhapus
+                write_queue.flush()
+                # Hapus per chunk agar sesi lain tetap bisa menyimpan prediksi
+                delete_progress = st.progress(0.0, text="Menghapus riwayat...")
+                deleted_count = delete_all_predictions(
+                    user_info['id'],
+                    progress=lambda deleted, total: delete_progress.progress(
+                        deleted / total if total else 1.0, text=f"Menghapus riwayat... {deleted}/{total}"
+                    )
+                )
+                if deleted_count > 0:
+                    st.success(f"✅ Berhasil menghapus {deleted_count} riwayat prediksi.")
+                else:
+                    st.info("ℹ️ Tidak ada riwayat yang dihapus.")
+                st.session_state.delete_all_confirmation = False
+                st.session_state.show_history = False
+                st.rerun()
+        
+        st.markdown('</div>', unsafe_allow_html=True)
+    
+    elif input_mode.startswith("📁"):
+        # Upload batch untuk banyak data anak sekaligus
+        st.markdown('<div class="main-card">', unsafe_allow_html=True)
+        st.markdown("### 📁 Upload Data Batch")
+        st.markdown(
+            "File CSV/Excel dengan kolom: " + ", ".join(f"`{col}`" for col in BATCH_COLUMNS) +
+            ". Kolom `gender` berisi Laki-laki/Perempuan dan `asi` berisi Ya/Tidak "
+            "(format kolom Stunting_Dataset.csv juga diterima)."
+        )
+        
+        uploaded_file = st.file_uploader("Pilih file", type=["csv", "xlsx"])
+        
+        if uploaded_file is not None:
+            try:
+                if uploaded_file.name.lower().endswith(".xlsx"):
+                    df_upload = pd.read_excel(uploaded_file)
+                else:
+                    df_upload = pd.read_csv(uploaded_file)
+                valid_rows, invalid_rows = prepare_batch(df_upload)
+            except ImportError:
+                st.error("❌ Membaca file Excel memerlukan paket openpyxl.")
+            except ValueError as e:
+                st.error(f"❌ {e}")
+            except Exception as e:
+                st.error(f"❌ File tidak dapat dibaca: {e}")
+            else:
+                st.info(f"ℹ️ {len(valid_rows)} baris valid, {len(invalid_rows)} baris tidak valid.")
+                
+                if not invalid_rows.empty:
+                    with st.expander("⚠️ Baris yang tidak valid (tidak akan diproses)"):
+                        st.dataframe(invalid_rows, use_container_width=True, hide_index=True)
+                
+                if len(valid_rows) > 0 and st.button("🔍 Analisis & Simpan Semua", use_container_width=True):
+                    start_time = time.perf_counter()
+                    with timed('batch_predict'):
+                        batch_result = predict_frame(classifier, scaler, valid_rows)
+                    with timed('batch_insert'):
+                        inserted = insert_predictions(user_info['id'], to_records(batch_result))
+                    st.session_state.batch_result = {
+                        'file': uploaded_file.name,
+                        'inserted': inserted,
+                        'berisiko': int((batch_result['prediction'] == 1).sum()),
+                        'seconds': time.perf_counter() - start_time,
+                        'data': batch_result[BATCH_COLUMNS + ['hasil_prediksi', 'zscore_pb_u', 'zscore_bb_u']]
+                    }
+                    # Rerun agar statistik sidebar ikut diperbarui
+                    st.rerun()
+        
+        # Tampilkan hasil batch terakhir
+        if st.session_state.batch_result:
+            batch_result = st.session_state.batch_result
+            st.markdown("---")
+            st.markdown(f"### 📊 Hasil Analisis Batch: {batch_result['file']}")
+            st.success(
+                f"✅ {batch_result['inserted']} data dianalisis dan disimpan dalam "
+                f"{batch_result['seconds']:.2f} detik. {batch_result['berisiko']} anak berisiko stunting."
+            )
+            st.dataframe(batch_result['data'], use_container_width=True, hide_index=True)
+            
+            if st.button("🔄 Upload Baru", use_container_width=True):
+                st.session_state.batch_result = None
+                st.rerun()
+        
+        st.markdown('</div>', unsafe_allow_html=True)
+    
+    else:
+        prediction_panel(user_info)
+    
+    # Tampilkan riwayat lengkap jika diminta
+    if 'show_history' in st.session_state and st.session_state.show_history:
+        history_view(user_info)
+    
+    # Pencarian anak per nama lewat indeks FTS5 (fragment: mengetik tidak menjalankan ulang halaman)
+    @st.fragment
+    def child_search(user_info):
+        st.markdown("---")
+        st.markdown("### 🔎 Cari Anak")
+        
+        col_query, col_scope = st.columns([3, 2])
+        with col_query:
+            query = st.text_input("Nama anak", key="search_query",
+                                  placeholder=f"Minimal {SEARCH_MIN_LENGTH} huruf, boleh sebagian nama")
+        with col_scope:
+            scope_options = ["Riwayat saya", "Instansi saya"] + (["Semua instansi"] if is_admin(user_info) else [])
+            scope = st.radio("Cakupan", scope_options, horizontal=True, key="search_scope")
+        
+        if scope == "Instansi saya" and not user_info['instansi']:
+            st.info("Akun Anda belum terdaftar di instansi mana pun.")
+        elif len(query.strip()) >= SEARCH_MIN_LENGTH:
+            with timed('child_search'):
+                if scope == "Riwayat saya":
+                    search_rows, fuzzy = search_children(query, 'user', user_info['id'])
+                elif scope == "Instansi saya":
+                    search_rows, fuzzy = search_children(query, 'instansi', user_info['instansi'])
+                else:
+                    search_rows, fuzzy = search_children(query, 'all' if is_admin(user_info) else 'user', user_info['id'])
+            
+            if search_rows:
+                if fuzzy:
+                    st.caption("Tidak ada nama yang persis cocok, menampilkan nama yang mirip.")
+                df_search = pd.DataFrame(search_rows, columns=SEARCH_COLUMNS)
+                df_search['created_at'] = df_search['created_at'].str.slice(0, 16)
+                st.caption(f"{df_search['nama'].nunique()} anak, {len(df_search)} pengukuran")
+                
+                # Satu kelompok per anak, pengukuran terbaru di atas
+                for nama, measurements in df_search.groupby('nama', sort=False):
+                    latest = measurements.iloc[0]
+                    with st.expander(f"{nama} · {latest['gender']} · {len(measurements)} pengukuran · "
+                                     f"terakhir {latest['created_at']}: {latest['hasil_prediksi']}"):
+                        st.dataframe(
+                            measurements.drop(columns=['nama', 'gender'] + ([] if scope != "Riwayat saya" else ['petugas', 'instansi'])),
+                            use_container_width=True,
+                            hide_index=True,
+                            column_config={
+                                'usia': st.column_config.NumberColumn("Usia (bln)", format="%d"),
+                                'berat_sekarang': st.column_config.NumberColumn("BB (kg)", format="%.1f"),
+                                'panjang_sekarang': st.column_config.NumberColumn("PB (cm)", format="%.1f"),
+                                'hasil_prediksi': "Hasil Prediksi",
+                                'zscore_pb_u': st.column_config.NumberColumn("Z PB/U", format="%.2f"),
+                                'zscore_bb_u': st.column_config.NumberColumn("Z BB/U", format="%.2f"),
+                                'created_at': "Tanggal",
+                                'petugas': "Petugas",
+                                'instansi': "Instansi"
+                            }
+                        )
+            else:
+                st.info("Tidak ditemukan anak dengan nama tersebut.")
+        
+        if st.button("❌ Tutup Pencarian", use_container_width=True):
+            st.session_state.show_search = False
+            st.rerun()
+    
+    if st.session_state.get('show_search'):
+        child_search(user_info)
+    
+    # Dashboard risiko per instansi dari tabel rollup (tanpa memindai prediksi_stunting).
+    # Petugas melihat instansinya sendiri, admin dapat memilih semua instansi.
+    if st.session_state.get('show_dashboard'):
+        st.markdown("---")
+        st.markdown("### 🏢 Dashboard Risiko Stunting per Instansi")
+        
+        col_instansi, col_periode = st.columns(2)
+        with col_instansi:
+            if is_admin(user_info):
+                instansi_options = ["Semua"] + get_rollup_instansi_list()
+                dashboard_instansi = st.selectbox("Instansi", instansi_options, key="dashboard_instansi")
+            else:
+                dashboard_instansi = user_info['instansi']
+                st.text_input("Instansi", value=dashboard_instansi, disabled=True)
+        with col_periode:
+            periode = st.selectbox("Periode", ["12 bulan terakhir", "6 bulan terakhir", "Semua"], key="dashboard_periode")
+        
+        month_from = None
+        if periode != "Semua":
+            months_back = 12 if periode.startswith("12") else 6
+            # Bulan rollup diambil dari created_at (UTC), jadi acuannya juga jam UTC
+            today = datetime.now(timezone.utc)
+            year, month = divmod(today.year * 12 + today.month - 1 - (months_back - 1), 12)
+            month_from = f"{year:04d}-{month + 1:02d}"
+        
+        with timed('rollup_query'):
+            rollup_rows = get_instansi_rollup(
+                instansi=None if dashboard_instansi == "Semua" else dashboard_instansi,
+                month_from=month_from
+            )
+        
+        if rollup_rows:
+            df_rollup = pd.DataFrame(rollup_rows, columns=ROLLUP_COLUMNS + ['jumlah'])
+            df_rollup['berisiko'] = df_rollup['jumlah'].where(df_rollup['hasil_prediksi'] == "Berisiko stunting", 0)
+            
+            def risk_table(by):
+                grouped = df_rollup.groupby(by)[['jumlah', 'berisiko']].sum()
+                grouped['Risiko (%)'] = grouped['berisiko'] / grouped['jumlah'] * 100
+                return grouped
+            
+            total = int(df_rollup['jumlah'].sum())
+            berisiko = int(df_rollup['berisiko'].sum())
+            col_total, col_berisiko, col_rate = st.columns(3)
+            col_total.metric("Total Prediksi", f"{total:,}")
+            col_berisiko.metric("Berisiko Stunting", f"{berisiko:,}")
+            col_rate.metric("Tingkat Risiko", f"{berisiko / total * 100:.1f}%")
+            
+            st.markdown("**Tingkat risiko per bulan (%)**")
+            st.line_chart(risk_table('bulan')['Risiko (%)'])
+            
+            col_usia, col_gender = st.columns(2)
+            with col_usia:
+                st.markdown("**Per kelompok usia (bulan)**")
+                by_age = risk_table('kelompok_usia')
+                age_order = [label for _, label in AGE_BANDS] + ['>60']
+                st.bar_chart(by_age.reindex([label for label in age_order if label in by_age.index])['Risiko (%)'])
+            with col_gender:
+                st.markdown("**Per gender**")
+                st.bar_chart(risk_table('gender')['Risiko (%)'])
+            
+            if dashboard_instansi == "Semua":
+                st.markdown("**Per instansi**")
+                st.dataframe(
+                    risk_table('instansi').sort_values('Risiko (%)', ascending=False),
+                    use_container_width=True,
+                    column_config={
+                        'jumlah': st.column_config.NumberColumn("Total", format="%d"),
+                        'berisiko': st.column_config.NumberColumn("Berisiko", format="%d"),
+                        'Risiko (%)': st.column_config.NumberColumn(format="%.1f")
+                    }
+                )
+        else:
+            st.info("Belum ada data prediksi untuk instansi/periode ini.")
+        
+        if st.button("❌ Tutup Dashboard", use_container_width=True):
+            st.session_state.show_dashboard = False
+            st.rerun()
+    
+    # Halaman performa (admin): persentil durasi fase + status antrean/cache/sesi
+    if st.session_state.get('show_performance') and is_admin(user_info):
+        st.markdown("---")
+        st.markdown("### 📈 Performa Aplikasi")
+        st.caption("Persentil dihitung dari pengukuran terbaru setiap fase di proses server ini.")
+        
+        phase_stats = snapshot()
+        if phase_stats:
+            df_phases = pd.DataFrame.from_dict(phase_stats, orient='index')
+            df_phases.index.name = 'Fase'
+            st.dataframe(
+                df_phases[['count', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms']],
+                use_container_width=True,
+                column_config={
+                    'count': st.column_config.NumberColumn("Jumlah", format="%d"),
+                    'p50_ms': st.column_config.NumberColumn("p50 (ms)", format="%.2f"),
+                    'p95_ms': st.column_config.NumberColumn("p95 (ms)", format="%.2f"),
+                    'p99_ms': st.column_config.NumberColumn("p99 (ms)", format="%.2f"),
+                    'max_ms': st.column_config.NumberColumn("Maks (ms)", format="%.2f")
+                }
+            )
+        else:
+            st.info("Belum ada pengukuran.")
+        
+        col_queue, col_cache, col_sessions = st.columns(3)
+        with col_queue:
+            st.markdown("**Antrean tulis**")
+            st.json(get_write_queue_stats(), expanded=False)
+        with col_cache:
+            st.markdown("**Cache prediksi**")
+            st.json(get_cache_stats(), expanded=False)
+        with col_sessions:
+            st.markdown("**Sesi**")
+            st.json(session_store.stats(), expanded=False)
+        with st.expander("Waktu muat model"):
+            st.json(get_load_metrics())
+        with st.expander("Penyimpanan & pemeliharaan database"):
+            st.json({'storage': get_storage_stats(), 'maintenance': get_maintenance_status()})
+        
+        col_dump, col_close_perf = st.columns(2)
+        with col_dump:
+            if METRICS_FILE and st.button("💾 Tulis Metrik Prometheus", use_container_width=True):
+                dump_prometheus()
+                st.success(f"Metrik ditulis ke {METRICS_FILE}")
+        with col_close_perf:
+            if st.button("❌ Tutup Performa", use_container_width=True):
+                st.session_state.show_performance = False
+                st.rerun()
+
+    # Monitor drift input (admin): dibaca dari ringkasan harian drift_*, tanpa memindai prediksi_stunting
+    if st.session_state.get('show_drift') and is_admin(user_info):
+        import drift_monitor
+        from datetime import timedelta
+        
+        st.markdown("---")
+        st.markdown("### 🧭 Drift Data Input")
+        
+        window_days = st.selectbox("Jendela (hari)", [7, 30, 90],
+                                   index=[7, 30, 90].index(drift_monitor.DRIFT_WINDOW_DAYS)
+                                   if drift_monitor.DRIFT_WINDOW_DAYS in (7, 30, 90) else 1,
+                                   key="drift_window")
+        today = datetime.now(timezone.utc).date()
+        day_to = today + timedelta(days=1)
+        day_from = day_to - timedelta(days=window_days)
+        with timed('drift_report'):
+            stats_rows, histogram_rows, current_rates = get_drift_window(day_from, day_to)
+            _, _, previous_rates = get_drift_window(day_from - timedelta(days=window_days), day_from)
+            reference = drift_monitor.reference_profile()
+            report, counts = drift_monitor.feature_report(stats_rows, histogram_rows, reference)
+            rate_report = drift_monitor.positive_rate_report(current_rates, previous_rates)
+        
+        st.caption(
+            f"{day_from} s.d. {today} (UTC) dibanding data latih. PSI ≥ {drift_monitor.PSI_ALERT} = drift, "
+            f"PSI ≥ {drift_monitor.PSI_WARN} atau KS melewati nilai kritis = waspada; "
+            f"minimal {drift_monitor.DRIFT_MIN_SAMPLES} data per fitur."
+        )
+        for row in report:
+            if row['status'] == 'drift':
+                st.error(f"Drift pada fitur **{row['fitur']}** (PSI {row['psi']:.3f})")
+            elif row['status'] == 'waspada':
+                st.warning(f"Distribusi **{row['fitur']}** mulai bergeser (PSI {row['psi']:.3f}, KS {row['ks']:.3f})")
+        
+        st.dataframe(
+            pd.DataFrame(report).set_index('fitur'),
+            use_container_width=True,
+            column_config={
+                'n': st.column_config.NumberColumn("Jumlah", format="%d"),
+                'mean': st.column_config.NumberColumn("Mean", format="%.2f"),
+                'std': st.column_config.NumberColumn("Std", format="%.2f"),
+                'mean_latih': st.column_config.NumberColumn("Mean latih", format="%.2f"),
+                'std_latih': st.column_config.NumberColumn("Std latih", format="%.2f"),
+                'psi': st.column_config.NumberColumn("PSI", format="%.3f"),
+                'ks': st.column_config.NumberColumn("KS", format="%.3f"),
+                'ks_kritis': st.column_config.NumberColumn("KS kritis", format="%.3f")
+            }
+        )
+        
+        drift_feature = st.selectbox("Histogram fitur", drift_monitor.FEATURES, key="drift_feature")
+        start, width, _ = drift_monitor.FEATURE_BINS[drift_feature]
+        reference_counts = reference[drift_feature]['counts']
+        current_counts = counts[drift_feature]
+        df_histogram = pd.DataFrame({
+            'Data latih (%)': reference_counts / reference_counts.sum() * 100,
+            'Jendela ini (%)': current_counts / max(current_counts.sum(), 1) * 100
+        }, index=[round(start + width * b, 2) for b in range(len(reference_counts))])
+        st.bar_chart(df_histogram, stack=False)
+        
+        st.markdown("**Tingkat prediksi berisiko per instansi** (dibanding jendela sebelumnya)")
+        if rate_report:
+            for row in rate_report:
+                if row['status'] == 'berubah':
+                    st.warning(f"Tingkat berisiko **{row['instansi']}** berubah signifikan (z = {row['z']:.1f})")
+            df_rates = pd.DataFrame(rate_report).set_index('instansi')
+            st.dataframe(
+                df_rates,
+                use_container_width=True,
+                column_config={
+                    'total': st.column_config.NumberColumn("Total", format="%d"),
+                    'tingkat_berisiko': st.column_config.NumberColumn("Berisiko", format="percent"),
+                    'total_sebelumnya': st.column_config.NumberColumn("Total sebelumnya", format="%d"),
+                    'tingkat_sebelumnya': st.column_config.NumberColumn("Berisiko sebelumnya", format="percent"),
+                    'z': st.column_config.NumberColumn("z", format="%.2f")
+                }
+            )
+            st.caption(f"Tingkat berisiko data latih: {reference['positive_rate']:.1%}")
+        else:
+            st.info("Belum ada prediksi pada jendela ini.")
+        
+        if st.button("❌ Tutup Drift", use_container_width=True):
+            st.session_state.show_drift = False
+            st.rerun()
+
+record('rerun', time.perf_counter() - rerun_start)
 
 # Cara Running
 # py -m streamlit run stunting_detection_app.py
\ No newline at end of file
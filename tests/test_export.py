@@ -0,0 +1,59 @@
+import io
+
+import pytest
+
+import api
+import database
+import export
+import passwords
+
+
+def row(user_id, nama):
+    return (user_id, nama, 'Perempuan', 10, 3.1, 48.0, 8.5, 70.0, 'Ya', 'Tidak berisiko')
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(passwords, 'SCRYPT_N', 2 ** 12)
+    original_path = database.DB_PATH
+    database.configure_database(str(tmp_path / 'export.db'))
+    database.init_database()
+    database.register_user('bidan_a', 'rahasia123', 'Bidan A', 'Bidan', 'Puskesmas A')
+    database.register_user('bidan_b', 'rahasia123', 'Bidan B', 'Bidan', 'Puskesmas B')
+    users = {name: database.get_user_id(name) for name in ('bidan_a', 'bidan_b')}
+    database.insert_prediction_rows([row(users['bidan_a'], f'Anak {i}') for i in range(25)]
+                                    + [row(users['bidan_b'], 'Lain')])
+    monkeypatch.setattr(api, 'API_KEYS', {'kunci-a': 'bidan_a'})
+    monkeypatch.setattr(api, '_user_ids', {})
+    yield users
+    database.configure_database(original_path)
+
+
+def call(path, query='', key='kunci-a'):
+    status = []
+    environ = {'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': query, 'HTTP_X_API_KEY': key}
+    body = b''.join(api.app(environ, lambda code, headers: status.append(code)))
+    return status[0], body
+
+
+def test_iter_csv_matches_write_csv(db):
+    expected = io.StringIO(newline='')
+    export.write_csv(expected, chunk_size=7, user_id=db['bidan_a'])
+    chunks = list(export.iter_csv(chunk_size=7, user_id=db['bidan_a']))
+    # Satu potongan per chunk (header ikut potongan pertama)
+    assert len(chunks) == 4
+    assert b''.join(chunks).decode('utf-8') == expected.getvalue()
+    assert export.count_export_rows(user_id=db['bidan_a']) == 25
+
+
+def test_iter_csv_without_rows_has_header(db):
+    assert b''.join(export.iter_csv(user_id=-1)).decode('utf-8').strip() == ','.join(export.EXPORT_COLUMNS)
+
+
+def test_api_export_streams_own_rows(db):
+    status, body = call('/export', 'from=2000-01-01')
+    lines = body.decode('utf-8').splitlines()
+    assert status == '200 OK'
+    assert len(lines) == 1 + 25 and all(',bidan_a,' in line for line in lines[1:])
+    assert call('/export', key='salah')[0] == '401 Unauthorized'
+    assert call('/export', 'from=kemarin')[0] == '400 Bad Request'
@@ -0,0 +1,62 @@
+import time
+
+import pytest
+
+import database
+import passwords
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(passwords, 'SCRYPT_N', 2 ** 12)
+    original_path = database.DB_PATH
+    database.configure_database(str(tmp_path / 'login.db'))
+    database.init_database()
+    database.register_user('petugas', 'rahasia123', 'Petugas', 'Bidan', 'Puskesmas A')
+    yield
+    database.configure_database(original_path)
+
+
+@pytest.fixture
+def verified(monkeypatch):
+    calls = []
+    original = database.verify_password
+
+    def record(password, hashed):
+        calls.append(hashed)
+        return original(password, hashed)
+
+    monkeypatch.setattr(database, 'verify_password', record)
+    return calls
+
+
+def kdf_prefix(hashed):
+    return hashed.split('$')[:-2]
+
+
+def test_unknown_username_runs_same_kdf(db, verified):
+    assert database.login_user('petugas', 'salah') is None
+    assert database.login_user('tidak_ada', 'salah') is None
+    known, unknown = verified
+    assert kdf_prefix(unknown) == kdf_prefix(known)
+    assert not passwords.check_hash('salah', passwords.dummy_hash())
+
+
+def test_legacy_hash_also_runs_kdf(db, verified):
+    with database.get_connection() as conn, conn:
+        conn.execute("UPDATE users SET password = ? WHERE username = 'petugas'",
+                     (passwords._legacy_sha256('rahasia123'),))
+    assert database.login_user('petugas', 'salah') is None
+    assert kdf_prefix(verified[0]) == kdf_prefix(passwords.dummy_hash())
+    assert database.login_user('petugas', 'rahasia123')['username'] == 'petugas'
+
+
+def test_login_timing_does_not_reveal_username(db):
+    def elapsed(username):
+        start = time.perf_counter()
+        database.login_user(username, 'salah')
+        return time.perf_counter() - start
+
+    known = min(elapsed('petugas') for _ in range(5))
+    unknown = min(elapsed('tidak_ada') for _ in range(5))
+    assert unknown > known * 0.5
@@ -0,0 +1,101 @@
+import warnings
+
+import numpy as np
+import pytest
+
+import model_artifact
+import model_registry
+import predictor
+
+warnings.filterwarnings("ignore", category=UserWarning, module="sklearn")
+
+
+@pytest.fixture(scope='module')
+def models(tmp_path_factory):
+    classifier = model_registry.load_artifact(model_registry.MODEL_PATH)
+    scaler = model_registry.load_artifact(model_registry.SCALER_PATH)
+    directory = str(tmp_path_factory.mktemp('artifact'))
+    model_artifact.export_artifact(classifier, scaler, directory)
+    return {
+        'sklearn': (classifier, scaler),
+        'flat': model_artifact.load_artifact(directory),
+        'fused': model_artifact.load_fused(directory)
+    }
+
+
+@pytest.fixture(scope='module')
+def dataset_features():
+    dataset = predictor.load_dataset(predictor.DATASET_PATH)
+    return dataset[predictor.DATASET_FEATURES].to_numpy(dtype=np.float64)
+
+
+# Baris dasar dari dataset dengan satu fitur diganti nilai tepi threshold:
+# batas fused b (x <= b ke kiri) dan tetangga float64-nya, serta invers naif
+# t * scale + mean yang bisa meleset karena pembulatan float32 di sklearn
+@pytest.fixture(scope='module')
+def threshold_edges(models, dataset_features):
+    fused, _ = models['fused']
+    flat, scaler = models['flat']
+    feature = np.asarray(flat.feature)
+    threshold = np.asarray(flat.threshold)
+    rows = []
+    for f in range(dataset_features.shape[1]):
+        nodes = np.flatnonzero(feature == f)
+        fused_bounds = np.unique(fused.threshold[nodes])
+        naive_bounds = np.unique(threshold[nodes] * scaler.scale_[f] + scaler.mean_[f])
+        values = np.concatenate([
+            fused_bounds, np.nextafter(fused_bounds, np.inf), np.nextafter(fused_bounds, -np.inf),
+            naive_bounds, np.nextafter(naive_bounds, np.inf), np.nextafter(naive_bounds, -np.inf)
+        ])
+        base = dataset_features[np.arange(len(values)) % len(dataset_features)].copy()
+        base[:, f] = values
+        rows.append(base)
+    return np.concatenate(rows)
+
+
+def sklearn_proba(models, X):
+    classifier, scaler = models['sklearn']
+    return classifier.predict_proba(scaler.transform(X))
+
+
+@pytest.mark.parametrize('backend', ['flat', 'fused'])
+def test_dataset_predictions_identical(models, dataset_features, backend):
+    classifier, scaler = models['sklearn']
+    expected = classifier.predict(scaler.transform(dataset_features))
+    candidate, candidate_scaler = models[backend]
+    np.testing.assert_array_equal(candidate.predict(candidate_scaler.transform(dataset_features)), expected)
+
+
+@pytest.mark.parametrize('backend', ['flat', 'fused'])
+def test_dataset_probabilities_match(models, dataset_features, backend):
+    candidate, candidate_scaler = models[backend]
+    np.testing.assert_array_equal(candidate.predict_proba(candidate_scaler.transform(dataset_features)),
+                                  sklearn_proba(models, dataset_features))
+
+
+@pytest.mark.parametrize('backend', ['flat', 'fused'])
+def test_threshold_edges_identical(models, threshold_edges, backend):
+    classifier, scaler = models['sklearn']
+    candidate, candidate_scaler = models[backend]
+    np.testing.assert_array_equal(candidate.predict(candidate_scaler.transform(threshold_edges)),
+                                  classifier.predict(scaler.transform(threshold_edges)))
+    np.testing.assert_array_equal(candidate.predict_proba(candidate_scaler.transform(threshold_edges)),
+                                  sklearn_proba(models, threshold_edges))
+
+
+# Batas fused harus tepat: b masih ke kiri dan nilai float64 berikutnya ke kanan
+# pada perbandingan float32 yang dipakai sklearn
+def test_fused_thresholds_exact(models):
+    fused, _ = models['fused']
+    flat, scaler = models['flat']
+    internal = np.asarray(flat.feature) >= 0
+    feature = np.asarray(flat.feature)[internal]
+    threshold = np.asarray(flat.threshold)[internal]
+    bound = fused.threshold[internal]
+    mean, scale = scaler.mean_[feature], scaler.scale_[feature]
+
+    def goes_left(x):
+        return ((x - mean) / scale).astype(np.float32) <= threshold
+
+    assert goes_left(bound).all()
+    assert not goes_left(np.nextafter(bound, np.inf)).any()
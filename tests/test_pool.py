@@ -0,0 +1,23 @@
+import sqlite3
+
+import pytest
+
+import database
+import write_queue
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = database.ConnectionPool(str(tmp_path / 'pool.db'), size=1, timeout=0.05)
+    yield pool
+    pool.close()
+
+
+def test_exhausted_pool_times_out(pool):
+    conn = pool.acquire()
+    with pytest.raises(sqlite3.OperationalError, match='pool exhausted') as excinfo:
+        pool.acquire()
+    assert write_queue.is_transient_error(excinfo.value)
+    pool.release(conn)
+    assert pool.acquire() is conn
+    pool.release(conn)
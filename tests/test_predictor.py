@@ -0,0 +1,55 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import predictor
+from prediction_cache import prediction_cache
+
+warnings.filterwarnings("ignore", category=UserWarning, module="sklearn")
+
+# berat_lahir 2.154 ada di sisi kanan threshold ~2.15 forest; dibulatkan ke
+# 2.15 akan masuk cabang kiri dan labelnya berubah
+RECORD = {
+    'nama': 'Anak', 'gender': 'Laki-laki', 'usia': 8, 'berat_lahir': 2.154, 'panjang_lahir': 49.0,
+    'berat_sekarang': 9.0, 'panjang_sekarang': 69.0, 'asi': 'Tidak'
+}
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    prediction_cache.clear()
+    yield
+    prediction_cache.clear()
+
+
+def model_labels(records):
+    classifier, scaler = predictor.load_model()
+    valid, _ = predictor.prepare_batch(pd.DataFrame.from_records(records), first_row=0)
+    return predictor.predict_batch(classifier, scaler, valid[predictor.FEATURE_COLUMNS].to_numpy())
+
+
+def test_small_and_large_batches_agree():
+    single, errors = predictor.predict_records([RECORD])
+    assert errors.empty
+    large, _ = predictor.predict_records([RECORD] * (predictor.CACHE_MAX_BATCH + 1))
+
+    assert len(large) == predictor.CACHE_MAX_BATCH + 1
+    assert (large['hasil_prediksi'] == single['hasil_prediksi'].iloc[0]).all()
+    np.testing.assert_array_equal(large['probabilitas'], single['probabilitas'].iloc[0])
+    assert single['prediction'].iloc[0] == model_labels([RECORD])[0]
+
+
+def test_cached_result_matches_model():
+    first, _ = predictor.predict_records([RECORD])
+    again, _ = predictor.predict_records([RECORD])
+    assert prediction_cache.stats()['hits'] == 1
+    assert again['hasil_prediksi'].iloc[0] == first['hasil_prediksi'].iloc[0]
+
+
+def test_form_prediction_matches_batch_upload():
+    record = dict(RECORD, berat_lahir=3.1, panjang_sekarang=70.3)
+    form = predictor.predict_one(record['gender'], record['usia'], record['berat_lahir'], record['panjang_lahir'],
+                                 record['berat_sekarang'], record['panjang_sekarang'], record['asi'])
+    assert form == model_labels([record])[0]
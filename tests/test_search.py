@@ -0,0 +1,52 @@
+import pytest
+
+import database
+import passwords
+
+
+def row(user_id, nama):
+    return (user_id, nama, 'Laki-laki', 12, 3.0, 49.0, 9.0, 74.0, 'Ya', 'Tidak berisiko')
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(passwords, 'SCRYPT_N', 2 ** 12)
+    original_path = database.DB_PATH
+    database.configure_database(str(tmp_path / 'search.db'))
+    database.init_database()
+    database.register_user('bidan_a', 'rahasia123', 'Bidan A', 'Bidan', 'Puskesmas A')
+    database.register_user('bidan_b', 'rahasia123', 'Bidan B', 'Bidan', 'Puskesmas B')
+    database.register_user('lepas', 'rahasia123', 'Tanpa Instansi', 'Kader', None)
+    users = {name: database.get_user_id(name) for name in ('bidan_a', 'bidan_b', 'lepas')}
+    database.insert_prediction_rows([row(users['bidan_a'], 'Budi Santoso'), row(users['bidan_b'], 'Budiman')])
+    yield users
+    database.configure_database(original_path)
+
+
+def names(result):
+    rows, _ = result
+    return sorted(r[0] for r in rows)
+
+
+def test_scope_without_value_returns_nothing(db):
+    assert names(database.search_children('Budi', 'instansi', None)) == []
+    assert names(database.search_children('Budi', 'user', None)) == []
+    assert names(database.search_children('Budi', 'all')) == ['Budi Santoso', 'Budiman']
+
+
+def test_scope_limits_results(db):
+    assert names(database.search_children('Budi', 'user', db['bidan_a'])) == ['Budi Santoso']
+    assert names(database.search_children('Budi', 'instansi', 'Puskesmas B')) == ['Budiman']
+
+
+def test_unknown_scope_rejected(db):
+    with pytest.raises(ValueError):
+        database.search_children('Budi', None)
+
+
+def test_limit_applied_after_ranking(db):
+    # Banyak pengukuran baru yang hanya memuat kata kunci di tengah nama
+    database.insert_prediction_rows([row(db['bidan_a'], f'Anak Budi {i}') for i in range(20)])
+    rows, fuzzy = database.search_children('Budi', 'all', limit=2)
+    assert not fuzzy
+    assert [r[0] for r in rows] == ['Budi Santoso', 'Budiman']
@@ -0,0 +1,86 @@
+import threading
+
+import pytest
+
+import database
+import sessions
+from sessions import SessionStore, client_fingerprint
+
+USER = {'id': 1, 'username': 'petugas', 'nama_lengkap': 'Petugas', 'jabatan': 'Bidan', 'instansi': 'Puskesmas A'}
+BROWSER = client_fingerprint({'User-Agent': 'Firefox', 'Accept-Language': 'id-ID'})
+OTHER = client_fingerprint({'User-Agent': 'curl/8.0', 'Accept-Language': 'id-ID'})
+
+
+@pytest.fixture
+def db(tmp_path):
+    original_path = database.DB_PATH
+    database.configure_database(str(tmp_path / 'sessions.db'))
+    database.init_database()
+    yield
+    database.configure_database(original_path)
+
+
+def test_token_bound_to_fingerprint(db):
+    store = SessionStore()
+    token = store.create(USER, BROWSER)
+    assert store.resolve(token, BROWSER) == USER
+    assert store.resolve(token, OTHER) is None
+    assert store.resolve(token) is None
+    assert store.stats()['fingerprint_mismatches'] == 2
+
+
+def test_rotate_revokes_old_token(db, monkeypatch):
+    store = SessionStore()
+    token = store.create(USER, BROWSER)
+    user_info, new_token = store.rotate(token, BROWSER)
+    assert user_info == USER and new_token != token
+    assert store.resolve(token, BROWSER) is None
+    assert store.resolve(new_token, BROWSER) == USER
+    monkeypatch.setattr(sessions, 'SESSION_ROTATE_GRACE', 0)
+    assert store.rotate(token, BROWSER) == (None, None)
+    assert store.superseded(token)
+
+
+def test_rotate_grace_returns_same_successor(db):
+    store = SessionStore()
+    token = store.create(USER, BROWSER)
+    _, first = store.rotate(token, BROWSER)
+    assert store.rotate(token, BROWSER) == (USER, first)
+    assert store.rotate(token, OTHER) == (None, None)
+    assert store.count_user_sessions(USER['id']) == 1
+
+
+def test_concurrent_restores_agree(db):
+    store = SessionStore()
+    token = store.create(USER, BROWSER)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(store.rotate(token, BROWSER))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert {new_token for _, new_token in results} == {results[0][1]}
+    assert all(user_info == USER for user_info, _ in results)
+    assert store.count_user_sessions(USER['id']) == 1
+
+
+def test_session_counters_follow_lifecycle(db):
+    store = SessionStore(ttl=60)
+    tokens = [store.create(USER, BROWSER) for _ in range(3)]
+    store.create(dict(USER, id=2), BROWSER)
+    assert store.count_user_sessions(USER['id']) == 3
+    assert (store.stats()['active_sessions'], store.stats()['active_users']) == (4, 2)
+    store.revoke(tokens[0])
+    assert store.count_user_sessions(USER['id']) == 2
+    store.purge(now=sessions.time.time() + 120)
+    assert store.count_user_sessions(USER['id']) == 0
+    assert (store.stats()['active_sessions'], store.stats()['active_users']) == (0, 0)
+
+
+def test_persisted_session_keeps_fingerprint(db):
+    token = SessionStore().create(USER, BROWSER)
+    # Proses baru: sesi hanya ada di database
+    restarted = SessionStore()
+    assert restarted.resolve(token, OTHER) is None
+    assert restarted.resolve(token, BROWSER) == USER
+    assert restarted.stats()['restored'] == 1
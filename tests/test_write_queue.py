@@ -0,0 +1,85 @@
+import json
+import sqlite3
+
+import pytest
+
+import database
+import write_queue
+from write_queue import WriteBehindQueue
+
+ROWS = [(1, f'Anak {i}', 'Laki-laki', 12, 3.0, 49.0, 9.0, 74.0, 'Ya', 'Tidak berisiko') for i in range(4)]
+
+
+@pytest.fixture
+def dead_letter_file(tmp_path, monkeypatch):
+    path = tmp_path / 'dead_letter.jsonl'
+    monkeypatch.setattr(write_queue, 'DEAD_LETTER_FILE', str(path))
+    return path
+
+
+@pytest.fixture
+def inserts(monkeypatch, dead_letter_file):
+    monkeypatch.setattr(write_queue, 'WRITE_RETRY_SECONDS', 0)
+    calls = []
+
+    def install(fail):
+        def insert(rows):
+            calls.append(list(rows))
+            error = fail(rows, len(calls))
+            if error:
+                raise error
+            return len(rows)
+        monkeypatch.setattr(database, 'insert_prediction_rows', insert)
+        return calls
+    return install
+
+
+def test_locked_database_retried_then_written(inserts):
+    calls = inserts(lambda rows, n: sqlite3.OperationalError('database is locked') if n < 3 else None)
+    queue = WriteBehindQueue()
+    queue._write(ROWS)
+    stats = queue.stats()
+    assert len(calls) == 3
+    assert stats['written'] == len(ROWS) and stats['retries'] == 2
+    assert stats['dead_letter_rows'] == 0
+
+
+def test_retries_capped_then_dead_lettered(inserts):
+    calls = inserts(lambda rows, n: sqlite3.OperationalError('database is locked'))
+    queue = WriteBehindQueue()
+    queue._write(ROWS)
+    stats = queue.stats()
+    assert len(calls) == write_queue.WRITE_MAX_ATTEMPTS
+    assert stats['written'] == 0 and stats['failed_batches'] == 1
+    assert stats['dead_letter_rows'] == len(ROWS)
+    assert [entry['row'] for entry in queue.dead_letters()] == [list(row) for row in ROWS]
+
+
+def test_bad_row_does_not_block_batch(inserts):
+    calls = inserts(lambda rows, n: sqlite3.IntegrityError('bad row') if ROWS[2] in rows else None)
+    queue = WriteBehindQueue()
+    queue._write(ROWS)
+    stats = queue.stats()
+    # Satu percobaan batch lalu satu per baris, tanpa retry untuk error non-sementara
+    assert len(calls) == 1 + len(ROWS)
+    assert stats['retries'] == 0 and stats['written'] == len(ROWS) - 1
+    assert [entry['row'] for entry in queue.dead_letters()] == [list(ROWS[2])]
+    assert stats['last_error'] == 'IntegrityError: bad row'
+
+
+def test_dead_letters_persisted_and_logged(inserts, dead_letter_file, caplog):
+    inserts(lambda rows, n: sqlite3.OperationalError('database is locked'))
+    queue = WriteBehindQueue()
+    with caplog.at_level('ERROR', logger='write_queue'):
+        queue._write(ROWS)
+    lines = [json.loads(line) for line in dead_letter_file.read_text().splitlines()]
+    assert [line['row'] for line in lines] == [list(row) for row in ROWS]
+    assert lines[0]['error'] == 'OperationalError: database is locked'
+    # Satu catatan log per batch
+    assert len(caplog.records) == 1 and str(dead_letter_file) in caplog.messages[0]
+
+
+def test_dead_letter_file_defaults_next_to_database(monkeypatch):
+    monkeypatch.setattr(write_queue, 'DEAD_LETTER_FILE', None)
+    monkeypatch.setattr(database, 'DB_PATH', '/data/stunting_app.db')
+    assert write_queue.dead_letter_path() == '/data/stunting_app_dead_letter.jsonl'
@@ -0,0 +1,338 @@
+# Pelatihan model stunting tanpa notebook, dengan langkah yang sama seperti
+# Stunting.ipynb: baca Stunting_Dataset.csv, buang duplikat fitur dengan label
+# mayoritas, StandardScaler, split 70/30 (stratify, random_state=2), lalu
+# RandomForestClassifier. Tambahannya:
+#   - dedup tervektorisasi (groupby + ukuran grup, bukan lambda per grup)
+#   - pencarian hyperparameter dengan cross-validation di process pool;
+#     kandidat yang tertinggal dipangkas lebih awal (successive halving per fold)
+#   - artefak berversi di models/<versi>/ beserta manifest.json berisi metrik
+#
+# Data latih ditulis sekali ke .npy dan dibaca worker dengan mmap, sehingga
+# setiap proses tidak menerima salinan data lewat pickle.
+import json
+import math
+import multiprocessing
+import os
+import pickle
+import platform
+import random
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import model_artifact
+import model_registry
+import predictor
+
+MODELS_DIR = 'models'
+ACTIVE_LINK = 'active'
+TEST_SIZE = 0.3
+SPLIT_RANDOM_STATE = 2
+MODEL_RANDOM_STATE = 42
+
+# Parameter di notebook; selalu ikut dievaluasi sebagai kandidat pertama
+BASELINE_PARAMS = {'n_estimators': 100, 'max_depth': None, 'min_samples_leaf': 1, 'max_features': 'sqrt'}
+SEARCH_SPACE = {
+    'n_estimators': [50, 100, 200, 400],
+    'max_depth': [None, 8, 12, 16, 24],
+    'min_samples_leaf': [1, 2, 4, 8],
+    'max_features': ['sqrt', 0.5, None]
+}
+
+
+# Satu baris per kombinasi fitur dengan label mayoritas, identik dengan
+# groupby(...).agg(lambda x: x.value_counts().idxmax()) di notebook: jika seri,
+# label yang muncul lebih dulu di grup yang menang, dan urutan hasil mengikuti
+# urutan kunci groupby
+def deduplicate(dataset, feature_cols=predictor.DATASET_FEATURES, target=predictor.DATASET_TARGET):
+    counts = (
+        dataset.assign(_row=np.arange(len(dataset)))
+        .groupby(feature_cols + [target], sort=False)['_row']
+        .agg(['size', 'min'])
+        .reset_index()
+        .sort_values(['size', 'min'], ascending=[False, True], kind='stable')
+    )
+    majority = counts.drop_duplicates(feature_cols).sort_values(feature_cols, kind='stable')
+    return majority[feature_cols + [target]].reset_index(drop=True)
+
+
+# Kandidat hyperparameter acak (deterministik per seed), baseline notebook di depan
+def sample_candidates(n, seed):
+    rng = random.Random(seed)
+    grid = [dict(zip(SEARCH_SPACE, values)) for values in _product(list(SEARCH_SPACE.values()))]
+    grid = [params for params in grid if params != BASELINE_PARAMS]
+    return [dict(BASELINE_PARAMS)] + rng.sample(grid, min(max(n - 1, 0), len(grid)))
+
+
+def _product(lists):
+    if not lists:
+        return [()]
+    return [(value,) + rest for value in lists[0] for rest in _product(lists[1:])]
+
+
+def _classifier(params, n_jobs=1):
+    from sklearn.ensemble import RandomForestClassifier
+
+    return RandomForestClassifier(random_state=MODEL_RANDOM_STATE, n_jobs=n_jobs, **params)
+
+
+# State worker process pool: data latih (mmap) dan pembagian fold
+_worker = {}
+
+
+def _init_worker(data_dir, folds, seed):
+    from sklearn.model_selection import StratifiedKFold
+
+    X = np.load(os.path.join(data_dir, 'X.npy'), mmap_mode='r')
+    y = np.load(os.path.join(data_dir, 'y.npy'), mmap_mode='r')
+    _worker['X'] = X
+    _worker['y'] = y
+    _worker['splits'] = list(StratifiedKFold(folds, shuffle=True, random_state=seed).split(X, y))
+
+
+# Latih satu kandidat pada satu fold, kembalikan akurasi validasi
+def _score_fold(candidate_index, params, fold):
+    train_index, valid_index = _worker['splits'][fold]
+    X, y = _worker['X'], _worker['y']
+    start = time.perf_counter()
+    classifier = _classifier(params).fit(X[train_index], y[train_index])
+    accuracy = float((classifier.predict(X[valid_index]) == y[valid_index]).mean())
+    return candidate_index, fold, accuracy, time.perf_counter() - start
+
+
+# Successive halving: semua kandidat dinilai pada kelompok fold pertama, lalu
+# hanya 1/eta terbaik (rata-rata akurasi sejauh ini) lanjut ke kelompok fold
+# berikutnya. Kandidat yang bertahan sampai akhir dinilai pada semua fold.
+def search(X, y, candidates, folds, eta, workers, seed):
+    rungs = max(1, min(folds, math.ceil(math.log(len(candidates), eta)) + 1 if len(candidates) > 1 else 1))
+    fold_groups = [group.tolist() for group in np.array_split(np.arange(folds), rungs)]
+    results = [{'params': params, 'fold_scores': {}, 'fit_seconds': 0.0, 'pruned_at_rung': None} for params in candidates]
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        np.save(os.path.join(data_dir, 'X.npy'), np.ascontiguousarray(X))
+        np.save(os.path.join(data_dir, 'y.npy'), np.ascontiguousarray(y))
+        # 'spawn' seperti di benchmarks/bench_load.py: fork bisa mewarisi thread yang tidak ikut tersalin
+        executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker, initargs=(data_dir, folds, seed)
+        )
+        alive = list(range(len(candidates)))
+        with executor:
+            for rung, fold_group in enumerate(fold_groups):
+                tasks = [
+                    executor.submit(_score_fold, index, candidates[index], fold)
+                    for index in alive for fold in fold_group
+                ]
+                for task in tasks:
+                    index, fold, accuracy, seconds = task.result()
+                    results[index]['fold_scores'][fold] = accuracy
+                    results[index]['fit_seconds'] += seconds
+
+                if rung == len(fold_groups) - 1:
+                    break
+                alive.sort(key=lambda index: (-_mean_score(results[index]), index))
+                keep = max(1, math.ceil(len(alive) / eta))
+                for index in alive[keep:]:
+                    results[index]['pruned_at_rung'] = rung
+                alive = sorted(alive[:keep])
+
+    for result in results:
+        result['mean_accuracy'] = _mean_score(result)
+        result['fold_scores'] = [result['fold_scores'][fold] for fold in sorted(result['fold_scores'])]
+    best = max(alive, key=lambda index: (results[index]['mean_accuracy'], -index))
+    return best, results, fold_groups
+
+
+def _mean_score(result):
+    scores = list(result['fold_scores'].values())
+    return float(np.mean(scores)) if scores else 0.0
+
+
+# Pipeline lengkap; mengembalikan (manifest, classifier, scaler)
+def train(dataset_path=predictor.DATASET_PATH, candidates=1, folds=5, eta=3, workers=None, seed=0, log=print):
+    import pandas as pd
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import StandardScaler
+
+    workers = workers or os.cpu_count() or 1
+    timings = {}
+
+    start = time.perf_counter()
+    dataset = predictor.load_dataset(dataset_path)
+    timings['load_seconds'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    cleaned = deduplicate(dataset)
+    timings['dedup_seconds'] = time.perf_counter() - start
+    log(f'{len(dataset):,} baris dibaca, {len(cleaned):,} setelah dedup '
+        f'({len(dataset) - len(cleaned):,} duplikat/konflik label dibuang).')
+
+    X = cleaned.drop(columns=predictor.DATASET_TARGET)
+    Y = cleaned[predictor.DATASET_TARGET]
+    scaler = StandardScaler()
+    scaler.fit(X)
+    X_train, X_test, Y_train, Y_test = train_test_split(
+        scaler.transform(X), Y, test_size=TEST_SIZE, stratify=Y, random_state=SPLIT_RANDOM_STATE
+    )
+    Y_train = Y_train.to_numpy()
+    Y_test = Y_test.to_numpy()
+
+    candidate_params = sample_candidates(candidates, seed)
+    search_results = []
+    best_params = candidate_params[0]
+    if folds > 1:
+        start = time.perf_counter()
+        best, search_results, fold_groups = search(X_train, Y_train, candidate_params, folds, eta, workers, seed)
+        timings['search_seconds'] = time.perf_counter() - start
+        best_params = candidate_params[best]
+        log(f'{len(candidate_params)} kandidat x {folds} fold di {workers} proses '
+            f'({len(fold_groups)} tahap pemangkasan) dalam {timings["search_seconds"]:.1f} detik; '
+            f'terbaik {best_params} dengan akurasi CV {search_results[best]["mean_accuracy"]:.4f}.')
+
+    start = time.perf_counter()
+    classifier = _classifier(best_params, n_jobs=workers).fit(X_train, Y_train)
+    classifier.n_jobs = None  # model yang disimpan tidak membawa pengaturan paralel mesin pelatihan
+    timings['fit_seconds'] = time.perf_counter() - start
+
+    train_accuracy = float((classifier.predict(X_train) == Y_train).mean())
+    test_accuracy = float((classifier.predict(X_test) == Y_test).mean())
+    log(f'Akurasi training {train_accuracy:.4f}, testing {test_accuracy:.4f}.')
+
+    manifest = {
+        'created_at': pd.Timestamp.now(tz='UTC').isoformat(timespec='seconds'),
+        'dataset': {
+            'path': dataset_path,
+            'sha256': model_artifact.file_sha256(dataset_path),
+            'rows': len(dataset),
+            'rows_deduplicated': len(cleaned),
+            'class_counts': {str(label): int(count) for label, count in Y.value_counts().sort_index().items()}
+        },
+        'split': {'test_size': TEST_SIZE, 'random_state': SPLIT_RANDOM_STATE,
+                  'train_rows': len(Y_train), 'test_rows': len(Y_test)},
+        'params': dict(best_params, random_state=MODEL_RANDOM_STATE),
+        'metrics': {
+            'train_accuracy': train_accuracy,
+            'test_accuracy': test_accuracy,
+            'cv_accuracy': search_results[candidate_params.index(best_params)]['mean_accuracy'] if search_results else None
+        },
+        'search': {'candidates': len(candidate_params), 'folds': folds, 'eta': eta, 'seed': seed,
+                   'results': search_results},
+        'timings': timings,
+        'environment': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'sklearn': _sklearn_version(),
+            'cpu_count': os.cpu_count(),
+            'workers': workers
+        }
+    }
+    return manifest, classifier, scaler
+
+
+def _sklearn_version():
+    import sklearn
+
+    return sklearn.__version__
+
+
+# Tulis models/<versi>/ (pickle, artefak datar, manifest). Versi = hash isi artefak,
+# jadi data + parameter yang sama selalu menghasilkan versi yang sama. Folder versi
+# yang sudah ada tidak ditimpa karena mungkin sedang dipakai (models/active).
+def save_models(manifest, classifier, scaler, models_dir=MODELS_DIR):
+    os.makedirs(models_dir, exist_ok=True)
+    staging = tempfile.mkdtemp(dir=models_dir)
+    try:
+        sources = {
+            'model': os.path.join(staging, os.path.basename(model_registry.MODEL_PATH)),
+            'scaler': os.path.join(staging, os.path.basename(model_registry.SCALER_PATH))
+        }
+        with open(sources['model'], 'wb') as f:
+            pickle.dump(classifier, f)
+        with open(sources['scaler'], 'wb') as f:
+            pickle.dump(scaler, f)
+        meta = model_artifact.export_artifact(classifier, scaler, os.path.join(staging, model_artifact.ARTIFACT_DIR),
+                                              sources)
+        manifest = dict(manifest, version=meta['version'], artifact=meta)
+        with open(os.path.join(staging, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+        directory = os.path.join(models_dir, meta['version'])
+        if os.path.exists(directory):
+            shutil.rmtree(staging)
+            with open(os.path.join(directory, 'manifest.json')) as f:
+                return directory, json.load(f)
+        os.rename(staging, directory)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    return directory, manifest
+
+
+# Ganti path dengan symlink ke link_target. File/symlink lama diganti dengan satu
+# rename atomik; folder biasa (pemasangan pertama) disingkirkan lebih dulu.
+def _replace_with_symlink(link_target, path, is_directory):
+    tmp_link = f'{path}.tmp'
+    if os.path.lexists(tmp_link):
+        os.remove(tmp_link)
+    os.symlink(link_target, tmp_link, target_is_directory=is_directory)
+    if os.path.isdir(path) and not os.path.islink(path):
+        old = f'{path}.old'
+        shutil.rmtree(old, ignore_errors=True)
+        os.rename(path, old)
+        os.replace(tmp_link, path)
+        shutil.rmtree(old)
+    else:
+        os.replace(tmp_link, path)
+
+
+# Tanpa symlink: salin ketiganya ke nama sementara dulu, lalu rename berurutan
+# (jendela campuran hanya selama tiga rename; artefak yang tidak cocok dengan
+# pickle-nya tetap ditolak model_registry)
+def _copy_models(directory, targets):
+    for name, target in targets:
+        source = os.path.join(directory, name)
+        shutil.rmtree(f'{target}.tmp', ignore_errors=True)
+        if os.path.isdir(source):
+            shutil.copytree(source, f'{target}.tmp')
+        else:
+            shutil.copyfile(source, f'{target}.tmp')
+    for name, target in targets:
+        if os.path.isdir(target) and not os.path.islink(target):
+            shutil.rmtree(f'{target}.old', ignore_errors=True)
+            os.rename(target, f'{target}.old')
+            os.rename(f'{target}.tmp', target)
+            shutil.rmtree(f'{target}.old')
+        else:
+            os.replace(f'{target}.tmp', target)
+
+
+# Pasang versi dari models/<versi>/ sebagai model aktif aplikasi.
+# models/active adalah symlink ke folder versi dan ditukar dengan satu rename
+# atomik; stunting.sav, scaler.sav dan stunting_model/ adalah symlink ke
+# models/active/... (dibuat pada pemasangan pertama), jadi ketiganya selalu
+# berganti bersamaan. Jika sistem tidak mendukung symlink (misalnya Windows
+# tanpa developer mode), file disalin dengan _copy_models.
+def install_models(directory, model_path=model_registry.MODEL_PATH, scaler_path=model_registry.SCALER_PATH,
+                   artifact_dir=model_registry.ARTIFACT_DIR):
+    directory = os.path.abspath(directory)
+    active = os.path.join(os.path.dirname(directory), ACTIVE_LINK)
+    # Artefak lebih dulu: selama pemasangan pertama artefak baru tidak cocok
+    # dengan pickle lama, sehingga registry memakai pickle lama yang utuh
+    targets = [
+        (model_artifact.ARTIFACT_DIR, artifact_dir),
+        (os.path.basename(model_registry.SCALER_PATH), scaler_path),
+        (os.path.basename(model_registry.MODEL_PATH), model_path)
+    ]
+    try:
+        _replace_with_symlink(os.path.basename(directory), active, is_directory=True)
+    except (OSError, NotImplementedError):
+        _copy_models(directory, targets)
+        return
+    for name, target in targets:
+        link_target = os.path.relpath(os.path.join(active, name), os.path.dirname(os.path.abspath(target)))
+        if not (os.path.islink(target) and os.readlink(target) == link_target):
+            _replace_with_symlink(link_target, target, is_directory=name == model_artifact.ARTIFACT_DIR)
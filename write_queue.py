@@ -0,0 +1,273 @@
+# Antrean write-behind untuk menyimpan hasil prediksi dari form.
+#
+# Form prediksi cukup memasukkan record ke antrean lalu langsung menampilkan
+# hasil; thread penulis di belakang mengambil record dan menyimpannya dalam
+# micro-batch (satu transaksi per batch). Batch ditulis saat ukurannya
+# mencapai WRITE_BATCH_SIZE, saat record tertua sudah menunggu
+# WRITE_FLUSH_INTERVAL detik, saat flush() dipanggil, dan saat proses berhenti.
+#
+# Jika antrean penuh, pemanggil menunggu paling lama WRITE_PUT_TIMEOUT detik
+# (backpressure) lalu menulis sendiri secara sinkron. STUNTING_WRITE_MODE=sync
+# mematikan antrean sepenuhnya (setiap insert langsung di-commit).
+#
+# Hanya kegagalan sementara (sqlite3.OperationalError "database is locked/busy")
+# yang dicoba ulang, paling banyak WRITE_MAX_ATTEMPTS kali; jika tetap terkunci
+# seluruh batch dipindahkan ke dead-letter. Batch yang gagal karena error lain
+# ditulis ulang per baris, dan baris yang masih gagal dipindahkan ke
+# dead-letter: ditambahkan ke file JSON Lines (default di samping file database,
+# STUNTING_WRITE_DEAD_LETTER_FILE untuk lokasi lain) agar tidak hilang saat
+# restart, dicatat lewat logging, dan DEAD_LETTER_MAX baris terakhir juga
+# disimpan di memori untuk stats()/dead_letters().
+import atexit
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import deque
+
+import database
+
+WRITE_MODE = os.environ.get('STUNTING_WRITE_MODE', 'async')
+WRITE_QUEUE_SIZE = int(os.environ.get('STUNTING_WRITE_QUEUE_SIZE', 10000))
+WRITE_BATCH_SIZE = int(os.environ.get('STUNTING_WRITE_BATCH_SIZE', 200))
+WRITE_FLUSH_INTERVAL = float(os.environ.get('STUNTING_WRITE_FLUSH_INTERVAL', 0.2))
+WRITE_PUT_TIMEOUT = 1.0
+WRITE_RETRY_SECONDS = 1.0
+WRITE_MAX_ATTEMPTS = int(os.environ.get('STUNTING_WRITE_MAX_ATTEMPTS', 5))
+DEAD_LETTER_FILE = os.environ.get('STUNTING_WRITE_DEAD_LETTER_FILE')
+DEAD_LETTER_MAX = 1000
+
+_STOP = object()
+
+logger = logging.getLogger(__name__)
+
+
+# File dead-letter: STUNTING_WRITE_DEAD_LETTER_FILE, atau <database>_dead_letter.jsonl
+def dead_letter_path():
+    return DEAD_LETTER_FILE or os.path.splitext(database.DB_PATH)[0] + '_dead_letter.jsonl'
+
+
+# Error SQLite yang hilang sendiri jika ditunggu (penulis lain memegang lock,
+# atau semua koneksi pool sedang dipinjam)
+def is_transient_error(error):
+    message = str(error).lower()
+    return isinstance(error, sqlite3.OperationalError) and (
+        'locked' in message or 'busy' in message or 'pool exhausted' in message
+    )
+
+
+class WriteBehindQueue:
+    def __init__(self, maxsize=WRITE_QUEUE_SIZE, batch_size=WRITE_BATCH_SIZE, flush_interval=WRITE_FLUSH_INTERVAL):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self._thread = None
+        self.enqueued = 0
+        self.written = 0
+        self.batches = 0
+        self.retries = 0
+        self.failed_batches = 0
+        self.dead_letter_rows = 0
+        self.last_error = None
+        self._dead_letters = deque(maxlen=DEAD_LETTER_MAX)
+        self.blocked_puts = 0
+        self.blocked_seconds = 0.0
+        self.sync_fallbacks = 0
+        self.max_depth = 0
+        self.last_batch_size = 0
+        self.last_batch_seconds = 0.0
+        self.total_batch_seconds = 0.0
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='prediction-writer', daemon=True)
+                self._thread.start()
+                atexit.register(self.shutdown)
+
+    # Masukkan satu baris (user_id, nama, gender, ..., hasil_prediksi) ke antrean
+    def submit(self, row):
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            start = time.perf_counter()
+            try:
+                self._queue.put(row, timeout=WRITE_PUT_TIMEOUT)
+            except queue.Full:
+                # Penulis tertinggal terlalu jauh: tulis langsung agar data tidak hilang
+                database.insert_prediction_rows([row])
+                with self._lock:
+                    self.sync_fallbacks += 1
+                return
+            finally:
+                with self._lock:
+                    self.blocked_puts += 1
+                    self.blocked_seconds += time.perf_counter() - start
+        with self._lock:
+            self.enqueued += 1
+            self.max_depth = max(self.max_depth, self._queue.qsize())
+
+    # Tunggu sampai semua record yang sudah masuk antrean tersimpan
+    def flush(self, timeout=None):
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def shutdown(self, timeout=10):
+        if self._thread is None or not self._thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    # Insert dengan retry untuk error sementara; error lain atau retry yang
+    # habis diteruskan ke pemanggil
+    def _insert_with_retry(self, rows):
+        for attempt in range(1, WRITE_MAX_ATTEMPTS + 1):
+            try:
+                database.insert_prediction_rows(rows)
+                return
+            except Exception as e:
+                if not is_transient_error(e) or attempt == WRITE_MAX_ATTEMPTS:
+                    raise
+                with self._lock:
+                    self.retries += 1
+                time.sleep(WRITE_RETRY_SECONDS * attempt)
+
+    # Pindahkan baris gagal [(row, error), ...] dari satu batch ke dead-letter
+    def _dead_letter(self, failed):
+        now = time.time()
+        entries = [
+            {'time': now, 'error': f'{type(error).__name__}: {error}', 'row': list(row)}
+            for row, error in failed
+        ]
+        with self._lock:
+            self._dead_letters.extend(entries)
+            self.dead_letter_rows += len(entries)
+            self.last_error = entries[-1]['error']
+        path = dead_letter_path()
+        try:
+            with open(path, 'a') as f:
+                f.writelines(json.dumps(entry, default=str) + '\n' for entry in entries)
+        except OSError:
+            logger.exception('Gagal menulis %d baris dead-letter ke %s: %s',
+                             len(entries), path, [entry['row'] for entry in entries])
+            return
+        logger.error('%d baris prediksi gagal disimpan, dipindahkan ke %s (error terakhir: %s)',
+                     len(entries), path, entries[-1]['error'])
+
+    def _write(self, batch):
+        start = time.perf_counter()
+        written = len(batch)
+        try:
+            self._insert_with_retry(batch)
+        except Exception as e:
+            with self._lock:
+                self.failed_batches += 1
+                self.last_error = f'{type(e).__name__}: {e}'
+            # Database masih terkunci setelah semua retry: seluruh batch ke dead-letter.
+            # Error lain: tulis ulang per baris agar satu baris rusak tidak
+            # menggagalkan seluruh batch
+            if is_transient_error(e):
+                failed = [(row, e) for row in batch]
+            else:
+                failed = []
+                for row in batch:
+                    try:
+                        self._insert_with_retry([row])
+                    except Exception as row_error:
+                        failed.append((row, row_error))
+            written = len(batch) - len(failed)
+            if failed:
+                self._dead_letter(failed)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.written += written
+            self.batches += 1
+            self.last_batch_size = len(batch)
+            self.last_batch_seconds = elapsed
+            self.total_batch_seconds += elapsed
+
+    def _run(self):
+        batch, waiters, deadline = [], [], None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            stop = item is _STOP
+            if isinstance(item, threading.Event):
+                waiters.append(item)
+            elif item is not None and not stop:
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+
+            due = deadline is not None and time.monotonic() >= deadline
+            if batch and (stop or waiters or due or len(batch) >= self.batch_size):
+                self._write(batch)
+                batch, deadline = [], None
+            for waiter in waiters:
+                waiter.set()
+            waiters = []
+            if stop:
+                return
+
+    def stats(self):
+        with self._lock:
+            return {
+                'mode': WRITE_MODE,
+                'queue_depth': self._queue.qsize(),
+                'max_depth': self.max_depth,
+                'maxsize': self._queue.maxsize,
+                'batch_size': self.batch_size,
+                'flush_interval_seconds': self.flush_interval,
+                'enqueued': self.enqueued,
+                'written': self.written,
+                'batches': self.batches,
+                'avg_batch_size': self.written / self.batches if self.batches else 0.0,
+                'avg_batch_seconds': self.total_batch_seconds / self.batches if self.batches else 0.0,
+                'last_batch_size': self.last_batch_size,
+                'last_batch_seconds': self.last_batch_seconds,
+                'blocked_puts': self.blocked_puts,
+                'blocked_seconds': self.blocked_seconds,
+                'sync_fallbacks': self.sync_fallbacks,
+                'retries': self.retries,
+                'failed_batches': self.failed_batches,
+                'dead_letter_rows': self.dead_letter_rows,
+                'dead_letter_file': dead_letter_path(),
+                'last_error': self.last_error
+            }
+
+    # Baris yang gagal disimpan (terbaru paling akhir, maksimal DEAD_LETTER_MAX)
+    def dead_letters(self):
+        with self._lock:
+            return list(self._dead_letters)
+
+
+write_queue = WriteBehindQueue()
+
+
+# Simpan satu hasil prediksi lewat antrean (atau langsung jika mode sync)
+def submit_prediction(user_id, nama, gender, usia, berat_lahir, panjang_lahir,
+                      berat_sekarang, panjang_sekarang, asi, hasil_prediksi):
+    row = (user_id, nama, gender, usia, berat_lahir, panjang_lahir,
+           berat_sekarang, panjang_sekarang, asi, hasil_prediksi)
+    if WRITE_MODE == 'sync':
+        database.insert_prediction_rows([row])
+    else:
+        write_queue.submit(row)
+
+
+def get_write_queue_stats():
+    return write_queue.stats()